@@ -4,13 +4,16 @@ import pandas as pd
 import argparse
 from tqdm import tqdm
 
+from judger.game_log import iter_history
+from judger.log_archive import ARCHIVE_SEPARATOR, LogArchive
+
 
 
 TREASURE_VALUE_DIVISOR = 12
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Analyze bot match logs")
-    parser.add_argument("--bot_matchs_json_dir_path", type=str, help="Path to the directory containing bot match logs in JSON format")
+    parser.add_argument("--bot_matchs_json_dir_path", type=str, help="Path to the directory containing bot match logs in JSON format, or to a log archive")
     parser.add_argument("--output_dir_path", type=str, help="Path to the output directory for the analysis results")
     return parser.parse_args()
 
@@ -40,15 +43,13 @@ def get_winners(final_round_log):
 
 
 def get_who_got_treasure(bot_match_logs_json):
-    init_round_log = bot_match_logs_json[0]
-    last_round_log = init_round_log
-    n_round = len(bot_match_logs_json)
+    round_logs = iter(bot_match_logs_json)
+    last_round_log = next(round_logs)
 
     last_treasure_state = False
     
 
-    for i in range(1, n_round):
-        cur_round_log = bot_match_logs_json[i]
+    for cur_round_log in round_logs:
         last_scores = get_scores(last_round_log)
         cur_scores = get_scores(cur_round_log)
 
@@ -83,12 +84,16 @@ def get_who_got_treasure(bot_match_logs_json):
     return None
 
 def get_missile_accuracy(bot_match_logs_json):
-    n_players = len(bot_match_logs_json[0]['players'])
-    fired_missles = [0] * n_players
-    hit_missles = [0] * n_players
-    
-    for player_idx in range(n_players):
-        for round_log in bot_match_logs_json:
+    fired_missles = None
+    hit_missles = None
+
+    for round_log in bot_match_logs_json:
+        n_players = len(round_log['players'])
+        if fired_missles is None:
+            fired_missles = [0] * n_players
+            hit_missles = [0] * n_players
+
+        for player_idx in range(n_players):
             other_locations = []
             for i in range(n_players):
                 if i != player_idx:
@@ -112,16 +117,16 @@ def get_missile_accuracy(bot_match_logs_json):
 
 def bot_match_analysis(bot_match_path: Path) -> pd.DataFrame:
     
-    bot_match_logs_json = json.loads(bot_match_path.read_text(encoding='utf-8'))
-
-    final_round_log = bot_match_logs_json[-1]
+    # Every pass streams the log again, so long matches never have to fit in memory
+    for final_round_log in iter_history(str(bot_match_path)):
+        pass
 
 
     final_scores = get_scores(final_round_log)
     winners = get_winners(final_round_log)
 
-    who_got_treasure = get_who_got_treasure(bot_match_logs_json)
-    hit_missles, fired_missles = get_missile_accuracy(bot_match_logs_json)
+    who_got_treasure = get_who_got_treasure(iter_history(str(bot_match_path)))
+    hit_missles, fired_missles = get_missile_accuracy(iter_history(str(bot_match_path)))
 
     winners_hot_encoded = [1 if i in winners else 0 for i in range(len(final_scores))]
     who_got_treasure_hot_encoded = [1 if i == who_got_treasure else 0 for i in range(len(final_scores))]
@@ -145,11 +150,24 @@ if __name__ == "__main__":
     output_dir_path = Path(args.output_dir_path)
     output_dir_path.mkdir(parents=True, exist_ok=True)
 
-    bot_matche_paths = list(bot_matchs_json_dir_path.glob('*.json'))
-
-    for bot_match_path in tqdm(bot_matche_paths, desc="Analyzing bot match logs"):
+    if bot_matchs_json_dir_path.is_file():
+        # A log archive, every match is read from it without unpacking
+        with LogArchive(str(bot_matchs_json_dir_path)) as archive:
+            bot_matches = {name.replace('/', '_'): f"{bot_matchs_json_dir_path}{ARCHIVE_SEPARATOR}{name}"
+                           for name in archive.matches()}
+    else:
+        bot_matches = {}
+        for path in sorted(path for pattern in ('*.json', '*.json.gz', '*.jsonl', '*.jsonl.gz')
+                           for path in bot_matchs_json_dir_path.glob(pattern)
+                           if not path.name.endswith('.metrics.jsonl')):
+            match_name = path.name
+            for suffix in ('.gz', '.jsonl', '.json'):
+                match_name = match_name[:-len(suffix)] if match_name.endswith(suffix) else match_name
+            bot_matches[match_name] = path
+
+    for match_name, bot_match_path in tqdm(bot_matches.items(), desc="Analyzing bot match logs"):
 
         df = bot_match_analysis(bot_match_path)
 
-        save_path = output_dir_path / f"{bot_match_path.stem}_analysis.csv"
+        save_path = output_dir_path / f"{match_name}_analysis.csv"
         df.to_csv(save_path, index=False)
\ No newline at end of file
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Asyncio runner module for playing many "botwar ship" matches in one process.
+"""
+import os
+import asyncio
+import subprocess
+import threading
+import time
+import concurrent.futures
+from typing import List, Dict, Optional, Coroutine, Union
+
+from runner import Runner
+from launcher.process import run_process_async
+from utils.constants import TIME_BANK, BUILD_CACHE_DIR, LOG_FORMAT, KEYFRAME_INTERVAL
+
+
+class AsyncRunner(Runner):
+    """
+    AsyncRunner plays a match on an asyncio event loop, so that a single
+    process can drive many matches at once. Agent processes are started with
+    asyncio.create_subprocess_exec, and a semaphore shared by all matches caps
+    how many of them are alive at the same time.
+    """
+
+    def __init__(self, agent_paths: List[str], process_limit: asyncio.Semaphore,
+                 io_modes: Optional[List[str]] = None, time_bank: float = TIME_BANK,
+                 build_cache_dir: str = BUILD_CACHE_DIR, log_format: str = LOG_FORMAT,
+                 keyframe_interval: int = KEYFRAME_INTERVAL, compress_log: bool = False,
+                 seed: Optional[int] = None, protocols: Optional[List[str]] = None):
+        """
+        Initialize the AsyncRunner with paths to agent executables.
+
+        Args:
+            agent_paths: List of paths to the three agent executables
+            process_limit: Semaphore bounding the number of live agent processes across all matches
+            io_modes: I/O mode of each agent, one of AGENT_IO_MODES (defaults to "file")
+            time_bank: Extra time in seconds each agent may spend over TIMEOUT during the match
+            build_cache_dir: Directory holding the compiled executables of source agents
+            log_format: Format of the game log, one of LOG_FORMATS
+            keyframe_interval: Turns from one keyframe to the next in a delta game log
+            compress_log: Write the game log with gzip
+            seed: Seed of the judge's random generator, drawn at random if not given
+            protocols: Protocol of each agent, one of AGENT_PROTOCOLS (defaults to "text")
+        """
+        super().__init__(agent_paths, io_modes=io_modes, time_bank=time_bank, build_cache_dir=build_cache_dir,
+                         log_format=log_format, keyframe_interval=keyframe_interval, compress_log=compress_log,
+                         seed=seed, protocols=protocols)
+        self.process_limit = process_limit
+
+    def initialize_game(self, map_path: str, log_path: str = "./data/logs/final_results.json"):
+        """
+        Initialize the game with the specified map.
+
+        Args:
+            map_path: Path to the map JSON file
+            log_path: Path for logging game data
+        """
+        super().initialize_game(map_path, log_path)
+
+        # Other matches may run the same agents at the same time
+        self._prepare_seat_dirs(copy_all=True)
+
+    async def run_game_async(self):
+        """
+        Run the game until completion (all ships sink or max moves reached).
+        """
+        # Phase 0: Get starting positions from agents
+        agent_inputs = self.judger.generate_agent_inputs(self._time_banks(), self.protocols)
+        outputs = await self.execute_agents_async(agent_inputs, list(range(len(self.agent_paths))))
+        self._set_start_positions(outputs)
+
+        # Phase 1 onwards: Move phase
+        while not self.check_game_end():
+            agent_inputs, live_seats = self._begin_turn()
+            outputs = await self.execute_agents_async(agent_inputs, live_seats)
+            self._finish_turn(outputs)
+
+    async def execute_agents_async(self, agent_inputs: List[Union[str, bytes]],
+                                   seats: List[int]) -> Dict[int, Union[str, bytes]]:
+        """
+        Execute the agents of the given seats at the same time and collect their responses.
+
+        Args:
+            agent_inputs: Input data for every seat
+            seats: Indices of the seats whose agents should run
+
+        Returns:
+            Dictionary of seat index to the agent's response
+        """
+        outputs = await asyncio.gather(*[
+            self.execute_agent_async(self.seat_agent_paths[seat], agent_inputs[seat], seat)
+            for seat in seats
+        ])
+        return dict(zip(seats, outputs))
+
+    async def execute_agent_async(self, agent_path: str, input_data: Union[str, bytes],
+                                  seat: Optional[int] = None) -> Union[str, bytes]:
+        """
+        Execute an agent program and get its response.
+
+        The time limit starts once the agent process is allowed to start, so
+        waiting for the process limit does not count as think time.
+
+        Args:
+            agent_path: Path to the agent executable
+            input_data: Input data to send to the agent, bytes for a binary protocol agent
+            seat: Index of the player the agent plays for
+
+        Returns:
+            The agent's response as a string, bytes if the input was bytes
+        """
+        async with self.process_limit:
+            stats = self._new_stats(agent_path, seat)
+            start = time.perf_counter()
+            try:
+                agent_path = os.path.abspath(agent_path)
+                agent_dir = os.path.dirname(agent_path)
+                io_mode = self._io_mode(seat)
+                command = self._agent_command(agent_path, io_mode, seat)
+
+                if io_mode == "pipe":
+                    result = await run_process_async(command, agent_dir, input_data, self._timeout(seat), stats)
+                else:
+                    self._write_input_file(agent_dir, input_data)
+                    result = await run_process_async(command, agent_dir, None, self._timeout(seat), stats)
+
+                return self._read_response(result, agent_dir, io_mode, stats, isinstance(input_data, bytes))
+
+            except subprocess.TimeoutExpired:
+                stats["timed_out"] = True
+                self.logger.error(f"Agent execution timed out: {agent_path}")
+                return ""
+            except Exception as e:
+                stats["failed"] = True
+                self.logger.error(f"Error executing agent: {str(e)}")
+                return ""
+            finally:
+                self._record_stats(stats, start)
+
+
+async def play_match(agent_paths: List[str], map_path: str, log_path: str, process_limit: asyncio.Semaphore,
+                     io_modes: Optional[List[str]] = None, time_bank: float = TIME_BANK,
+                     build_cache_dir: str = BUILD_CACHE_DIR, log_format: str = LOG_FORMAT,
+                     keyframe_interval: int = KEYFRAME_INTERVAL, compress_log: bool = False,
+                     seed: Optional[int] = None, protocols: Optional[List[str]] = None) -> AsyncRunner:
+    """
+    Play a complete match and write its log.
+
+    Args:
+        agent_paths: List of paths to the three agent executables
+        map_path: Path to the map JSON file
+        log_path: Output path for the game log
+        process_limit: Semaphore bounding the number of live agent processes across all matches
+        io_modes: I/O mode of each agent, one of AGENT_IO_MODES (defaults to "file")
+        time_bank: Extra time in seconds each agent may spend over TIMEOUT during the match
+        build_cache_dir: Directory holding the compiled executables of source agents
+        log_format: Format of the game log, one of LOG_FORMATS
+        keyframe_interval: Turns from one keyframe to the next in a delta game log
+        compress_log: Write the game log with gzip
+        seed: Seed of the judge's random generator, drawn at random if not given
+        protocols: Protocol of each agent, one of AGENT_PROTOCOLS (defaults to "text")
+
+    Returns:
+        The runner of the finished match
+    """
+    runner = AsyncRunner(agent_paths, process_limit, io_modes=io_modes, time_bank=time_bank,
+                         build_cache_dir=build_cache_dir, log_format=log_format, keyframe_interval=keyframe_interval,
+                         compress_log=compress_log, seed=seed, protocols=protocols)
+    try:
+        # Map parsing and agent directory copies block, keep them off the event loop
+        await asyncio.to_thread(runner.initialize_game, map_path, log_path)
+        await runner.run_game_async()
+        await asyncio.to_thread(runner.report_results)
+    finally:
+        runner.close()
+    return runner
+
+
+class MatchLoop:
+    """
+    MatchLoop runs an asyncio event loop in a background thread, so that
+    synchronous code can submit matches to it and wait for them like with
+    any concurrent.futures executor.
+    """
+
+    def __init__(self, max_processes: int):
+        """
+        Start the event loop.
+
+        Args:
+            max_processes: Maximum number of live agent processes across all matches
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.process_limit = asyncio.Semaphore(max_processes)
+
+    def submit(self, coroutine: Coroutine) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the event loop.
+
+        Args:
+            coroutine: Coroutine to run, usually play_match(...)
+
+        Returns:
+            Future holding the result of the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def shutdown(self):
+        """
+        Stop the event loop and its thread.
+        """
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
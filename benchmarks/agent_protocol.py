@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark of the binary agent protocol against the text format.
+
+The check plays random games and verifies that every binary agent input
+holds the same header, players and cells as the text input of the same
+seat. The benchmark compares, on maps of growing radius, the size of both
+inputs and the time an agent takes to parse them: the text with the line
+by line tokenizing of the example bots, the binary input with
+read_input().
+
+Usage: python -m benchmarks.agent_protocol [--radii 10 25 50 100]
+"""
+import argparse
+import io
+import random
+import sys
+import time
+from typing import Any, Callable, Dict
+
+from benchmarks.player_scaling import random_map, random_moves
+from judger.judger import Judger
+from utils.binary_protocol import KIND_SHIELD, KIND_DANGER, read_input
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check and benchmark the binary agent protocol")
+    parser.add_argument("--radii", type=int, nargs="+", default=[10, 25, 50, 100], help="Map radii of the benchmark")
+    parser.add_argument("--games", type=int, default=20, help="Number of games of the check")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random games")
+    return parser.parse_args()
+
+
+def parse_text(text: str) -> Dict[str, Any]:
+    """
+    Parse a text agent input the way the example bots do, one line of tokens at a time.
+
+    Args:
+        text: Agent input in MAP.INP format
+
+    Returns:
+        Header, players and cells of the input
+    """
+    fin = io.StringIO(text)
+    radius, moves_left, phase, *bank = map(int, fin.readline().split())
+    players = []
+    if phase == 0:
+        team_id = int(fin.readline().split()[0])
+    else:
+        team_id = None
+        line = fin.readline().split()
+        while len(line) > 1:
+            players.append(list(map(int, line)))
+            line = fin.readline().split()
+        count = int(line[0])
+    if phase == 0:
+        count = int(fin.readline())
+    cells = []
+    for _ in range(count):
+        q, r, s, value = fin.readline().split()
+        cells.append((int(q), int(r), int(s), value))
+    return {"radius": radius, "moves_left": moves_left, "phase": phase, "team_id": team_id,
+            "time_bank": bank[0] if bank else -1, "players": players, "cells": cells}
+
+
+def same_input(text: Dict[str, Any], binary) -> bool:
+    """Check that a parsed text input and a decoded binary input hold the same game."""
+    if (text["radius"], text["moves_left"], text["phase"], text["time_bank"]) != \
+            (binary.radius, binary.moves_left, binary.phase, binary.time_bank):
+        return False
+    if text["team_id"] is not None and text["team_id"] != binary.team_id:
+        return False
+    players = []
+    for i, p in enumerate(binary.players):
+        if i == 0:
+            players.append([p.q, p.r, p.s, p.gold, int(p.shield), p.missiles])
+        else:
+            players.append([p.q, p.r, p.s, int(p.alive), p.gold, int(p.shield)])
+    cells = [(q, r, -q - r, {KIND_SHIELD: "S", KIND_DANGER: "D"}.get(kind, str(value))) for q, r, kind, value in binary.cells]
+    return players == text["players"] and cells == text["cells"]
+
+
+def check(games: int, seed: int) -> int:
+    """
+    Play random games, comparing the binary and text input of every seat at every turn.
+
+    Args:
+        games: Number of games
+        seed: Seed of the random games
+
+    Returns:
+        Number of inputs checked
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for game in range(games):
+        judger = Judger.from_map_data(random_map(rng, 8, 50), seed=seed + game)
+        time_banks = [rng.randint(0, 5000) for _ in judger.game_state.players] if game % 2 else None
+        started = False
+        while not judger.check_game_end():
+            texts = judger.generate_agent_inputs(time_banks)
+            binaries = judger.generate_agent_inputs(time_banks, ["binary"] * len(texts))
+            for seat, (text, binary) in enumerate(zip(texts, binaries)):
+                if not same_input(parse_text(text), read_input(binary)):
+                    raise AssertionError(f"Game {game} turn {judger.game_state.turn} seat {seat}: inputs differ")
+                checked += 1
+            if not started:
+                judger.validate_start_positions([{"q": 0, "r": 0, "s": 0}] * len(texts))
+                started = True
+            else:
+                judger.process_turn(random_moves(rng, judger))
+    return checked
+
+
+def rate(function: Callable[[], object], seconds: float = 0.5) -> float:
+    """Measure calls per second of a function."""
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        function()
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    """Main function of the check and benchmark."""
+    args = parse_args()
+    try:
+        checked = check(args.games, args.seed)
+    except AssertionError as error:
+        print(error)
+        sys.exit(1)
+    print(f"{checked} binary inputs identical to the text inputs")
+
+    header = f"{'radius':>6} {'cells':>6} {'text B':>8} {'binary B':>9} {'text parse us':>14} {'binary parse us':>16}"
+    print(header)
+    print("-" * len(header))
+    for radius in args.radii:
+        judger = Judger.from_map_data(random_map(random.Random(args.seed), radius, 100, gold=0.3), seed=args.seed)
+        judger.validate_start_positions([{"q": 0, "r": 0, "s": 0}] * len(judger.game_state.players))
+        text: str = judger.generate_agent_inputs()[0]
+        binary: bytes = judger.generate_agent_inputs(None, ["binary"] * len(judger.game_state.players))[0]
+        if not same_input(parse_text(text), read_input(binary)):
+            print(f"Radius {radius}: inputs differ")
+            sys.exit(1)
+        cells = len(read_input(binary).cells)
+        print(f"{radius:>6} {cells:>6} {len(text.encode()):>8,} {len(binary):>9,} "
+              f"{1e6 / rate(lambda: parse_text(text)):>14,.0f} {1e6 / rate(lambda: read_input(binary)):>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Differential check and benchmark of the batch simulator against the Judger.
+
+The check plays the same random games with the reference Judger and with
+BatchSimulator, feeding both the same moves and the same random numbers,
+and compares every player and cell after every turn. The benchmark then
+measures turns per second of both engines.
+
+Usage: python -m benchmarks.batch_simulator [--map examples/maps/map.json] [--games 200] [--batch 4096]
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from judger.judger import Judger
+from judger.batch_simulator import BatchSimulator, DIRECTIONS
+from judger.file_handler import FileHandler
+from utils.constants import MAX_MISSILES_EACH_TURN
+
+MOVE_NAMES = [direction.name for direction in DIRECTIONS]
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check and benchmark the batch simulator")
+    parser.add_argument("--map", default="examples/maps/map.json", help="Path to the map JSON file")
+    parser.add_argument("--games", type=int, default=200, help="Number of games of the differential check")
+    parser.add_argument("--batch", type=int, default=4096, help="Number of games of the throughput benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random games")
+    return parser.parse_args()
+
+
+class MirroredSimulator(BatchSimulator):
+    """
+    MirroredSimulator draws its random numbers from one random.Random per
+    game, kept in the same state as the random generator of the reference
+    Judger of that game.
+    """
+
+    def __init__(self, map_data: Dict[str, Any], mirrors: List[random.Random]):
+        super().__init__(map_data, len(mirrors))
+        self.mirrors = mirrors
+
+    def uniform(self, games: np.ndarray) -> np.ndarray:
+        return np.array([self.mirrors[game].random() for game in games], dtype=np.float64)
+
+
+def random_move(rng: random.Random, judger: Judger, seat: int) -> Tuple[int, List[Tuple[int, int, int]], str]:
+    """
+    Pick a random move, often firing at or near the other ships, sometimes invalid.
+
+    Args:
+        rng: Random generator of the moves
+        judger: Reference judger of the game
+        seat: Index of the player
+
+    Returns:
+        Tuple of the direction code, the missile targets and the move string
+    """
+    direction = rng.randrange(len(MOVE_NAMES))
+    targets = []
+    if rng.random() < 0.4:
+        for _ in range(rng.choice([1, 1, 2, 2, 3])):
+            other = rng.choice(judger.game_state.players).position
+            offset = rng.choice([(0, 0), (0, 0), (1, -1), (-1, 0), (30, 0)])
+            targets.append((other.q + offset[0], other.r + offset[1], other.s - offset[0] - offset[1]))
+    move = MOVE_NAMES[direction]
+    if targets:
+        move += f"\n{len(targets)}\n" + "\n".join(f"{q} {r} {s}" for q, r, s in targets)
+    return direction, targets, move
+
+
+def normalize(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Sort the cells of a state, which the two engines list in different orders, and drop the judge's seed."""
+    game_map = {key: value for key, value in state["map"].items() if key != "seed"}
+    return {**state, "map": {**game_map, "cells": sorted(game_map["cells"], key=lambda c: (c["q"], c["r"]))}}
+
+
+def check(map_data: Dict[str, Any], games: int, seed: int) -> int:
+    """
+    Play random games with both engines and compare them after every turn.
+
+    Args:
+        map_data: Map data from the JSON file
+        games: Number of games
+        seed: Seed of the random games
+
+    Returns:
+        Number of turns compared
+    """
+    judgers, mirrors = [], []
+    for game in range(games):
+        judger = Judger.from_map_data(map_data, seed=seed * 100003 + game)
+        zones = judger.game_state.map.geometry.start_zones
+        judger.validate_start_positions([
+            {"q": coord.q, "r": coord.r, "s": coord.s}
+            for coord in (judger.rng.choice(zones[team_id]) for team_id in (1, 2, 3))
+        ])
+        judgers.append(judger)
+        mirror = random.Random()
+        mirror.setstate(judger.rng.getstate())
+        mirrors.append(mirror)
+
+    simulator = MirroredSimulator(map_data, mirrors)
+    simulator.treasure_turns[:] = [judger.treasure_appearance_turn for judger in judgers]
+    simulator.start(np.array([[player.position.to_tuple() for player in judger.game_state.players]
+                              for judger in judgers]))
+
+    move_rng = random.Random(seed)
+    compared = 0
+    while not all(judger.check_game_end() for judger in judgers):
+        directions = np.zeros((games, 3), dtype=np.int64)
+        targets = np.zeros((games, 3, MAX_MISSILES_EACH_TURN, 3), dtype=np.int64)
+        target_counts = np.zeros((games, 3), dtype=np.int64)
+        for game, judger in enumerate(judgers):
+            if judger.check_game_end():
+                continue
+            moves = []
+            for seat in range(3):
+                direction, seat_targets, move = random_move(move_rng, judger, seat)
+                directions[game, seat] = direction
+                target_counts[game, seat] = len(seat_targets)
+                for slot, target in enumerate(seat_targets[:MAX_MISSILES_EACH_TURN]):
+                    targets[game, seat, slot] = target
+                moves.append(move)
+            judger.process_turn(moves)
+
+        simulator.step(directions, targets, target_counts)
+
+        for game, judger in enumerate(judgers):
+            expected = normalize(judger.export_game_state())
+            actual = normalize(simulator.to_dict(game))
+            if expected != actual:
+                raise AssertionError(f"Game {game} differs at turn {judger.game_state.turn}:\n"
+                                     f"judger: {expected}\nbatch:  {actual}")
+            compared += 1
+    return compared
+
+
+def benchmark(map_data: Dict[str, Any], batch: int, seed: int) -> Tuple[float, float]:
+    """
+    Measure turns per second of both engines playing random moves.
+
+    Args:
+        map_data: Map data from the JSON file
+        batch: Number of games of the batch simulator
+        seed: Seed of the random games
+
+    Returns:
+        Tuple of the judger and batch simulator turns per second
+    """
+    rng = random.Random(seed)
+    turns, start = 0, time.perf_counter()
+    while time.perf_counter() - start < 2:
+        judger = Judger.from_map_data(map_data, seed=rng.getrandbits(32))
+        judger.validate_start_positions([{"q": 0, "r": 0, "s": 0}] * 3)
+        while not judger.check_game_end():
+            judger.process_turn([rng.choice(MOVE_NAMES) for _ in range(3)])
+            turns += 1
+    judger_rate = turns / (time.perf_counter() - start)
+
+    simulator = BatchSimulator(map_data, batch, seed=seed)
+    simulator.start(np.zeros((batch, 3, 3), dtype=np.int64))
+    generator = np.random.default_rng(seed)
+    turns, start = 0, time.perf_counter()
+    while not simulator.done().all():
+        active = int((~simulator.done()).sum())
+        simulator.step(generator.integers(0, len(DIRECTIONS), size=(batch, 3)))
+        turns += active
+    batch_rate = turns / (time.perf_counter() - start)
+    return judger_rate, batch_rate
+
+
+def main():
+    """Main function of the check and benchmark."""
+    args = parse_args()
+    map_data = FileHandler().read_json(args.map)
+
+    try:
+        compared = check(map_data, args.games, args.seed)
+    except AssertionError as error:
+        print(error)
+        sys.exit(1)
+    print(f"{compared} game turns identical to the Judger")
+
+    judger_rate, batch_rate = benchmark(map_data, args.batch, args.seed)
+    print(f"Judger: {judger_rate:,.0f} turns/s, batch of {args.batch}: {batch_rate:,.0f} turns/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark of GameState.clone(), snapshot() and restore() against copy.deepcopy().
+
+The check plays random games and, at every turn, plays a few turns ahead
+on a clone and on the game itself after a snapshot, then verifies that
+the original game, the restored game and a deep copy agree. The benchmark
+measures how many clones, snapshots and restores run per second.
+
+Usage: python -m benchmarks.clone_state [--map examples/maps/map.json] [--games 20]
+"""
+import argparse
+import copy
+import random
+import sys
+import time
+from typing import Callable, List
+
+from judger.judger import Judger
+from judger.file_handler import FileHandler
+from models.direction import Direction
+from utils.constants import MAP_STORAGES
+
+MOVE_NAMES = [direction.name for direction in Direction]
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check and benchmark game state cloning")
+    parser.add_argument("--map", default="examples/maps/map.json", help="Path to the map JSON file")
+    parser.add_argument("--games", type=int, default=20, help="Number of games of the check")
+    parser.add_argument("--lookahead", type=int, default=3, help="Turns played ahead on every clone of the check")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random games")
+    return parser.parse_args()
+
+
+def random_moves(rng: random.Random, judger: Judger) -> List[str]:
+    """Pick a random move for every player, sometimes firing a missile at another ship."""
+    moves = []
+    for _ in judger.game_state.players:
+        move = rng.choice(MOVE_NAMES)
+        if rng.random() < 0.3:
+            target = rng.choice(judger.game_state.players).position
+            move += f"\n1\n{target.q} {target.r} {target.s}"
+        moves.append(move)
+    return moves
+
+
+def new_game(map_data, storage: str) -> Judger:
+    """Start a game with random start positions."""
+    judger = Judger.from_map_data(map_data, map_storage=storage)
+    judger.validate_start_positions([{"q": 0, "r": 0, "s": 0}] * len(judger.game_state.players))
+    return judger
+
+
+def check(map_data, storage: str, games: int, lookahead: int, seed: int) -> int:
+    """
+    Play random games, looking ahead on clones and snapshots at every turn.
+
+    Args:
+        map_data: Map data from the JSON file
+        storage: One of MAP_STORAGES
+        games: Number of games
+        lookahead: Turns played ahead
+        seed: Seed of the random games
+
+    Returns:
+        Number of turns checked
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    checked = 0
+    for _ in range(games):
+        judger = new_game(map_data, storage)
+        while not judger.check_game_end():
+            expected = judger.export_game_state()
+            inputs = judger.generate_agent_inputs()
+            deep = copy.deepcopy(judger.game_state)
+
+            # Play ahead on a clone, the game must not change
+            clone = judger.clone()
+            for _ in range(lookahead):
+                if not clone.check_game_end():
+                    clone.process_turn(random_moves(rng, clone))
+            if judger.export_game_state() != expected or judger.generate_agent_inputs() != inputs:
+                raise AssertionError(f"Playing a clone changed the game at turn {judger.game_state.turn}")
+
+            # Play ahead on the game itself, then restore it
+            snapshot = judger.game_state.snapshot()
+            for _ in range(lookahead):
+                if not judger.check_game_end():
+                    judger.process_turn(random_moves(rng, judger))
+            judger.game_state.restore(snapshot)
+            if judger.export_game_state() != expected or judger.generate_agent_inputs() != inputs:
+                raise AssertionError(f"Restoring a snapshot differs at turn {judger.game_state.turn}")
+            if deep.to_dict() != expected:
+                raise AssertionError(f"The deep copy differs at turn {judger.game_state.turn}")
+
+            judger.process_turn(random_moves(rng, judger))
+            checked += 1
+    return checked
+
+
+def rate(function: Callable[[], object], seconds: float = 1.0) -> float:
+    """
+    Measure calls per second of a function.
+
+    Args:
+        function: Function to call
+        seconds: Duration of the measurement
+
+    Returns:
+        Calls per second
+    """
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for _ in range(100):
+            function()
+        calls += 100
+    return calls / (time.perf_counter() - start)
+
+
+def main():
+    """Main function of the check and benchmark."""
+    args = parse_args()
+    map_data = FileHandler().read_json(args.map)
+
+    for storage in MAP_STORAGES:
+        try:
+            checked = check(map_data, storage, args.games, args.lookahead, args.seed)
+        except AssertionError as error:
+            print(f"{storage}: {error}")
+            sys.exit(1)
+        print(f"{storage}: {checked} turns of clones and snapshots identical to the game")
+
+    header = f"{'storage':>7} {'deepcopy/s':>11} {'clone/s':>10} {'snapshot/s':>11} {'restore/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for storage in MAP_STORAGES:
+        random.seed(args.seed)
+        judger = new_game(map_data, storage)
+        rng = random.Random(args.seed)
+        for _ in range(map_data["max_moves"] // 2):
+            judger.process_turn(random_moves(rng, judger))
+        game_state = judger.game_state
+        snapshot = game_state.snapshot()
+        print(f"{storage:>7} {rate(lambda: copy.deepcopy(game_state), 0.5):>11,.0f} {rate(game_state.clone):>10,.0f} "
+              f"{rate(game_state.snapshot):>11,.0f} {rate(lambda: game_state.restore(snapshot)):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark of log archives against game log files.
+
+The check plays random games, packs their logs into an archive and verifies
+that every match, and every turn read on its own, holds the states of the
+log. The benchmark compares the disk size of the logs as full JSON, gzip
+JSON and in archives of growing block sizes, and the time to read the
+last turn of a block from the archive against loading the gzip log.
+
+Usage: python -m benchmarks.log_archive [--block_turns 10 25 50 100]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.player_scaling import random_map, random_moves
+from judger.judger import Judger
+from judger.game_log import load_history
+from judger.log_archive import LogArchive, LogArchiveWriter
+from utils.constants import ARCHIVE_COMPRESSIONS
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check and benchmark log archives")
+    parser.add_argument("--block_turns", type=int, nargs="+", default=[10, 25, 50, 100], help="Block sizes of the benchmark")
+    parser.add_argument("--games", type=int, default=5, help="Number of games")
+    parser.add_argument("--radius", type=int, default=20, help="Map radius of the games")
+    parser.add_argument("--moves", type=int, default=200, help="Turns of the games")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random games")
+    return parser.parse_args()
+
+
+def play(rng: random.Random, radius: int, moves: int, seed: int) -> List[Dict[str, Any]]:
+    """
+    Play a random game.
+
+    Returns:
+        Game states of every turn
+    """
+    judger = Judger.from_map_data(random_map(rng, radius, moves, gold=0.3), seed=seed)
+    judger.validate_start_positions([{"q": 0, "r": 0, "s": 0}] * len(judger.game_state.players))
+    history = [judger.game_state.to_dict()]
+    while not judger.check_game_end():
+        judger.process_turn(random_moves(rng, judger))
+        history.append(judger.game_state.to_dict())
+    return history
+
+
+def normalized(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Sort the cells of a state, whose order is not kept by delta frames."""
+    cells = sorted(state["map"]["cells"], key=lambda cell: (cell["q"], cell["r"]))
+    return {**state, "map": {**state["map"], "cells": cells}}
+
+
+def check(archive_path: str, histories: Dict[str, List[Dict[str, Any]]]):
+    """
+    Verify that an archive holds the states of every game.
+
+    Raises:
+        AssertionError: If a match or a turn differs
+    """
+    with LogArchive(archive_path) as archive:
+        for name, history in histories.items():
+            if [normalized(state) for state in archive.iter_history(name)] != [normalized(state) for state in history]:
+                raise AssertionError(f"Match {name} differs")
+            for turn in range(0, len(history), 7):
+                if normalized(archive.state(name, turn)) != normalized(history[turn]):
+                    raise AssertionError(f"Match {name} turn {turn} differs")
+
+
+def best_time(function, repeat: int = 5) -> float:
+    """Fastest of several runs of a function, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """Main function of the check and benchmark."""
+    args = parse_args()
+    rng = random.Random(args.seed)
+    histories = {f"game_{game}": play(rng, args.radius, args.moves, args.seed + game) for game in range(args.games)}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        gzip_path = os.path.join(work_dir, "game_0.json.gz")
+        with gzip.open(gzip_path, "wt", encoding="utf-8") as f:
+            json.dump(histories["game_0"], f)
+        full_size = sum(len(json.dumps(history)) for history in histories.values())
+        gzip_size = sum(len(gzip.compress(json.dumps(history).encode())) for history in histories.values())
+        load_time = best_time(lambda: load_history(gzip_path)[len(histories["game_0"]) // 2])
+        print(f"{args.games} games of {sum(map(len, histories.values())) // args.games} turns on average, radius {args.radius}")
+        print(f"full JSON {full_size:,} B, gzip JSON {gzip_size:,} B, one turn from the gzip log in {load_time * 1e3:,.1f} ms")
+
+        header = f"{'compression':>11} {'block turns':>11} {'archive B':>10} {'pack s':>7} {'one turn ms':>12}"
+        print(header)
+        print("-" * len(header))
+        for compression in ARCHIVE_COMPRESSIONS:
+            for block_turns in args.block_turns:
+                archive_path = os.path.join(work_dir, f"{compression}_{block_turns}.bwla")
+                start = time.perf_counter()
+                with LogArchiveWriter(archive_path, compression, block_turns) as writer:
+                    for name, history in histories.items():
+                        writer.add_history(name, history)
+                pack_time = time.perf_counter() - start
+                try:
+                    check(archive_path, histories)
+                except AssertionError as error:
+                    print(error)
+                    sys.exit(1)
+
+                def read_turn():
+                    # Last turn of a block, whose deltas are all applied
+                    with LogArchive(archive_path) as archive:
+                        archive.state("game_0", min(len(histories["game_0"]), 2 * block_turns) - 1)
+                print(f"{compression:>11} {block_turns:>11} {os.path.getsize(archive_path):>10,} "
+                      f"{pack_time:>7.2f} {best_time(read_turn) * 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the dictionary map against the dense map.
+
+Usage: python -m benchmarks.map_storage [--radii 10 25 50 100] [--lookups 100000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Callable, List
+
+from models.coordinate import Coordinate
+from models.dense_map import create_map
+from items.gold import gold
+from items.shield import SHIELD
+from items.danger import DANGER
+from utils.constants import MAP_STORAGES
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Compare the map storages")
+    parser.add_argument("--radii", type=int, nargs="+", default=[10, 25, 50, 100], help="Map radii to benchmark")
+    parser.add_argument("--lookups", type=int, default=100000, help="Number of cell lookups per measurement")
+    parser.add_argument("--density", type=float, default=0.3, help="Fraction of cells holding an item")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per measurement, the best one is reported")
+    return parser.parse_args()
+
+
+def all_coordinates(radius: int) -> List[Coordinate]:
+    """
+    List every coordinate of a map.
+
+    Args:
+        radius: Radius of the map
+
+    Returns:
+        List of coordinates
+    """
+    return [Coordinate(q, r, -q - r)
+            for q in range(-radius, radius + 1)
+            for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1)]
+
+
+def best_time(function: Callable[[], None], repeat: int) -> float:
+    """
+    Time a function.
+
+    Args:
+        function: Function to time
+        repeat: Number of runs
+
+    Returns:
+        Fastest run in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(storage: str, radius: int, args) -> dict:
+    """
+    Measure one map storage at one radius.
+
+    Args:
+        storage: One of MAP_STORAGES
+        radius: Radius of the map
+        args: Command line arguments
+
+    Returns:
+        Dictionary of measurements
+    """
+    rng = random.Random(radius)
+    coords = all_coordinates(radius)
+    filled = rng.sample(coords, int(len(coords) * args.density))
+    items = [rng.choice([gold(rng.randint(1, 6)), SHIELD, DANGER]) for _ in filled]
+    # Fresh coordinate objects, as the judger builds them for every lookup
+    lookups = [Coordinate(c.q, c.r, c.s) for c in rng.choices(coords, k=args.lookups)]
+
+    def build():
+        game_map = create_map(radius, storage)
+        for coord, item in zip(filled, items):
+            game_map.add_item(coord, item)
+        return game_map
+
+    game_map = build()
+
+    def lookup():
+        for coord in lookups:
+            game_map.get_cell(coord).is_empty()
+
+    def neighbors():
+        for coord in lookups[:args.lookups // 10]:
+            game_map.get_neighbors(coord)
+
+    def serialize():
+        game_map.to_dict_list()
+
+    tracemalloc.start()
+    measured = build()
+    before = tracemalloc.get_traced_memory()[0]
+    for coord in lookups:
+        measured.get_cell(coord)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return {
+        "build_ms": best_time(build, args.repeat) * 1000,
+        "lookup_ns": best_time(lookup, args.repeat) / len(lookups) * 1e9,
+        "neighbors_us": best_time(neighbors, args.repeat) / max(1, args.lookups // 10) * 1e6,
+        "serialize_ms": best_time(serialize, args.repeat) * 1000,
+        "lookup_growth_kib": grown / 1024
+    }
+
+
+def main():
+    """Main function of the benchmark."""
+    args = parse_args()
+    header = f"{'radius':>6} {'storage':>7} {'build ms':>9} {'lookup ns':>10} {'neighbors us':>13} {'serialize ms':>13} {'growth KiB':>11}"
+    print(header)
+    print("-" * len(header))
+    for radius in args.radii:
+        for storage in MAP_STORAGES:
+            result = benchmark(storage, radius, args)
+            print(f"{radius:>6} {storage:>7} {result['build_ms']:>9.2f} {result['lookup_ns']:>10.0f} "
+                  f"{result['neighbors_us']:>13.2f} {result['serialize_ms']:>13.2f} {result['lookup_growth_kib']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
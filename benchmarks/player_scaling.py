@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark of the judge with many players.
+
+The check plays random games with many ships on a small map, so that ships
+often meet, and verifies at every turn that the collision check, and both
+of its methods, sink the same ships as a plain comparison of every two
+ships. The benchmark measures turns per second and the time of both
+methods for growing numbers of players on a large map; the judge compares
+every two ships up to PAIRWISE_COLLISION_PLAYERS ships and counts them
+above.
+
+Usage: python -m benchmarks.player_scaling [--radius 40] [--players 3 6 12 30 60]
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List, Set
+
+from judger.judger import Judger
+from models.direction import Direction
+from models.player import Player
+from utils.constants import PAIRWISE_COLLISION_PLAYERS
+
+MOVE_NAMES = [direction.name for direction in Direction]
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check and benchmark the judge with many players")
+    parser.add_argument("--radius", type=int, default=40, help="Radius of the benchmark map")
+    parser.add_argument("--players", type=int, nargs="+", default=[3, 6, 12, 30, 60],
+                        help="Numbers of players of the benchmark")
+    parser.add_argument("--turns", type=int, default=200, help="Turns of every benchmark game")
+    parser.add_argument("--games", type=int, default=50, help="Number of games of the check")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random games")
+    return parser.parse_args()
+
+
+def random_map(rng: random.Random, radius: int, max_moves: int, gold: float = 0.1) -> Dict[str, Any]:
+    """Make the data of a map with gold on a share of its cells."""
+    cells = []
+    for q in range(-radius, radius + 1):
+        for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1):
+            if (q, r) != (0, 0) and rng.random() < gold:
+                cells.append({"q": q, "r": r, "s": -q - r, "value": rng.randint(1, 10)})
+    return {"map_radius": radius, "max_moves": max_moves, "cells": cells}
+
+
+def random_moves(rng: random.Random, judger: Judger) -> List[str]:
+    """Pick a random move for every player, sometimes firing a missile at another ship."""
+    moves = []
+    for _ in judger.game_state.players:
+        move = rng.choice(MOVE_NAMES)
+        if rng.random() < 0.2:
+            target = rng.choice(judger.game_state.players).position
+            move += f"\n1\n{target.q} {target.r} {target.s}"
+        moves.append(move)
+    return moves
+
+
+def pairwise_collisions(players: List[Player]) -> Set[int]:
+    """
+    Find the live ships that collide by comparing every two ships.
+
+    Args:
+        players: Players after their move
+
+    Returns:
+        Indices of the ships that sink
+    """
+    sunk = set()
+    for idx, player in enumerate(players):
+        if not player.alive:
+            continue
+        for other_idx, other in enumerate(players):
+            if idx == other_idx:
+                continue
+            if player.position == other.position:
+                sunk.add(idx)
+            elif other.previous_position and player.position == other.previous_position \
+                    and player.previous_position == other.position:
+                sunk.add(idx)
+    return sunk
+
+
+def new_game(map_data: Dict[str, Any], num_players: int, seed: int) -> Judger:
+    """Start a game with random start positions."""
+    judger = Judger.from_map_data(map_data, seed=seed, num_players=num_players)
+    judger.validate_start_positions([{"q": 0, "r": 0, "s": 0}] * num_players)
+    return judger
+
+
+def check(games: int, seed: int) -> int:
+    """
+    Play random crowded games, comparing every collision check with the pairwise one.
+
+    Args:
+        games: Number of games
+        seed: Seed of the random games
+
+    Returns:
+        Number of turns checked
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for game in range(games):
+        num_players = rng.choice([3, 4, 6, 12])
+        judger = new_game(random_map(rng, 5, 60), num_players, seed + game)
+        check_collisions = judger.check_collisions
+
+        def compare():
+            players = judger.game_state.players
+            alive = [player.alive for player in players]
+            expected = pairwise_collisions(players)
+            for method in (Judger.pairwise_collisions, Judger.counted_collisions):
+                if set(method(players)) != expected:
+                    raise AssertionError(f"Game {game} turn {judger.game_state.turn}: {method.__name__} "
+                                         f"sank {sorted(method(players))} instead of {sorted(expected)}")
+            check_collisions()
+            sunk = {idx for idx, player in enumerate(players) if alive[idx] and not player.alive}
+            if sunk != expected:
+                raise AssertionError(f"Game {game} turn {judger.game_state.turn}: "
+                                     f"sank {sorted(sunk)} instead of {sorted(expected)}")
+
+        judger.check_collisions = compare
+        while not judger.check_game_end():
+            judger.process_turn(random_moves(rng, judger))
+            checked += 1
+    return checked
+
+
+def measure(map_data: Dict[str, Any], num_players: int, turns: int, seed: int) -> Dict[str, float]:
+    """
+    Play a random game and time it.
+
+    Args:
+        map_data: Map data
+        num_players: Number of players
+        turns: Number of turns to play
+        seed: Seed of the game
+
+    Returns:
+        Turns per second, and microseconds per pairwise and per counted collision check
+    """
+    rng = random.Random(seed)
+    judger = new_game(map_data, num_players, seed)
+    all_moves = [random_moves(rng, judger) for _ in range(turns)]
+    played = 0
+    start = time.perf_counter()
+    for moves in all_moves:
+        if judger.check_game_end():
+            break
+        judger.process_turn(moves)
+        played += 1
+    elapsed = time.perf_counter() - start
+
+    # Time both collision checks on the final positions, with every ship alive again
+    players = judger.game_state.players
+    for player in players:
+        player.alive = True
+    timings = {"turns": played / elapsed}
+    for name, function in (("pairwise", Judger.pairwise_collisions), ("counted", Judger.counted_collisions)):
+        calls, check_start = 0, time.perf_counter()
+        while time.perf_counter() - check_start < 0.3:
+            function(players)
+            calls += 1
+        timings[name] = (time.perf_counter() - check_start) / calls * 1e6
+    return timings
+
+
+def main():
+    """Main function of the check and benchmark."""
+    args = parse_args()
+    try:
+        checked = check(args.games, args.seed)
+    except AssertionError as error:
+        print(error)
+        sys.exit(1)
+    print(f"{checked} turns of collisions identical to the pairwise check")
+
+    map_data = random_map(random.Random(args.seed), args.radius, args.turns)
+    header = f"{'players':>7} {'turns/s':>9} {'pairwise us':>12} {'counted us':>11} {'used':>9}"
+    print(header)
+    print("-" * len(header))
+    for num_players in args.players:
+        result = measure(map_data, num_players, args.turns, args.seed)
+        used = "pairwise" if num_players <= PAIRWISE_COLLISION_PLAYERS else "counted"
+        print(f"{num_players:>7} {result['turns']:>9,.0f} {result['pairwise']:>12,.1f} {result['counted']:>11,.1f} {used:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -116,7 +116,7 @@ def main():
         tokens = read_tokens(fin)
         if len(tokens) < 3:
             return
-        N, K, P = map(int, tokens)
+        N, K, P = map(int, tokens[:3])
 
         if P == 0:
             # Phase: choose starting position
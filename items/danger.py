@@ -2,14 +2,19 @@
 """
 Danger item module for the "botwar ship" game.
 """
-from items.item import Item
+from items.item import Item, KIND_DANGER
 
 
 class Danger(Item):
     """
     Danger item that causes ships to sink if they don't have a shield.
+    Dangers have no state, every cell holds the DANGER instance.
     """
 
+    __slots__ = ()
+
+    kind = KIND_DANGER
+
     def apply_effect(self, player, map_obj):
         """
         Apply the danger's effect when a player moves onto it.
@@ -23,3 +28,6 @@ class Danger(Item):
                 # Player hit danger without a shield, ship sinks
                 player.alive = False
         return self
+
+
+DANGER = Danger()
@@ -2,15 +2,20 @@
 """
 Gold item module for the "botwar ship" game.
 """
-from items.item import Item
-from utils.constants import MIN_GOLD_VALUE, MAX_GOLD_VALUE
+from items.item import Item, KIND_GOLD
+from utils.constants import MIN_GOLD_VALUE, MAX_GOLD_VALUE, SHARED_GOLD_VALUES
 
 
 class Gold(Item):
     """
-    Gold item that can be collected by players.
+    Gold item that can be collected by players. Use gold() to get one, it
+    shares the items of small values.
     """
 
+    __slots__ = ("value",)
+
+    kind = KIND_GOLD
+
     def __init__(self, value: int):
         """
         Initialize a gold item with the specified value.
@@ -31,3 +36,22 @@ class Gold(Item):
         if player.alive:
             player.collect_gold(self.value)
         return None
+
+
+# Gold items of the values up to SHARED_GOLD_VALUES, shared by every cell holding that much gold
+_SHARED_GOLD = [Gold(value) for value in range(SHARED_GOLD_VALUES + 1)]
+
+
+def gold(value: int) -> Gold:
+    """
+    Get a gold item of a value.
+
+    Args:
+        value: Value of the gold
+
+    Returns:
+        The shared item of that value if there is one, a new item otherwise
+    """
+    if 0 <= value <= SHARED_GOLD_VALUES:
+        return _SHARED_GOLD[value]
+    return Gold(value)
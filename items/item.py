@@ -4,12 +4,29 @@ Item base class module for the "botwar ship" game.
 """
 from abc import ABC, abstractmethod
 
+# Item kind codes, the kind of an empty cell first
+KIND_EMPTY = 0
+KIND_GOLD = 1
+KIND_SHIELD = 2
+KIND_DANGER = 3
+KIND_TREASURE = 4
+
 
 class Item(ABC):
     """
     Abstract base class for all items in the game.
+
+    Every item class has a kind code and every item a value, 0 for items
+    without one, so that code handling items looks them up in tables by
+    kind. Items are never modified after they are created, which lets
+    cells share them.
     """
 
+    __slots__ = ()
+
+    kind = KIND_EMPTY
+    value = 0
+
     @abstractmethod
     def apply_effect(self, player, map_obj) -> 'Item':
         """
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Item kinds module for the "botwar ship" game.
+
+Tables indexed by item kind code, so that handling an item is a lookup on
+its kind rather than a chain of type checks.
+"""
+from typing import Any, Optional
+
+from items.item import Item, KIND_EMPTY, KIND_GOLD, KIND_SHIELD, KIND_DANGER, KIND_TREASURE
+from items.gold import gold
+from items.shield import SHIELD
+from items.danger import DANGER
+from items.treasure import Treasure
+
+# Map file and agent input symbol of the kinds without a value
+KIND_SYMBOLS = {KIND_SHIELD: "S", KIND_DANGER: "D"}
+
+# Shared item of every symbol
+SYMBOL_ITEMS = {"S": SHIELD, "D": DANGER}
+
+# Kinds whose value a ship collects as gold
+GOLD_KINDS = (KIND_GOLD, KIND_TREASURE)
+
+# Item of a value for every kind of cell that lost gold may fall on, the kind is kept
+GOLD_ITEMS = {KIND_EMPTY: gold, KIND_GOLD: gold, KIND_TREASURE: Treasure}
+
+
+def kind_of(item: Optional[Item]) -> int:
+    """
+    Get the kind code of an item.
+
+    Args:
+        item: The item, or None
+
+    Returns:
+        One of the KIND_* constants
+    """
+    return KIND_EMPTY if item is None else item.kind
+
+
+def item_value(item: Optional[Item]) -> Any:
+    """
+    Get the value representation of an item in map files, logs and agent input.
+
+    Args:
+        item: The item, or None
+
+    Returns:
+        The symbol of a shield or danger, the value of gold or treasure, 0 for no item
+    """
+    if item is None:
+        return 0
+    return KIND_SYMBOLS.get(item.kind, item.value)
+
+
+def item_from_value(value: Any) -> Optional[Item]:
+    """
+    Get the item of a map file value.
+
+    Args:
+        value: Gold value, or "S" or "D"
+
+    Returns:
+        The item, or None if the value holds no item
+    """
+    if isinstance(value, int) and value > 0:
+        return gold(value)
+    return SYMBOL_ITEMS.get(value)
@@ -2,14 +2,19 @@
 """
 Shield item module for the "botwar ship" game.
 """
-from items.item import Item
+from items.item import Item, KIND_SHIELD
 
 
 class Shield(Item):
     """
-    Shield item that provides protection from danger cells.
+    Shield item that provides protection from danger cells. Shields have no
+    state, every cell holds the SHIELD instance.
     """
 
+    __slots__ = ()
+
+    kind = KIND_SHIELD
+
     def apply_effect(self, player, map_obj):
         """
         Apply the shield's effect when a player moves onto it.
@@ -21,3 +26,6 @@ class Shield(Item):
         if player.alive:
             player.equip_shield()
         return None
+
+
+SHIELD = Shield()
@@ -2,7 +2,7 @@
 """
 Treasure item module for the "botwar ship" game.
 """
-from items.item import Item
+from items.item import Item, KIND_TREASURE
 
 
 class Treasure(Item):
@@ -10,6 +10,10 @@ class Treasure(Item):
     Treasure item with a special high value that appears at the center.
     """
 
+    __slots__ = ("value",)
+
+    kind = KIND_TREASURE
+
     def __init__(self, value: int):
         """
         Initialize a treasure item with the specified value.
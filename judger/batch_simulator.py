@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Batch simulator module for the "botwar ship" game.
+
+BatchSimulator plays B games on the same map in lockstep, holding every
+game as NumPy arrays instead of objects, for map balancing and agent
+training where millions of games are needed. It follows the rules of
+judger/judger.py exactly; benchmarks/batch_simulator.py checks it turn by
+turn against the reference Judger.
+
+Requires NumPy.
+"""
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from models.direction import Direction
+from items.item import KIND_EMPTY, KIND_GOLD, KIND_SHIELD, KIND_DANGER, KIND_TREASURE
+from items.kinds import KIND_SYMBOLS, item_from_value
+from models.geometry import get_geometry
+from utils.constants import MAX_MISSILES, MAX_MISSILES_EACH_TURN, MISSILE_DAMAGE_ONE, MISSILE_DAMAGE_TWO
+from utils.constants import TREASURE_MIN_THRESHOLD, TREASURE_MAX_THRESHOLD, TREASURE_MIN_VALUE
+from utils.constants import TREASURE_VALUE_DIVISOR, GOLD_DISTRIBUTION_RADIUS
+
+# Direction codes used in the directions array of step()
+DIRECTIONS = list(Direction)
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+class BatchSimulator:
+    """
+    BatchSimulator holds B games as arrays: the item kind and value of every
+    cell, and the position, gold, shield, missiles and alive flag of every
+    player. Every phase of a turn (movement, collisions, treasure, item
+    effects, missiles and the distribution of lost gold) is one vectorized
+    step over all games that have not ended.
+
+    Cells are numbered like in HexGeometry. Random decisions are drawn from
+    a numpy Generator; override uniform() to supply them from elsewhere.
+    """
+
+    def __init__(self, map_data: Dict[str, Any], batch_size: int, num_players: int = 3,
+                 seed: Optional[int] = None):
+        """
+        Initialize B games on a map, before the start positions are chosen.
+
+        Args:
+            map_data: Map data from the JSON file
+            batch_size: Number of games B
+            num_players: Number of players per game
+            seed: Seed of the random generator
+        """
+        if "max_moves" not in map_data:
+            raise ValueError("Required parameter 'max_moves' not found in map file")
+        if "map_radius" not in map_data:
+            raise ValueError("Required parameter 'map_radius' not found in map file")
+
+        self.map_data = map_data
+        self.batch_size = batch_size
+        self.num_players = num_players
+        self.max_moves = map_data["max_moves"]
+        self.radius = map_data["map_radius"]
+        self.rng = np.random.default_rng(seed)
+
+        geometry = get_geometry(self.radius)
+        self.geometry = geometry
+        size = geometry.size
+        self.center = geometry.index_of(0, 0)
+        self.in_map = np.frombuffer(bytes(geometry.valid), dtype=np.uint8).astype(bool)
+        # Neighbor of every cell in every direction (rows in DIRECTIONS order), the cell itself where it leaves the map
+        steps = np.array([geometry.steps[direction] for direction in DIRECTIONS], dtype=np.int64)
+        self.steps = np.where(steps >= 0, steps, np.arange(size))
+        # Cells within GOLD_DISTRIBUTION_RADIUS of every cell, in the order the judger visits them, -1 padded
+        area = np.full((size, self._area_size()), -1, dtype=np.int64)
+        for coord in geometry.cells:
+            index = geometry.index_of(coord.q, coord.r)
+            cells = [geometry.index_of(c.q, c.r) for c in geometry.area(coord, GOLD_DISTRIBUTION_RADIUS)]
+            area[index, :len(cells)] = cells
+        self.area = area
+        start_masks = geometry.zones(num_players)[1]
+        self.start_masks = np.array(
+            [np.frombuffer(bytes(start_masks[team_id]), dtype=np.uint8)
+             for team_id in range(1, num_players + 1)], dtype=bool)
+
+        # Initial items of the map
+        kinds = np.zeros(size, dtype=np.int8)
+        values = np.zeros(size, dtype=np.int64)
+        for cell_data in map_data.get("cells", []):
+            q = cell_data.get("q", 0)
+            r = cell_data.get("r", 0)
+            s = cell_data.get("s", 0)
+            value = cell_data.get("value", 0)
+            index = geometry.index(q, r)
+            if q + r + s != 0 or index < 0:
+                continue
+            item = item_from_value(value)
+            if item is not None:
+                kinds[index], values[index] = item.kind, item.value
+
+        shape = (batch_size, num_players)
+        self.kinds = np.tile(kinds, (batch_size, 1))  # Item kind of every cell, see KIND_*
+        self.values = np.tile(values, (batch_size, 1))  # Gold or treasure value of every cell
+        self.positions = np.full(shape, self.center, dtype=np.int64)
+        self.previous_positions = np.full(shape, self.center, dtype=np.int64)
+        self.gold = np.zeros(shape, dtype=np.int64)
+        self.shield = np.zeros(shape, dtype=bool)
+        self.alive = np.ones(shape, dtype=bool)
+        self.missiles = np.full(shape, MAX_MISSILES, dtype=np.int64)
+        # Valid missile targets of the last turn, as cell indices, and how many there are
+        self.missiles_fired = np.zeros(shape + (MAX_MISSILES_EACH_TURN,), dtype=np.int64)
+        self.missiles_fired_count = np.zeros(shape, dtype=np.int64)
+        self.turn = np.zeros(batch_size, dtype=np.int64)
+        self.moves_left = np.full(batch_size, self.max_moves, dtype=np.int64)
+        self.treasure_appeared = np.zeros(batch_size, dtype=bool)
+        self.treasure_remaining = np.zeros(batch_size, dtype=bool)
+        self.started = False
+
+        # Random treasure appearance turn
+        min_threshold = math.ceil(self.max_moves * TREASURE_MIN_THRESHOLD)
+        max_threshold = math.floor(self.max_moves * TREASURE_MAX_THRESHOLD)
+        self.treasure_turns = self.rng.integers(min_threshold, max_threshold + 1, size=batch_size)
+
+    @staticmethod
+    def _area_size() -> int:
+        """Number of cells within GOLD_DISTRIBUTION_RADIUS of a cell, without the cell itself."""
+        return 3 * GOLD_DISTRIBUTION_RADIUS * (GOLD_DISTRIBUTION_RADIUS + 1)
+
+    def uniform(self, games: np.ndarray) -> np.ndarray:
+        """
+        Draw uniform random numbers in [0, 1).
+
+        Args:
+            games: Game index of every number to draw, in the order the
+                judger would draw them within each game
+
+        Returns:
+            One number per entry of games
+        """
+        return self.rng.random(len(games))
+
+    def index(self, coords: np.ndarray) -> np.ndarray:
+        """
+        Get the cell index of cube coordinates.
+
+        Args:
+            coords: Array of shape (..., 3) of q, r, s
+
+        Returns:
+            Array of cell indices, -1 for coordinates outside the map
+        """
+        q, r, s = coords[..., 0], coords[..., 1], coords[..., 2]
+        radius = self.radius
+        valid = (q + r + s == 0) & (np.abs(q) <= radius) & (np.abs(r) <= radius) & (np.abs(s) <= radius)
+        return np.where(valid, (q + radius) * self.geometry.width + (r + radius), -1)
+
+    def done(self) -> np.ndarray:
+        """
+        Check which games have ended (all ships sunk or max moves reached).
+
+        Returns:
+            Boolean array of shape (B,)
+        """
+        return (self.moves_left <= 0) | ~self.alive.any(axis=1)
+
+    def start(self, positions: np.ndarray):
+        """
+        Validate the starting positions chosen by the agents and start the
+        games. Invalid positions are replaced by a random empty cell of the
+        team's start zone.
+
+        Args:
+            positions: Array of shape (B, P, 3) of q, r, s
+        """
+        games = np.arange(self.batch_size)[:, None]
+        indices = self.index(np.asarray(positions))
+        safe = np.maximum(indices, 0)
+        valid = (indices >= 0) & self.start_masks[np.arange(self.num_players), safe] & \
+            (self.kinds[games, safe] == KIND_EMPTY)
+
+        for game, player in zip(*np.nonzero(~valid)):
+            empty = self.start_masks[player] & (self.kinds[game] == KIND_EMPTY)
+            indices[game, player] = self.rng.choice(np.flatnonzero(empty))
+
+        self.positions[:] = indices
+        self.previous_positions[:] = self.center
+        self.started = True
+
+    def step(self, directions: np.ndarray, targets: Optional[np.ndarray] = None,
+             target_counts: Optional[np.ndarray] = None):
+        """
+        Play one turn of every game that has not ended.
+
+        Args:
+            directions: Array of shape (B, P) of direction codes (index into DIRECTIONS)
+            targets: Array of shape (B, P, MAX_MISSILES_EACH_TURN, 3) of missile targets
+            target_counts: Array of shape (B, P) of the number of targets each
+                player fired at; above MAX_MISSILES_EACH_TURN the move fires nothing
+        """
+        active = ~self.done()
+        live = self.alive & active[:, None]
+
+        # 1. Move all players
+        self.moves_left -= active
+        self.turn += active
+        directions = np.asarray(directions)
+        self.previous_positions = np.where(live, self.positions, self.previous_positions)
+        self.positions = np.where(live, self.steps[directions, self.positions], self.positions)
+
+        # 2. Check for collisions
+        self._check_collisions(live)
+
+        # 3. Check for treasure appearance
+        self._check_treasure_appearance(active)
+
+        # 4. Apply item effects
+        self._apply_item_effects(active)
+
+        # 5. Handle missiles
+        if targets is None:
+            targets = np.zeros((self.batch_size, self.num_players, MAX_MISSILES_EACH_TURN, 3), dtype=np.int64)
+            target_counts = np.zeros((self.batch_size, self.num_players), dtype=np.int64)
+        self._handle_missiles(active, np.asarray(targets), np.asarray(target_counts))
+
+        # 6. Apply item effects after missiles
+        self._apply_item_effects(active)
+
+    def _check_collisions(self, live: np.ndarray):
+        """
+        Sink the live ships that share a cell with any other ship, sunk or
+        not, or that swapped cells with another ship.
+
+        Args:
+            live: Boolean array of shape (B, P) of the players that moved this turn
+        """
+        positions = self.positions
+        previous = self.previous_positions
+        others = ~np.eye(self.num_players, dtype=bool)
+        same = (positions[:, :, None] == positions[:, None, :]) & others
+        swapped = (positions[:, :, None] == previous[:, None, :]) & \
+            (previous[:, :, None] == positions[:, None, :]) & others
+        self.alive &= ~(live & (same | swapped).any(axis=2))
+
+    def _check_treasure_appearance(self, active: np.ndarray):
+        """
+        Place the treasure at the center of the games that reached their
+        treasure appearance turn.
+
+        Args:
+            active: Boolean array of shape (B,) of the games being played
+        """
+        appear = active & ~self.treasure_appeared & (self.turn == self.treasure_turns)
+        if not appear.any():
+            return
+        center = self.center
+        value = np.maximum(self.gold.sum(axis=1) // TREASURE_VALUE_DIVISOR, TREASURE_MIN_VALUE)
+        value = value + np.where(self.kinds[:, center] == KIND_GOLD, self.values[:, center], 0)
+        self.kinds[:, center] = np.where(appear, KIND_TREASURE, self.kinds[:, center])
+        self.values[:, center] = np.where(appear, value, self.values[:, center])
+        self.treasure_appeared |= appear
+        self.treasure_remaining |= appear
+
+    def _apply_item_effects(self, active: np.ndarray):
+        """
+        Apply the effects of the items under the live ships. After collisions
+        no two live ships share a cell, so the ships are independent.
+
+        Args:
+            active: Boolean array of shape (B,) of the games being played
+        """
+        live = self.alive & active[:, None]
+        games = np.arange(self.batch_size)[:, None]
+        positions = self.positions
+        kinds = self.kinds[games, positions]
+        values = self.values[games, positions]
+
+        collect = live & ((kinds == KIND_GOLD) | (kinds == KIND_TREASURE))
+        equip = live & (kinds == KIND_SHIELD)
+        sink = live & (kinds == KIND_DANGER) & ~self.shield
+
+        self.treasure_remaining &= ~(live & (kinds == KIND_TREASURE)).any(axis=1)
+        self.gold += np.where(collect, values, 0)
+        self.shield |= equip
+        self.alive &= ~sink
+
+        taken = collect | equip
+        game_index, player_index = np.nonzero(taken)
+        cells = positions[game_index, player_index]
+        self.kinds[game_index, cells] = KIND_EMPTY
+        self.values[game_index, cells] = 0
+
+    def _handle_missiles(self, active: np.ndarray, targets: np.ndarray, target_counts: np.ndarray):
+        """
+        Fire the valid missiles and apply their hits, including to sunk ships.
+
+        Args:
+            active: Boolean array of shape (B,) of the games being played
+            targets: Array of shape (B, P, MAX_MISSILES_EACH_TURN, 3) of missile targets
+            target_counts: Array of shape (B, P) of the number of targets of each player
+        """
+        slots = np.arange(MAX_MISSILES_EACH_TURN)
+        counts = np.minimum(target_counts, MAX_MISSILES_EACH_TURN)
+        used = slots < counts[:, :, None]
+        cells = self.index(targets)
+
+        # A move fires all of its missiles or none of them
+        valid_target = (cells >= 0) & (cells != self.positions[:, :, None])
+        fired = self.alive & active[:, None] & (target_counts > 0) & \
+            (target_counts <= MAX_MISSILES_EACH_TURN) & (self.missiles >= target_counts) & \
+            (valid_target | ~used).all(axis=2)
+        self.missiles -= np.where(fired, target_counts, 0)
+        self.missiles_fired_count = np.where(fired, target_counts, 0)
+        self.missiles_fired = np.where(fired[:, :, None] & used, cells, 0)
+
+        # Hits on every ship, sunk or not
+        hit_cells = np.where(fired[:, :, None] & used, cells, -1).reshape(self.batch_size, -1)
+        hits = (self.positions[:, :, None] == hit_cells[:, None, :]).sum(axis=2)
+        percentage = np.where(hits == 1, MISSILE_DAMAGE_ONE, MISSILE_DAMAGE_TWO)
+        gold_lost = np.where(hits > 0, np.ceil(self.gold * percentage).astype(np.int64), 0)
+        self.gold -= gold_lost
+
+        self._distribute_lost_gold(gold_lost)
+
+    def _distribute_lost_gold(self, gold_lost: np.ndarray):
+        """
+        Distribute lost gold one unit at a time to random cells near the ships
+        that lost it, like random.choices over the cells the judger collects.
+
+        Args:
+            gold_lost: Array of shape (B, P) of the gold each ship lost
+        """
+        game_index, player_index = np.nonzero(gold_lost > 0)
+        if len(game_index) == 0:
+            return
+
+        # Cells that may receive gold: inside the map, empty or holding gold or treasure
+        area = self.area[self.positions[game_index, player_index]]
+        kinds = self.kinds[game_index[:, None], np.maximum(area, 0)]
+        receives = (area >= 0) & ((kinds == KIND_EMPTY) | (kinds == KIND_GOLD) | (kinds == KIND_TREASURE))
+        receivers = receives.sum(axis=1)
+
+        amounts = np.where(receivers > 0, gold_lost[game_index, player_index], 0)
+        loss = np.repeat(np.arange(len(game_index)), amounts)
+        if len(loss) == 0:
+            return
+        games = game_index[loss]
+        choice = np.floor(self.uniform(games) * receivers[loss].astype(np.float64)).astype(np.int64)
+        column = np.argmax(np.cumsum(receives, axis=1)[loss] == (choice + 1)[:, None], axis=1)
+        cells = area[loss, column]
+
+        np.add.at(self.values, (games, cells), 1)
+        kinds = self.kinds[games, cells]
+        self.kinds[games, cells] = np.where(kinds == KIND_TREASURE, KIND_TREASURE, KIND_GOLD)
+
+    def to_dict(self, game: int) -> Dict[str, Any]:
+        """
+        Convert one game to the dictionary of GameState.to_dict(), with the
+        cells in index order.
+
+        Args:
+            game: Index of the game
+
+        Returns:
+            Dictionary representation of the game state
+        """
+        coords = self.geometry.coords
+        players = []
+        for player in range(self.num_players):
+            position = coords[self.positions[game, player]]
+            fired = self.missiles_fired[game, player, :self.missiles_fired_count[game, player]]
+            players.append({
+                "q": position.q,
+                "r": position.r,
+                "s": position.s,
+                "points": int(self.gold[game, player]),
+                "shield": bool(self.shield[game, player]),
+                "alive": bool(self.alive[game, player]),
+                "missiles": int(self.missiles[game, player]),
+                "missiles_fired": [
+                    {"q": coords[cell].q, "r": coords[cell].r, "s": coords[cell].s}
+                    for cell in fired
+                ]
+            })
+
+        cells = []
+        for cell in np.flatnonzero(self.kinds[game]):
+            kind = self.kinds[game, cell]
+            value = KIND_SYMBOLS.get(kind, int(self.values[game, cell]))
+            coord = coords[cell]
+            cells.append({"q": coord.q, "r": coord.r, "s": coord.s, "value": value})
+
+        return {
+            "players": players,
+            "map": {
+                "moveleft": int(self.moves_left[game]),
+                "radius": self.radius,
+                "treasure_remaining": bool(self.treasure_remaining[game]),
+                "cells": cells
+            }
+        }
@@ -3,12 +3,13 @@
 File handler module for the "botwar ship" game.
 """
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 from models.move import Move
 from models.coordinate import Coordinate
 from models.direction import Direction
 from judger.game_state import GameState
+from utils.binary_protocol import HEADER, PLAYER, MAGIC, VERSION, DIRECTIONS, FLAG_ALIVE, FLAG_SHIELD, read_move, read_start
 
 
 class FileHandler:
@@ -64,7 +65,7 @@ class FileHandler:
         with open(path, 'w', encoding='utf-8') as f:
             f.write(data)
 
-    def parse_agent_input(self, input_str: str) -> Move:
+    def parse_agent_input(self, input_str: Union[str, bytes]) -> Move:
         """
         Parse agent input string into a Move object.
         
@@ -73,6 +74,8 @@ class FileHandler:
         
         Direction is one of: NE, E, SE, SW, W, NW
         Missile targets are space-separated coordinates: q r s
+
+        A bytes input is a move of the binary protocol.
         
         Args:
             input_str: Input string from the agent
@@ -80,6 +83,9 @@ class FileHandler:
         Returns:
             Move object representing the parsed move
         """
+        if isinstance(input_str, bytes):
+            return self._parse_binary_move(input_str)
+
         lines = input_str.strip().split('\n')
 
         # Parse direction
@@ -106,19 +112,58 @@ class FileHandler:
 
         return Move(direction, missile_targets)
 
-    def format_agent_output(self, state: GameState, team_id: int) -> str:
+    def _parse_binary_move(self, data: bytes) -> Move:
+        """
+        Parse a move of the binary protocol like a text move: an unknown
+        direction is no move, and invalid missile targets are all skipped.
+
+        Args:
+            data: Answer of the agent
+
+        Returns:
+            Move object representing the parsed move
+        """
+        try:
+            code, targets = read_move(data)
+        except ValueError:
+            if len(data) < 1:
+                return Move()
+            code, targets = data[0], []
+        direction = Direction[DIRECTIONS[code]] if code < len(DIRECTIONS) else Direction.O
+        return Move(direction, [Coordinate(q, r, s) for q, r, s in targets])
+
+    def parse_start_position(self, data: Union[str, bytes]) -> Tuple[int, int, int]:
+        """
+        Parse the start position chosen by an agent: "q r s" text, or a
+        start position of the binary protocol.
+
+        Args:
+            data: Answer of the agent
+
+        Returns:
+            q, r, s of the position
+
+        Raises:
+            ValueError: If the answer is not a position
+        """
+        if isinstance(data, bytes):
+            return read_start(data)
+        q, r, s = map(int, data.strip().split())
+        return q, r, s
+
+    def format_agent_output(self, state: GameState, team_id: int, time_bank: Optional[int] = None) -> str:
         """
         Format game state as input for the specified team's agent.
         
         Phase 0 format (position selection):
-        N K P
-        T
+        N K P [B]
+        T [M]
         C
         q r s value
         ...
         
         Phase 1 format (movement):
-        N K P
+        N K P [B]
         q0 r0 s0 A0 G0 S0 R0
         q1 r1 s1 A1 G1 S1 R1
         q2 r2 s2 A2 G2 S2 R2
@@ -126,84 +171,72 @@ class FileHandler:
         q r s value
         ...
         
+        B is the agent's remaining time bank in milliseconds and is only
+        present when the match is played with a time bank. M is the number
+        of players and is only present when it is not 3; phase 1 then has
+        one line per player.
+
         Args:
             state: Current game state
             team_id: Team ID (0-2)
+            time_bank: Remaining time bank of the agent in milliseconds, or None
             
         Returns:
             Formatted string for the agent
         """
         output_lines = []
+        bank_str = f" {time_bank}" if time_bank is not None else ""
 
         if not state.started:
             # Phase 0: Position selection
-            output_lines.append(f"{state.map.radius} {state.moves_left} 0")
-            output_lines.append(f"{team_id + 1}")
-
-            # Count cells with non-empty value
-            non_empty_cells = []
-            for coord, cell in state.map.cells.items():
-                if not cell.is_empty():
-                    item = cell.get_item()
-                    value = self._get_item_value_str(item)
-                    non_empty_cells.append((coord, value))
-
-            output_lines.append(str(len(non_empty_cells)))
+            output_lines.append(f"{state.map.radius} {state.moves_left} 0{bank_str}")
+            num_players = len(state.players)
+            output_lines.append(f"{team_id + 1}" if num_players == 3 else f"{team_id + 1} {num_players}")
 
-            # Add the cell data
-            for coord, value in non_empty_cells:
-                output_lines.append(f"{coord.q} {coord.r} {coord.s} {value}")
+            # Add the non-empty cells, rendered once for all agents
+            output_lines.append(state.map.cell_list())
 
         else:
             # Phase 1: Movement
-            output_lines.append(f"{state.map.radius} {state.moves_left} 1")
+            output_lines.append(f"{state.map.radius} {state.moves_left} 1{bank_str}")
 
             # Players info
-            players = [state.players[(team_id + i) % 3] for i in range(3)]
+            num_players = len(state.players)
+            players = [state.players[(team_id + i) % num_players] for i in range(num_players)]
             output_lines.append(
                 f"{players[0].position.q} {players[0].position.r} {players[0].position.s} {players[0].gold} {int(players[0].shield)} {players[0].missiles}")
             for player in players[1:]:
                 output_lines.append(
                     f"{player.position.q} {player.position.r} {player.position.s} {int(player.alive)} {player.gold} {int(player.shield)}")
 
-            # Count non-empty cells
-            non_empty_cells = []
-            for coord, cell in state.map.cells.items():
-                if not cell.is_empty():
-                    item = cell.get_item()
-                    value = self._get_item_value_str(item)
-                    non_empty_cells.append((coord, value))
-
-            output_lines.append(str(len(non_empty_cells)))
-
-            # Add the cell data
-            for coord, value in non_empty_cells:
-                output_lines.append(f"{coord.q} {coord.r} {coord.s} {value}")
+            # Add the non-empty cells, rendered once for all agents
+            output_lines.append(state.map.cell_list())
 
         return '\n'.join(output_lines)
 
-    def _get_item_value_str(self, item) -> str:
+    def format_agent_binary(self, state: GameState, team_id: int, time_bank: Optional[int] = None) -> bytes:
         """
-        Get the string representation of an item's value.
+        Format game state as binary protocol input for the specified team's
+        agent (utils/binary_protocol.py). It holds what format_agent_output()
+        does, and the players in the same order.
 
         Args:
-            item: Item object
+            state: Current game state
+            team_id: Team ID (0-2)
+            time_bank: Remaining time bank of the agent in milliseconds, or None
 
         Returns:
-            String representation of the item value
-        """
-        from items.gold import Gold
-        from items.shield import Shield
-        from items.danger import Danger
-        from items.treasure import Treasure
-
-        if isinstance(item, Gold):
-            return str(item.value)
-        elif isinstance(item, Shield):
-            return "S"
-        elif isinstance(item, Danger):
-            return "D"
-        elif isinstance(item, Treasure):
-            return str(item.value)
-        else:
-            return "0"
+            Encoded input for the agent
+        """
+        num_players = len(state.players)
+        phase = 1 if state.started else 0
+        header = HEADER.pack(MAGIC, VERSION, phase, team_id + 1, num_players, state.map.radius, state.moves_left,
+                             -1 if time_bank is None else time_bank)
+        records = []
+        if state.started:
+            for i in range(num_players):
+                player = state.players[(team_id + i) % num_players]
+                position = player.position
+                flags = (FLAG_ALIVE if player.alive else 0) | (FLAG_SHIELD if player.shield else 0)
+                records.append(PLAYER.pack(position.q, position.r, player.gold, flags, player.missiles if i == 0 else 0))
+        return header + b"".join(records) + state.map.cell_records()
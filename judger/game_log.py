@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Game log module for the "botwar ship" game.
+
+A game log is the list of game states (GameState.to_dict()) after every
+turn, which is the format read by the visualizer. The delta format stores
+the same states as frames: a full keyframe every keyframe_interval turns
+and, in between, only the player fields and cells that changed since the
+previous turn.
+
+    {
+        "format": "delta",
+        "version": 1,
+        "keyframe_interval": K,
+        "frames": [
+            {"state": {...}},                     # turns 0, K, 2K, ...
+            {"players": [{...}, {}, {...}],       # changed fields of every player
+             "map": {...},                        # changed map fields except cells
+             "cells": [[q, r, s, value], ...],    # new or changed cells
+             "cleared": [[q, r, s], ...]},        # cells that became empty
+            ...
+        ]
+    }
+
+Converting back with decode_history() gives the same states, except that
+the cells of a state rebuilt from deltas list new cells last, so their
+order may differ from the original.
+
+The JSONL format is written while the match is played: one game state
+per line, flushed after every turn, so memory does not grow with the
+match and a judge that dies keeps the log of the turns played so far.
+Any log may be gzip-compressed; iter_history() reads every format, with
+or without gzip, one state at a time, and the matches of log archives.
+
+Convert a log file between the formats with:
+
+    python -m judger.game_log <input> <output> [--format full|delta|jsonl] [--compress]
+"""
+import argparse
+import gzip
+import json
+import re
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from utils.constants import KEYFRAME_INTERVAL, LOG_FORMATS
+
+DELTA_FORMAT = "delta"
+DELTA_VERSION = 1
+JSONL_FORMAT = "jsonl"
+GZIP_MAGIC = b"\x1f\x8b"
+
+CellKey = Tuple[int, int, int]
+
+
+def _cell_map(cells: List[Dict[str, Any]]) -> Dict[CellKey, Any]:
+    """
+    Index the cells of a state by coordinate.
+
+    Args:
+        cells: Cell dictionaries of a state
+
+    Returns:
+        Dictionary of (q, r, s) to cell value, in the order of the cells
+    """
+    return {(cell["q"], cell["r"], cell["s"]): cell["value"] for cell in cells}
+
+
+def diff_states(previous: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compute the delta frame that turns one state into the next.
+
+    Args:
+        previous: State of the previous turn
+        state: State of this turn
+
+    Returns:
+        Delta frame
+    """
+    players = []
+    for old_player, player in zip(previous["players"], state["players"]):
+        players.append({key: value for key, value in player.items() if old_player.get(key) != value})
+
+    old_map, new_map = previous["map"], state["map"]
+    map_changes = {key: value for key, value in new_map.items() if key != "cells" and old_map.get(key) != value}
+
+    old_cells = _cell_map(old_map["cells"])
+    new_cells = _cell_map(new_map["cells"])
+    changed = [[q, r, s, value] for (q, r, s), value in new_cells.items() if old_cells.get((q, r, s)) != value]
+    cleared = [[q, r, s] for (q, r, s) in old_cells if (q, r, s) not in new_cells]
+
+    frame = {"players": players}
+    if map_changes:
+        frame["map"] = map_changes
+    if changed:
+        frame["cells"] = changed
+    if cleared:
+        frame["cleared"] = cleared
+    return frame
+
+
+def apply_delta(state: Dict[str, Any], frame: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a delta frame to a state.
+
+    Args:
+        state: State of the previous turn, left unchanged
+        frame: Delta frame of this turn
+
+    Returns:
+        State of this turn
+    """
+    players = [{**player, **changes} for player, changes in zip(state["players"], frame["players"])]
+
+    cells = _cell_map(state["map"]["cells"])
+    for q, r, s in frame.get("cleared", []):
+        del cells[(q, r, s)]
+    for q, r, s, value in frame.get("cells", []):
+        cells[(q, r, s)] = value
+
+    game_map = {**state["map"], **frame.get("map", {})}
+    game_map["cells"] = [{"q": q, "r": r, "s": s, "value": value} for (q, r, s), value in cells.items()]
+    return {**state, "players": players, "map": game_map}
+
+
+class DeltaEncoder:
+    """
+    DeltaEncoder builds a delta log one state at a time, so a runner can
+    log every turn as it is played.
+    """
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        Initialize an empty log.
+
+        Args:
+            keyframe_interval: Number of turns from one keyframe to the next
+        """
+        if keyframe_interval < 1:
+            raise ValueError(f"Keyframe interval must be at least 1: {keyframe_interval}")
+        self.keyframe_interval = keyframe_interval
+        self.frames = []
+        self.previous = None  # Last appended state
+
+    def append(self, state: Dict[str, Any]):
+        """
+        Add the state of the next turn.
+
+        Args:
+            state: Game state dictionary, which must not be modified afterwards
+        """
+        if len(self.frames) % self.keyframe_interval == 0:
+            self.frames.append({"state": state})
+        else:
+            self.frames.append(diff_states(self.previous, state))
+        self.previous = state
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the log.
+
+        Returns:
+            Delta log dictionary, ready for json.dump
+        """
+        return {
+            "format": DELTA_FORMAT,
+            "version": DELTA_VERSION,
+            "keyframe_interval": self.keyframe_interval,
+            "frames": self.frames
+        }
+
+
+class DeltaLogReader:
+    """
+    DeltaLogReader rebuilds the state of any turn of a delta log from the
+    keyframe before it, applying at most keyframe_interval - 1 deltas.
+    """
+
+    def __init__(self, log: Dict[str, Any]):
+        """
+        Initialize a reader of a delta log.
+
+        Args:
+            log: Delta log dictionary
+
+        Raises:
+            ValueError: If the log is not a delta log of a known version
+        """
+        if not is_delta_log(log):
+            raise ValueError("Not a delta game log")
+        if log.get("version") != DELTA_VERSION:
+            raise ValueError(f"Unsupported delta game log version: {log.get('version')}")
+        self.keyframe_interval = log["keyframe_interval"]
+        self.frames = log["frames"]
+
+    def __len__(self) -> int:
+        """Number of turns in the log."""
+        return len(self.frames)
+
+    def state(self, turn: int) -> Dict[str, Any]:
+        """
+        Get the state of a turn.
+
+        Args:
+            turn: Index of the turn, 0 being the state after the start positions
+
+        Returns:
+            Game state dictionary of the turn
+        """
+        if not 0 <= turn < len(self.frames):
+            raise IndexError(f"Turn out of range: {turn}")
+        keyframe = turn - turn % self.keyframe_interval
+        state = self.frames[keyframe]["state"]
+        for frame in self.frames[keyframe + 1:turn + 1]:
+            state = apply_delta(state, frame)
+        return state
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the states of all turns."""
+        state = None
+        for frame in self.frames:
+            state = frame["state"] if "state" in frame else apply_delta(state, frame)
+            yield state
+
+    def states(self) -> List[Dict[str, Any]]:
+        """
+        Get the states of all turns.
+
+        Returns:
+            List of game state dictionaries, the visualizer format
+        """
+        return list(self)
+
+
+class JsonlLogWriter:
+    """
+    JsonlLogWriter writes a game log in the JSONL format, one state per line,
+    and flushes every line so the log survives a judge that is killed.
+    """
+
+    def __init__(self, path: str, compress: bool = False):
+        """
+        Create the log file.
+
+        Args:
+            path: Path of the game log
+            compress: Write a gzip stream, flushed to a readable point after every line
+        """
+        self.file = open_log(path, "w", compress)
+
+    def write(self, state: Dict[str, Any]):
+        """
+        Append the state of the next turn.
+
+        Args:
+            state: Game state dictionary
+        """
+        self.file.write(json.dumps(state) + "\n")
+        self.file.flush()
+
+    def close(self):
+        """
+        Close the log file.
+        """
+        self.file.close()
+
+
+def is_delta_log(log: Any) -> bool:
+    """
+    Check if a parsed game log is in the delta format.
+
+    Args:
+        log: Parsed game log
+
+    Returns:
+        True for a delta log, False for a list of states
+    """
+    return isinstance(log, dict) and log.get("format") == DELTA_FORMAT
+
+
+def encode_history(history: List[Dict[str, Any]], keyframe_interval: int = KEYFRAME_INTERVAL) -> Dict[str, Any]:
+    """
+    Convert a list of states to a delta log.
+
+    Args:
+        history: Game states of every turn
+        keyframe_interval: Number of turns from one keyframe to the next
+
+    Returns:
+        Delta log dictionary
+    """
+    encoder = DeltaEncoder(keyframe_interval)
+    for state in history:
+        encoder.append(state)
+    return encoder.to_dict()
+
+
+def decode_history(log: Any) -> List[Dict[str, Any]]:
+    """
+    Convert a game log of either format to a list of states.
+
+    Args:
+        log: Parsed game log
+
+    Returns:
+        Game states of every turn
+    """
+    if is_delta_log(log):
+        return DeltaLogReader(log).states()
+    return log
+
+
+def open_log(path: str, mode: str = "r", compress: Optional[bool] = None) -> IO[str]:
+    """
+    Open a game log file as text.
+
+    Args:
+        path: Path to the game log
+        mode: "r" to read, "w" to write
+        compress: Use gzip; when reading, None detects it from the file
+
+    Returns:
+        Text file object
+    """
+    if compress is None and mode == "r":
+        with open(path, "rb") as f:
+            compress = f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_history(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read a game log file of any format, one state at a time.
+
+    A JSONL log is read line by line, so it never needs more memory than one
+    state, and a log cut short by a killed judge yields the complete turns
+    before the cut. Full and delta logs are JSON documents and are parsed
+    as a whole.
+
+    A path "<archive>::<match>" reads a match of a log archive
+    (judger/log_archive.py), one compressed block at a time.
+
+    Args:
+        path: Path to the game log
+
+    Returns:
+        Iterator of the game states of every turn
+    """
+    # Imported here, the archive module builds on this one
+    from judger.log_archive import LogArchive, split_archive_path
+    archive_path = split_archive_path(path)
+    if archive_path is not None:
+        with LogArchive(archive_path[0]) as archive:
+            yield from archive.iter_history(archive_path[1])
+        return
+
+    with open_log(path) as f:
+        try:
+            for number, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if number > 0 or not line.endswith("\n"):
+                        # Last line of a JSONL log cut short while it was written
+                        return
+                    # First line of a pretty-printed JSON document
+                    break
+                if number == 0 and not (isinstance(record, dict) and "players" in record):
+                    # A whole full or delta log written on one line
+                    yield from DeltaLogReader(record) if is_delta_log(record) else record
+                    return
+                yield record
+            else:
+                return
+        except EOFError:
+            # gzip stream cut short, the lines before the cut were complete
+            return
+
+    with open_log(path) as f:
+        log = json.load(f)
+    yield from DeltaLogReader(log) if is_delta_log(log) else log
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    """
+    Read a game log file of any format as a list of states.
+
+    Args:
+        path: Path to the game log
+
+    Returns:
+        Game states of every turn
+    """
+    return list(iter_history(path))
+
+
+def log_suffix(log_format: str, compress: bool = False) -> str:
+    """
+    Get the file name suffix of a game log.
+
+    Args:
+        log_format: One of LOG_FORMATS
+        compress: Whether the log is gzip-compressed
+
+    Returns:
+        Suffix such as ".json" or ".jsonl.gz"
+    """
+    suffix = ".jsonl" if log_format == JSONL_FORMAT else ".json"
+    return suffix + ".gz" if compress else suffix
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Convert a game log between the full and delta formats")
+    parser.add_argument("input", help="Path to the game log to convert, or <archive>::<match>")
+    parser.add_argument("output", help="Path to write the converted game log to")
+    parser.add_argument("--format", choices=LOG_FORMATS, default=None,
+                        help="Format to convert to (default: full for a delta log, delta otherwise)")
+    parser.add_argument("--compress", action="store_true", help="Write the converted log with gzip")
+    parser.add_argument("--keyframe_interval", type=int, default=KEYFRAME_INTERVAL,
+                        help="Number of turns from one keyframe to the next in a delta log")
+    return parser.parse_args(argv)
+
+
+def convert_log(input_path: str, output_path: str, log_format: str, compress: bool = False,
+                keyframe_interval: int = KEYFRAME_INTERVAL):
+    """
+    Convert a game log file of any format to another format.
+
+    Args:
+        input_path: Path of the log to read
+        output_path: Path of the log to write
+        log_format: Format of the output, one of LOG_FORMATS
+        compress: Write the output with gzip
+        keyframe_interval: Turns from one keyframe to the next in a delta output
+    """
+    if log_format == JSONL_FORMAT:
+        writer = JsonlLogWriter(output_path, compress)
+        try:
+            for state in iter_history(input_path):
+                writer.write(state)
+        finally:
+            writer.close()
+    elif log_format == DELTA_FORMAT:
+        encoder = DeltaEncoder(keyframe_interval)
+        for state in iter_history(input_path):
+            encoder.append(state)
+        with open_log(output_path, "w", compress) as f:
+            json.dump(encoder.to_dict(), f)
+    else:
+        # Written state by state, so a long JSONL log never has to fit in memory
+        with open_log(output_path, "w", compress) as f:
+            f.write("[")
+            for turn, state in enumerate(iter_history(input_path)):
+                f.write((", " if turn else "") + json.dumps(state))
+            f.write("]")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Convert a game log file."""
+    from judger.log_archive import split_archive_path
+    args = parse_args(argv)
+    target = args.format
+    if target is None and split_archive_path(args.input) is not None:
+        target = "full"
+    elif target is None:
+        with open_log(args.input) as f:
+            is_delta = re.match(r'\s*\{\s*"format"\s*:\s*"delta"', f.read(256)) is not None
+        target = "full" if is_delta else DELTA_FORMAT
+
+    convert_log(args.input, args.output, target, args.compress, args.keyframe_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,48 @@ class GameState:
         self.moves_left = moves_left
         self.treasure_appeared = False
         self.treasure_remaining = False
+        self.seed: Optional[int] = None  # Seed of the judge's random generator, recorded in the log
+
+    def clone(self) -> 'GameState':
+        """
+        Copy the game state, for programs that try out moves such as
+        search-based agents. The map of the copy shares its storage with
+        this map until either of them changes, so a clone costs about the
+        same for any map size, far less than copy.deepcopy().
+
+        Returns:
+            The new game state
+        """
+        clone = GameState.__new__(GameState)
+        clone.__dict__.update(self.__dict__)
+        clone.map = self.map.clone()
+        clone.players = [player.clone() for player in self.players]
+        return clone
+
+    def snapshot(self) -> 'GameState':
+        """
+        Take a snapshot of the game state to restore() later. The snapshot
+        is a clone which should not be modified.
+
+        Returns:
+            The snapshot
+        """
+        return self.clone()
+
+    def restore(self, snapshot: 'GameState'):
+        """
+        Put the game state back to a snapshot or clone of it. The map and
+        player objects are kept, and the snapshot can be restored again.
+
+        Args:
+            snapshot: Snapshot taken from this game state
+        """
+        game_map, players = self.map, self.players
+        self.__dict__.update(snapshot.__dict__)
+        self.map, self.players = game_map, players
+        game_map.restore(snapshot.map)
+        for player, saved in zip(players, snapshot.players):
+            player.restore(saved)
 
     def update(self, moves: List[Optional[Move]]):
         """
@@ -90,6 +132,7 @@ class GameState:
             "map": {
                 "moveleft": self.moves_left,
                 "radius": self.map.radius,
+                "seed": self.seed,
                 "treasure_remaining": self.treasure_remaining,
                 "cells": self.map.to_dict_list()
             }
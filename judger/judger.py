@@ -5,21 +5,25 @@ Judger module for the "botwar ship" game.
 import json
 import math
 import random
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 
 from models.coordinate import Coordinate
 from models.map import Map
+from models.dense_map import create_map
 from models.player import Player
 from models.move import Move
+from models.direction import Direction
 from judger.game_state import GameState
 from judger.file_handler import FileHandler
-from items.gold import Gold
-from items.shield import Shield
-from items.danger import Danger
+from judger.observation import Observation, StepResult, TurnEvent
+from judger.observation import EVENT_COLLISION, EVENT_TREASURE, EVENT_COLLECT, EVENT_SHIELD, EVENT_DANGER
+from judger.observation import EVENT_FIRE, EVENT_HIT
+from items.item import KIND_EMPTY, KIND_GOLD, KIND_SHIELD, KIND_DANGER, KIND_TREASURE
+from items.kinds import GOLD_KINDS, GOLD_ITEMS, kind_of, item_from_value
 from items.treasure import Treasure
 from utils.constants import MAX_MISSILES, TREASURE_MIN_THRESHOLD, TREASURE_MAX_THRESHOLD, MAX_MISSILES_EACH_TURN
-from utils.constants import TREASURE_MIN_VALUE, TREASURE_VALUE_DIVISOR, GOLD_DISTRIBUTION_RADIUS
-from utils.validators import validate_team_constraints
+from utils.constants import TREASURE_MIN_VALUE, TREASURE_VALUE_DIVISOR, GOLD_DISTRIBUTION_RADIUS, MAP_STORAGE, SEED_BITS
+from utils.constants import NUM_PLAYERS, PAIRWISE_COLLISION_PLAYERS
 
 
 class Judger:
@@ -28,7 +32,8 @@ class Judger:
     and updates the game state.
     """
 
-    def __init__(self, file_handler: FileHandler, game_state: GameState, treasure_appearance_turn: int):
+    def __init__(self, file_handler: FileHandler, game_state: GameState, treasure_appearance_turn: int,
+                 rng: Optional[random.Random] = None):
         """
         Initialize the Judger with the provided file handler and game state.
 
@@ -36,18 +41,25 @@ class Judger:
             file_handler: FileHandler instance for reading and writing files
             game_state: GameState instance representing the current game state
             treasure_appearance_turn: Turn number when the treasure appears
+            rng: Random generator of the match, a new unseeded one if not given
         """
         self.file_handler = file_handler
         self.game_state = game_state
         self.treasure_appearance_turn = treasure_appearance_turn
+        self.rng = rng or random.Random()  # Every random draw of the match, so a seed replays it exactly
+        self.events: Optional[List[TurnEvent]] = None  # Events of the turn being played by step()
 
     @staticmethod
-    def initialize(map_path: str) -> 'Judger':
+    def initialize(map_path: str, map_storage: str = MAP_STORAGE, seed: Optional[int] = None,
+                   num_players: Optional[int] = None) -> 'Judger':
         """
         Initialize the game with the specified map.
         
         Args:
             map_path: Path to the map JSON file
+            map_storage: How the map stores its cells, one of MAP_STORAGES
+            seed: Seed of the match, see from_map_data()
+            num_players: Number of ships, see from_map_data()
 
         Returns:
             Judger instance initialized with the map
@@ -56,6 +68,39 @@ class Judger:
 
         map_data = file_handler.read_json(map_path)
 
+        return Judger.from_map_data(map_data, file_handler, map_storage, seed, num_players)
+
+    @staticmethod
+    def from_map_data(map_data: Dict[str, Any], file_handler: Optional[FileHandler] = None,
+                      map_storage: str = MAP_STORAGE, seed: Optional[int] = None,
+                      num_players: Optional[int] = None) -> 'Judger':
+        """
+        Initialize the game with an already parsed map, so that many games
+        can be started from one parse of the map file.
+
+        The judge draws every random number of the match (treasure turn,
+        random start positions, lost gold) from its own generator seeded
+        with seed, so the same seed, map and moves replay the same match,
+        and games in one process do not affect each other.
+
+        Args:
+            map_data: Map data from the JSON file, left unchanged
+            file_handler: FileHandler instance, a new one if not given
+            map_storage: How the map stores its cells, one of MAP_STORAGES
+            seed: Seed of the match, recorded in the game state; drawn from
+                the random module if not given
+            num_players: Number of ships, the map's "num_players" or
+                NUM_PLAYERS if not given
+
+        Returns:
+            Judger instance initialized with the map
+
+        Raises:
+            ValueError: If the map is invalid, made for another number of
+                players, or too small for every ship to have a start zone
+        """
+        file_handler = file_handler or FileHandler()
+
         # Validate required parameters
         if "max_moves" not in map_data:
             raise ValueError("Required parameter 'max_moves' not found in map file")
@@ -65,17 +110,28 @@ class Judger:
             raise ValueError("Required parameter 'map_radius' not found in map file")
         map_radius = map_data["map_radius"]
 
+        map_players = map_data.get("num_players", NUM_PLAYERS)
+        if num_players is None:
+            num_players = map_players
+        elif "num_players" in map_data and num_players != map_players:
+            raise ValueError(f"Map is made for {map_players} players, not {num_players}")
+        if num_players < 1:
+            raise ValueError(f"Invalid number of players: {num_players}")
+
         # Create a new game state
         game_state = GameState(radius=map_radius, moves_left=max_moves)
 
         # Initialize the Judger
-        judger = Judger(file_handler, game_state, treasure_appearance_turn=0)
+        if seed is None:
+            seed = random.getrandbits(SEED_BITS)
+        game_state.seed = seed
+        judger = Judger(file_handler, game_state, treasure_appearance_turn=0, rng=random.Random(seed))
 
         # Initialize the map
-        judger._initialize_map(map_data)
+        judger._initialize_map(map_data, map_storage)
 
         # Initialize players
-        judger._initialize_players()
+        judger._initialize_players(num_players)
 
         # Initialize the treasure appearance turn
         judger._initialize_treasure_appearance_turn(max_moves)
@@ -102,21 +158,18 @@ class Judger:
 
             valid_position = True
 
-            # Check if the coordinate is within the map boundaries
-            if not self.game_state.map.is_valid_coordinate(coord):
-                valid_position = False
-
-            # Check team-specific constraints
-            if not validate_team_constraints(i + 1, coord.q, coord.r, coord.s):
+            # Check if the coordinate is within the map boundaries and the team's start zone
+            if not self.game_state.map.geometry.in_start_zone(i + 1, coord, len(self.game_state.players)):
                 valid_position = False
 
             # Check if the cell is empty
-            cell = self.game_state.map.get_cell(coord)
-            if not cell.is_empty():
+            if valid_position and not self.game_state.map.get_cell(coord).is_empty():
                 valid_position = False
 
             # Set the player's position
-            if not valid_position:
+            if valid_position:
+                coord = self.game_state.map.geometry.intern(coord)
+            else:
                 # randomize the position
                 coord = self.get_random_start_position(team_id=i + 1)
             player.position = coord
@@ -135,26 +188,13 @@ class Judger:
         Returns:
             Random starting position for the team
         """
-        # Get the list of empty cells
-        empty_cells = []
-        for q in range(-self.game_state.map.radius, self.game_state.map.radius + 1):
-            for r in range(max(-self.game_state.map.radius, -q - self.game_state.map.radius),
-                           min(self.game_state.map.radius + 1, -q + self.game_state.map.radius + 1)):
-                s = -q - r
-                coord = Coordinate(q, r, s)
-                if self.game_state.map.is_valid_coordinate(coord):
-                    cell = self.game_state.map.get_cell(coord)
-                    if cell.is_empty():
-                        empty_cells.append(coord)
-
-        valid_cells = []
-        for coord in empty_cells:
-            q, r, s = coord.q, coord.r, coord.s
-            if validate_team_constraints(team_id, q, r, s):
-                valid_cells.append(coord)
+        # Get the empty cells of the team's start zone
+        game_map = self.game_state.map
+        start_zones = game_map.geometry.zones(len(self.game_state.players))[0]
+        valid_cells = [coord for coord in start_zones[team_id] if game_map.get_cell(coord).is_empty()]
 
         # Randomly select a valid cell
-        return random.choice(valid_cells)
+        return self.rng.choice(valid_cells)
 
     def process_turn(self, moves: List[str]) -> GameState:
         """
@@ -175,11 +215,133 @@ class Judger:
             else:
                 parsed_moves.append(Move())
 
+        self._play_turn(parsed_moves)
+
+        return self.game_state
+
+    def step(self, moves: List[Optional[Move]]) -> StepResult:
+        """
+        Process a turn with moves given as objects, without formatting or
+        parsing any text.
+
+        Args:
+            moves: Move of every player, None or ignored for sunk players
+
+        Returns:
+            Observation after the turn, events of the turn and whether the game has ended
+        """
+        if len(moves) != len(self.game_state.players):
+            raise ValueError("Number of moves does not match the number of players")
+
+        moves = [move if move is not None and player.alive else Move()
+                 for player, move in zip(self.game_state.players, moves)]
+
+        events = self.events = []
+        try:
+            self._play_turn(moves)
+        finally:
+            self.events = None
+
+        return StepResult(self.observe(), events, self.check_game_end())
+
+    def observe(self) -> Observation:
+        """
+        Take a structured snapshot of the current game state.
+
+        Returns:
+            Observation of the game
+        """
+        return Observation(self.game_state)
+
+    def clone(self) -> 'Judger':
+        """
+        Copy the judge and its game state, to play moves ahead without
+        changing this game. See GameState.clone().
+
+        Returns:
+            The new judge, drawing the same random numbers as this one
+        """
+        rng = random.Random()
+        rng.setstate(self.rng.getstate())
+        return Judger(self.file_handler, self.game_state.clone(), self.treasure_appearance_turn, rng)
+
+    def legal_directions(self, seat: int) -> List[Direction]:
+        """
+        Get the directions a player can move in without leaving the map.
+
+        Args:
+            seat: Index of the player
+
+        Returns:
+            List of directions, starting with Direction.O; empty for a sunk player
+        """
+        player = self.game_state.players[seat]
+        if not player.alive:
+            return []
+        geometry = self.game_state.map.geometry
+        index = geometry.index(player.position.q, player.position.r)
+        return [direction for direction in Direction if geometry.steps[direction][index] >= 0]
+
+    def legal_moves(self) -> List[List[Direction]]:
+        """
+        Get the legal directions of every player.
+
+        Returns:
+            List of legal_directions() of every seat
+        """
+        return [self.legal_directions(seat) for seat in range(len(self.game_state.players))]
+
+    def max_missile_targets(self, seat: int) -> int:
+        """
+        Get the number of missiles a player may fire this turn.
+
+        Args:
+            seat: Index of the player
+
+        Returns:
+            Missiles left, at most MAX_MISSILES_EACH_TURN; 0 for a sunk player
+        """
+        player = self.game_state.players[seat]
+        if not player.alive:
+            return 0
+        return min(player.missiles, MAX_MISSILES_EACH_TURN)
+
+    def legal_missile_targets(self, seat: int, direction: Direction = Direction.O) -> List[Coordinate]:
+        """
+        Get the cells a player may fire a missile at this turn, as checked
+        by the judge: every cell of the map except the player's position
+        after the move. A move fires at up to max_missile_targets(seat) of
+        them.
+
+        Args:
+            seat: Index of the player
+            direction: Direction of the player's move this turn
+
+        Returns:
+            List of coordinates, empty if the player cannot fire
+        """
+        if self.max_missile_targets(seat) == 0:
+            return []
+        player = self.game_state.players[seat]
+        geometry = self.game_state.map.geometry
+        # A move off the map leaves the player in place, as in Player.move()
+        position = geometry.step(player.position, direction)
+        if position is None:
+            position = player.position
+        return [coord for coord in geometry.cells if coord != position]
+
+    def _play_turn(self, moves: List[Move]):
+        """
+        Apply the rules of one turn.
+
+        Args:
+            moves: Move of every player, Move() for sunk players
+        """
         # Decrement the number of moves left
         self.game_state.moves_left -= 1
 
         # 1. Move all players
-        self.game_state.update(parsed_moves)
+        self.game_state.update(moves)
 
         # 2. Check for collisions
         self.check_collisions()
@@ -191,23 +353,46 @@ class Judger:
         self.apply_item_effects()
 
         # 5. Handle missiles
-        self.handle_missiles(parsed_moves)
+        self.handle_missiles(moves)
 
         # 6. Apply item effects after missiles
         self.apply_item_effects()
 
-        return self.game_state
+    def _emit(self, kind: str, seat: Optional[int] = None, coord: Optional[Coordinate] = None,
+              value: int = 0, gold_lost: int = 0):
+        """
+        Record an event of the turn when the turn is played by step().
 
-    def generate_agent_inputs(self) -> List[str]:
+        Args:
+            kind: One of the EVENT_* constants
+            seat: Index of the player concerned
+            coord: Cell where the event happened
+            value: Amount of the event
+            gold_lost: Gold lost by a ship hit by missiles
+        """
+        if self.events is not None:
+            self.events.append(TurnEvent(kind, seat, coord, value, gold_lost))
+
+    def generate_agent_inputs(self, time_banks: Optional[List[int]] = None,
+                              protocols: Optional[List[str]] = None) -> List[Union[str, bytes]]:
         """
         Generate input strings for all agents based on the current game state.
+
+        Args:
+            time_banks: Remaining time bank of every agent in milliseconds, added
+                to the header when given
+            protocols: Protocol of every agent, one of AGENT_PROTOCOLS (defaults to "text")
         
         Returns:
-            List of input strings for the agents
+            List of input strings for the agents, bytes for binary protocol agents
         """
         inputs = []
         for i, player in enumerate(self.game_state.players):
-            input_str = self.file_handler.format_agent_output(self.game_state, i)
+            time_bank = time_banks[i] if time_banks is not None else None
+            if protocols is not None and protocols[i] == "binary":
+                input_str = self.file_handler.format_agent_binary(self.game_state, i, time_bank)
+            else:
+                input_str = self.file_handler.format_agent_output(self.game_state, i, time_bank)
             inputs.append(input_str)
         return inputs
 
@@ -225,36 +410,91 @@ class Judger:
         Check for and handle ship collisions, including both:
         - Ships ending up at the same position
         - Ships swapping positions (crossing paths)
+
+        Sunk ships take part too: a ship sinks on a sunk ship's cell. Up to
+        PAIRWISE_COLLISION_PLAYERS ships, every two ships are compared,
+        which is fastest for few ships; above, ships are counted by position
+        and by move, so the check stays linear in the number of ships.
+        """
+        players = self.game_state.players
+        if len(players) <= PAIRWISE_COLLISION_PLAYERS:
+            collided = self.pairwise_collisions(players)
+        else:
+            collided = self.counted_collisions(players)
+        for idx in collided:
+            players[idx].alive = False
+            self._emit(EVENT_COLLISION, idx, players[idx].position)
+
+    @staticmethod
+    def pairwise_collisions(players: List[Player]) -> List[int]:
+        """
+        Find the live ships that collide by comparing every two ships.
+
+        Args:
+            players: Players after their move
+
+        Returns:
+            Indices of the ships that sink, in seat order
         """
-        # Store previous positions for detecting swaps
-        previous_positions = {
-            i: self.game_state.players[i].previous_position
-            for i in range(len(self.game_state.players))
-            if self.game_state.players[i].previous_position
-        }
+        collided = []
+        for idx, player in enumerate(players):
+            if not player.alive:
+                continue
+            position = player.position
+            prev_position = player.previous_position
+            for other_idx, other in enumerate(players):
+                if idx == other_idx:
+                    continue
+                # Same position, or swapped positions
+                if position == other.position or (other.previous_position and position == other.previous_position
+                                                  and prev_position == other.position):
+                    collided.append(idx)
+                    break
+        return collided
 
-        # Store current positions for detecting overlaps
-        current_positions = {
-            i: self.game_state.players[i].position
-            for i in range(len(self.game_state.players))
-        }
+    @staticmethod
+    def counted_collisions(players: List[Player]) -> List[int]:
+        """
+        Find the live ships that collide by counting ships by position and
+        by move, in time linear in the number of ships.
 
-        for idx, player in enumerate(self.game_state.players):
+        Args:
+            players: Players after their move
+
+        Returns:
+            Indices of the ships that sink, in seat order
+        """
+        # Number of ships at every position
+        occupants: Dict[Coordinate, int] = {}
+        for player in players:
+            occupants[player.position] = occupants.get(player.position, 0) + 1
+
+        # Number of ships that made every move, from previous position to position
+        moves: Dict[Tuple[Coordinate, Coordinate], int] = {}
+        for player in players:
+            if player.previous_position:
+                move = (player.previous_position, player.position)
+                moves[move] = moves.get(move, 0) + 1
+
+        collided = []
+        for idx, player in enumerate(players):
             if not player.alive:
                 continue
             position = player.position
             prev_position = player.previous_position
 
-            # First pass: check for ships at the same position
-            for other_idx, other_position in current_positions.items():
-                if idx != other_idx and position == other_position:
-                    player.alive = False
+            # Another ship at the same position
+            if occupants[position] > 1:
+                collided.append(idx)
 
-            # Second pass: check for ships swapping positions
-            for other_idx, other_prev_position in previous_positions.items():
-                other_position = current_positions[other_idx]
-                if idx != other_idx and position == other_prev_position and prev_position == other_position:
-                    player.alive = False
+            # Another ship that made the opposite move, not counting this ship if it stayed in place
+            elif prev_position:
+                swaps = moves.get((position, prev_position), 0)
+                if position == prev_position:
+                    swaps -= 1
+                if swaps > 0:
+                    collided.append(idx)
+        return collided
 
     def validate_missile(self, player: Player, targets: List[Coordinate]) -> bool:
         """
@@ -311,6 +551,7 @@ class Judger:
 
                 # Update player's missiles fired
                 player.missiles_fired.append(target)
+                self._emit(EVENT_FIRE, i, target)
             player.missiles -= len(move.missile_targets)
 
         # Apply missile effects to players
@@ -322,6 +563,7 @@ class Judger:
                 if hit_count > 0:
                     # Calculate gold lost
                     gold_lost = player.hit_by_missile(hit_count)
+                    self._emit(EVENT_HIT, i, pos, hit_count, gold_lost)
 
                     # Distribute lost gold to nearby cells
                     if gold_lost > 0:
@@ -331,17 +573,28 @@ class Judger:
         """
         Apply the effects of items at player positions.
         """
-        for player in self.game_state.players:
+        for i, player in enumerate(self.game_state.players):
             if not player.alive:
                 continue
 
             cell = self.game_state.map.get_cell(player.position)
             if not cell.is_empty():
                 item = cell.get_item()
-                if isinstance(item, Treasure):
+                kind = item.kind
+                if kind == KIND_TREASURE:
                     self.game_state.treasure_remaining = False
-                item = item.apply_effect(player, self.game_state.map)
-                cell.set_item(item)
+                gold = player.gold
+                new_item = item.apply_effect(player, self.game_state.map)
+                if new_item is not item:
+                    cell.set_item(new_item)
+
+                if self.events is not None:
+                    if kind in GOLD_KINDS:
+                        self._emit(EVENT_COLLECT, i, player.position, player.gold - gold)
+                    elif kind == KIND_SHIELD:
+                        self._emit(EVENT_SHIELD, i, player.position)
+                    elif kind == KIND_DANGER and not player.alive:
+                        self._emit(EVENT_DANGER, i, player.position)
 
     def check_game_end(self) -> bool:
         """
@@ -363,14 +616,15 @@ class Judger:
 
         return all_sunk
 
-    def _initialize_map(self, map_data: Dict[str, Any]):
+    def _initialize_map(self, map_data: Dict[str, Any], map_storage: str = MAP_STORAGE):
         """
         Initialize the map from the provided map data.
         
         Args:
             map_data: Map data from the JSON file
+            map_storage: How the map stores its cells, one of MAP_STORAGES
         """
-        self.game_state.map = Map(radius=map_data["map_radius"])
+        self.game_state.map = create_map(map_data["map_radius"], map_storage)
 
         # Add cells to the map
         for cell_data in map_data.get("cells", []):
@@ -382,22 +636,30 @@ class Judger:
             coord = Coordinate(q, r, s)
 
             # Create the appropriate item based on the value
-            if isinstance(value, int) and value > 0:
-                self.game_state.map.add_item(coord, Gold(value))
-            elif value == "S":
-                self.game_state.map.add_item(coord, Shield())
-            elif value == "D":
-                self.game_state.map.add_item(coord, Danger())
+            item = item_from_value(value)
+            if item is not None:
+                self.game_state.map.add_item(coord, item)
 
-    def _initialize_players(self):
+    def _initialize_players(self, num_players: int = NUM_PLAYERS):
         """
         Initialize the players for the game.
-        """
-        self.game_state.players = [
-            Player(team_id=1, missiles=MAX_MISSILES),
-            Player(team_id=2, missiles=MAX_MISSILES),
-            Player(team_id=3, missiles=MAX_MISSILES)
-        ]
+
+        Args:
+            num_players: Number of ships
+
+        Raises:
+            ValueError: If a ship has no start zone on the map, or no empty
+                cell in it to start from
+        """
+        game_map = self.game_state.map
+        start_zones = game_map.geometry.zones(num_players)[0]
+        if not all(start_zones.values()):
+            raise ValueError(f"Map of radius {game_map.radius} is too small for {num_players} players")
+        # Start positions are drawn from the empty cells of a zone, see get_random_start_position()
+        for team_id, zone in start_zones.items():
+            if not any(game_map.get_cell(coord).is_empty() for coord in zone):
+                raise ValueError(f"Start zone of team {team_id} has no empty cell for {num_players} players")
+        self.game_state.players = [Player(team_id=i + 1, missiles=MAX_MISSILES) for i in range(num_players)]
 
     def _initialize_treasure_appearance_turn(self, max_moves):
         # Calculate the threshold for treasure appearance
@@ -405,7 +667,7 @@ class Judger:
         max_threshold = math.floor(max_moves * TREASURE_MAX_THRESHOLD)
 
         # Random treasure appearance turn
-        self.treasure_appearance_turn = random.randint(min_threshold, max_threshold)
+        self.treasure_appearance_turn = self.rng.randint(min_threshold, max_threshold)
 
     def _check_treasure_appearance(self):
         """
@@ -424,11 +686,12 @@ class Judger:
             center = Coordinate(0, 0, 0)
             cell = self.game_state.map.get_cell(center)
 
-            if isinstance(cell.get_item(), Gold):
+            if kind_of(cell.get_item()) == KIND_GOLD:
                 treasure_value += cell.get_item().value
             if not cell.is_empty():
                 cell.clear_item()
             self.game_state.map.add_item(center, Treasure(treasure_value))
+            self._emit(EVENT_TREASURE, coord=center, value=treasure_value)
 
             self.game_state.treasure_appeared = True
             self.game_state.treasure_remaining = True
@@ -441,47 +704,22 @@ class Judger:
             position: The position from which gold is lost
             gold_amount: Amount of gold to distribute
         """
-        # Find valid cells in Manhattan distance <= 2
-        valid_cells = []
-        for q_offset in range(-GOLD_DISTRIBUTION_RADIUS, GOLD_DISTRIBUTION_RADIUS + 1):
-            for r_offset in range(max(-GOLD_DISTRIBUTION_RADIUS, -q_offset - GOLD_DISTRIBUTION_RADIUS),
-                                  min(GOLD_DISTRIBUTION_RADIUS + 1, -q_offset + GOLD_DISTRIBUTION_RADIUS + 1)):
-                s_offset = -q_offset - r_offset
-
-                # Skip the center cell
-                if q_offset == 0 and r_offset == 0:
-                    continue
+        game_map = self.game_state.map
 
-                # Calculate new coordinate
-                new_coord = Coordinate(
-                    position.q + q_offset,
-                    position.r + r_offset,
-                    position.s + s_offset
-                )
-
-                # Skip invalid coordinates
-                if not self.game_state.map.is_valid_coordinate(new_coord):
-                    continue
-
-                # Check if it's valid and empty
-                cell = self.game_state.map.get_cell(new_coord)
-                if cell.is_empty() or isinstance(cell.get_item(), Gold) or isinstance(cell.get_item(), Treasure):
-                    valid_cells.append(new_coord)
+        # Find valid cells in Manhattan distance <= 2: empty, gold or treasure
+        valid_cells = []
+        for new_coord in game_map.geometry.area(position, GOLD_DISTRIBUTION_RADIUS):
+            if kind_of(game_map.get_cell(new_coord).get_item()) in GOLD_ITEMS:
+                valid_cells.append(new_coord)
 
         # If no valid cells, return
         if not valid_cells:
             return
 
         # Distribute gold to valid cells
-        for coord in random.choices(valid_cells, k=gold_amount):
-            cell = self.game_state.map.get_cell(coord)
-            if isinstance(cell.get_item(), Gold):
-                gold_value = cell.get_item().value + 1
-                cell.clear_item()
-                self.game_state.map.add_item(coord, Gold(gold_value))
-            elif isinstance(cell.get_item(), Treasure):
-                gold_value = cell.get_item().value + 1
-                cell.clear_item()
-                self.game_state.map.add_item(coord, Treasure(gold_value))
-            else:
-                self.game_state.map.add_item(coord, Gold(1))
+        # Add one gold to the cell of every coin, which keeps its kind; an empty cell gets gold
+        for coord in self.rng.choices(valid_cells, k=gold_amount):
+            cell = game_map.get_cell(coord)
+            item = cell.get_item()
+            kind, value = (KIND_EMPTY, 0) if item is None else (item.kind, item.value)
+            cell.set_item(GOLD_ITEMS[kind](value + 1))
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Game log archive module for the "botwar ship" game.
+
+An archive packs the game logs of many matches into one file. Every match
+is split into blocks of block_turns turns; a block holds the full state of
+its first turn followed by the delta frames (judger/game_log.py) of the
+next turns, one JSON document per line, and is compressed on its own with
+gzip or lzma. An index at the end of the file gives the offset of every
+block, so reading one turn of one match decompresses a single block:
+
+    header   "BWLA", version
+    blocks   compressed blocks of every match, and the attached files
+             (such as the agent call metrics) of every match
+    index    compressed JSON: {"version": 1, "matches": {name: {
+                 "turns": N, "compression": "gzip", "block_turns": K,
+                 "blocks": [[offset, length], ...],
+                 "files": {file name: [offset, length, compression]}}}}
+    footer   index offset, index length, "BWLA"
+
+Adding matches to an existing archive appends their blocks and a new
+index and footer after the old ones, which are left in place. If the
+writer is killed before it writes the new footer, readers fall back to
+the last complete index, and the next writer drops the unindexed bytes
+after it. A new archive starts with an empty index for the same reason. As with delta logs, the cells of a state rebuilt from deltas
+list new cells last.
+
+A match of an archive can be read anywhere a log path is expected with the
+path "<archive>::<match>": iter_history() in judger/game_log.py, and so
+analyze.py and the log converter, open it without unpacking the archive.
+
+Pack a log directory, list an archive or extract a match or a turn with:
+
+    python -m judger.log_archive pack <log_dir> <archive> [--compression gzip|lzma] [--remove]
+    python -m judger.log_archive list <archive>
+    python -m judger.log_archive extract <archive> <match> <output> [--format full|delta|jsonl] [--turn T]
+"""
+import argparse
+import functools
+import gzip
+import json
+import lzma
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from judger.game_log import apply_delta, convert_log, diff_states, iter_history
+from utils.constants import ARCHIVE_BLOCK_TURNS, ARCHIVE_COMPRESSION, ARCHIVE_COMPRESSIONS, LOG_FORMATS
+
+ARCHIVE_MAGIC = b"BWLA"
+ARCHIVE_VERSION = 1
+ARCHIVE_SEPARATOR = "::"  # Separates the archive path from the match name in a log path
+
+HEADER = struct.Struct("<4sB")  # magic, version
+FOOTER = struct.Struct("<QQ4s")  # index offset, index length, magic
+
+LOG_SUFFIXES = (".json", ".json.gz", ".jsonl", ".jsonl.gz")
+METRICS_SUFFIX = ".metrics.jsonl"
+METRICS_FILE = "metrics"  # Name of the attached agent call metrics of a match
+SCAN_CHUNK = 1 << 20  # Bytes read at a time when looking back for the last complete index
+
+# Compression codecs, as (compress, decompress); gzip without a timestamp so packing is reproducible
+CODECS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "gzip": (functools.partial(gzip.compress, mtime=0), gzip.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+def split_archive_path(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a log path that names a match of an archive.
+
+    Args:
+        path: Log path, "<archive>::<match>" for a match of an archive
+
+    Returns:
+        Tuple of the archive path and the match name, or None for a log file
+    """
+    archive, separator, name = str(path).partition(ARCHIVE_SEPARATOR)
+    if not separator or not os.path.isfile(archive):
+        return None
+    return archive, name
+
+
+def match_name(path: str) -> str:
+    """
+    Get the match name of a game log file, its path without the log suffix.
+
+    Args:
+        path: Path of the game log, relative to the packed directory
+
+    Returns:
+        Match name, with "/" between directories
+    """
+    name = Path(path).as_posix()
+    for suffix in sorted(LOG_SUFFIXES, key=len, reverse=True):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+class LogArchive:
+    """
+    LogArchive reads the matches of an archive, decompressing only the
+    blocks of the turns that are read.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an archive and read its index.
+
+        Args:
+            path: Path of the archive
+
+        Raises:
+            ValueError: If the file is not an archive of a known version
+        """
+        self.path = str(path)
+        self.file = open(self.path, "rb")
+        try:
+            self.end, self.index = self._read_index()
+        except Exception:
+            self.file.close()
+            raise
+        self.matches_index: Dict[str, Dict[str, Any]] = self.index["matches"]
+        self._block = (None, None, None)  # Match, block number and lines of the last decompressed block
+
+    def _read_index(self) -> Tuple[int, Dict[str, Any]]:
+        """
+        Read the last complete index of the archive: the one at the end of
+        the file, or an earlier one if an addition to the archive was cut
+        short.
+
+        Returns:
+            Tuple of the end offset of the index footer and the content of the index
+        """
+        header = self.file.read(HEADER.size)
+        if len(header) != HEADER.size or HEADER.unpack(header) != (ARCHIVE_MAGIC, ARCHIVE_VERSION):
+            raise ValueError(f"Not a version {ARCHIVE_VERSION} log archive: {self.path}")
+        end = self.file.seek(0, os.SEEK_END)
+        index = self._index_at(end)
+        if index is not None:
+            return end, index
+
+        # Look back for the footer of the last complete index
+        position = end
+        while position > HEADER.size + len(ARCHIVE_MAGIC):
+            start = max(HEADER.size, position - SCAN_CHUNK)
+            self.file.seek(start)
+            data = self.file.read(position - start)
+            found = data.rfind(ARCHIVE_MAGIC)
+            while found >= 0:
+                footer_end = start + found + len(ARCHIVE_MAGIC)
+                index = self._index_at(footer_end)
+                if index is not None:
+                    return footer_end, index
+                found = data.rfind(ARCHIVE_MAGIC, 0, found + len(ARCHIVE_MAGIC) - 1)
+            # Chunks overlap, so that a magic across two of them is found
+            position = start + len(ARCHIVE_MAGIC) - 1
+        raise ValueError(f"Log archive without an index, it was not closed: {self.path}")
+
+    def _index_at(self, footer_end: int) -> Optional[Dict[str, Any]]:
+        """
+        Read the index whose footer ends at an offset.
+
+        Args:
+            footer_end: Offset right after the footer
+
+        Returns:
+            Content of the index, or None if there is no complete index there
+        """
+        if footer_end < HEADER.size + FOOTER.size:
+            return None
+        self.file.seek(footer_end - FOOTER.size)
+        offset, length, magic = FOOTER.unpack(self.file.read(FOOTER.size))
+        if magic != ARCHIVE_MAGIC or offset < HEADER.size or offset + length != footer_end - FOOTER.size:
+            return None
+        self.file.seek(offset)
+        compression, _, data = self.file.read(length).partition(b"\n")
+        try:
+            return json.loads(CODECS[compression.decode()][1](data))
+        except (KeyError, ValueError, EOFError, OSError, zlib.error, lzma.LZMAError):
+            return None
+
+    def _read(self, offset: int, length: int, compression: str) -> bytes:
+        """Read and decompress a block or file of the archive."""
+        self.file.seek(offset)
+        return CODECS[compression][1](self.file.read(length))
+
+    def _entry(self, name: str) -> Dict[str, Any]:
+        """Get the index entry of a match."""
+        try:
+            return self.matches_index[name]
+        except KeyError:
+            raise KeyError(f"No match {name} in {self.path}") from None
+
+    def _block_lines(self, name: str, number: int) -> List[bytes]:
+        """
+        Decompress a block of a match, keeping the last one for the next read.
+
+        Args:
+            name: Match name
+            number: Index of the block
+
+        Returns:
+            Lines of the block: the state of its first turn, then the delta frames
+        """
+        if self._block[:2] != (name, number):
+            entry = self._entry(name)
+            offset, length = entry["blocks"][number]
+            self._block = (name, number, self._read(offset, length, entry["compression"]).splitlines())
+        return self._block[2]
+
+    def matches(self) -> List[str]:
+        """
+        List the matches of the archive.
+
+        Returns:
+            Match names, in the order they were added
+        """
+        return list(self.matches_index)
+
+    def __len__(self) -> int:
+        """Number of matches in the archive."""
+        return len(self.matches_index)
+
+    def __contains__(self, name: str) -> bool:
+        """Check if a match is in the archive."""
+        return name in self.matches_index
+
+    def turns(self, name: str) -> int:
+        """
+        Get the number of turns of a match.
+
+        Args:
+            name: Match name
+
+        Returns:
+            Number of game states in the log of the match
+        """
+        return self._entry(name)["turns"]
+
+    def state(self, name: str, turn: int) -> Dict[str, Any]:
+        """
+        Get the state of one turn of a match.
+
+        Args:
+            name: Match name
+            turn: Index of the turn, 0 being the state after the start positions
+
+        Returns:
+            Game state dictionary of the turn
+        """
+        entry = self._entry(name)
+        if not 0 <= turn < entry["turns"]:
+            raise IndexError(f"Turn out of range: {turn}")
+        number, position = divmod(turn, entry["block_turns"])
+        lines = self._block_lines(name, number)
+        state = json.loads(lines[0])
+        for line in lines[1:position + 1]:
+            state = apply_delta(state, json.loads(line))
+        return state
+
+    def iter_history(self, name: str) -> Iterator[Dict[str, Any]]:
+        """
+        Read a match one state at a time, decompressing one block at a time.
+
+        Args:
+            name: Match name
+
+        Returns:
+            Iterator of the game states of every turn
+        """
+        for number in range(len(self._entry(name)["blocks"])):
+            state = None
+            for line in self._block_lines(name, number):
+                frame = json.loads(line)
+                state = frame if state is None else apply_delta(state, frame)
+                yield state
+
+    def history(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Read a match as a list of states.
+
+        Args:
+            name: Match name
+
+        Returns:
+            Game states of every turn, the visualizer format
+        """
+        return list(self.iter_history(name))
+
+    def files(self, name: str) -> List[str]:
+        """
+        List the files attached to a match.
+
+        Args:
+            name: Match name
+
+        Returns:
+            Names of the files, such as METRICS_FILE
+        """
+        return list(self._entry(name).get("files", {}))
+
+    def read_file(self, name: str, file_name: str) -> bytes:
+        """
+        Read a file attached to a match.
+
+        Args:
+            name: Match name
+            file_name: Name of the file
+
+        Returns:
+            Content of the file
+        """
+        files = self._entry(name).get("files", {})
+        if file_name not in files:
+            raise KeyError(f"No file {file_name} attached to {name} in {self.path}")
+        return self._read(*files[file_name])
+
+    def close(self):
+        """
+        Close the archive file.
+        """
+        self.file.close()
+
+    def __enter__(self) -> "LogArchive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LogArchiveWriter:
+    """
+    LogArchiveWriter adds matches to a new or an existing archive. The
+    index of the added matches is written when the writer is closed;
+    until then, readers see the matches of the last index.
+    """
+
+    def __init__(self, path: str, compression: str = ARCHIVE_COMPRESSION, block_turns: int = ARCHIVE_BLOCK_TURNS):
+        """
+        Create an archive, or open an existing one to add matches to it.
+
+        Args:
+            path: Path of the archive
+            compression: Compression of the added matches, one of ARCHIVE_COMPRESSIONS
+            block_turns: Number of turns in a block of the added matches
+        """
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression: {compression}, expected one of {ARCHIVE_COMPRESSIONS}")
+        if block_turns < 1:
+            raise ValueError(f"Block turns must be at least 1: {block_turns}")
+        self.path = str(path)
+        self.compression = compression
+        self.compress = CODECS[compression][0]
+        self.block_turns = block_turns
+
+        if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+            with LogArchive(self.path) as archive:
+                end, self.matches = archive.end, archive.matches_index
+            # New blocks go after the last complete index, which stays valid until the new one is written;
+            # only the bytes of an addition that was cut short, which no index refers to, are dropped
+            self.file = open(self.path, "r+b")
+            self.file.seek(end)
+            self.file.truncate()
+        else:
+            self.matches: Dict[str, Dict[str, Any]] = {}
+            self.file = open(self.path, "wb")
+            self.file.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION))
+            # An empty index first, so that a writer killed before close leaves an archive that can be added to
+            self._write_index()
+
+    def _write(self, data: bytes) -> List[int]:
+        """
+        Append compressed data to the archive.
+
+        Returns:
+            Offset and length of the data
+        """
+        offset = self.file.tell()
+        self.file.write(data)
+        return [offset, len(data)]
+
+    def add_history(self, name: str, history: Iterable[Dict[str, Any]], files: Optional[Dict[str, bytes]] = None) -> int:
+        """
+        Add a match.
+
+        Args:
+            name: Match name, unique in the archive
+            history: Game states of every turn, read one at a time
+            files: Files to attach to the match, by name
+
+        Returns:
+            Number of turns added
+        """
+        if name in self.matches:
+            raise ValueError(f"Match {name} is already in {self.path}")
+        blocks, lines, previous, turns = [], [], None, 0
+        for state in history:
+            if turns % self.block_turns == 0:
+                if lines:
+                    blocks.append(self._write(self.compress(b"\n".join(lines))))
+                lines = [json.dumps(state).encode()]
+            else:
+                lines.append(json.dumps(diff_states(previous, state)).encode())
+            previous = state
+            turns += 1
+        if lines:
+            blocks.append(self._write(self.compress(b"\n".join(lines))))
+
+        entry = {"turns": turns, "compression": self.compression, "block_turns": self.block_turns, "blocks": blocks}
+        if files:
+            entry["files"] = {file_name: self._write(self.compress(data)) + [self.compression]
+                              for file_name, data in files.items()}
+        self.matches[name] = entry
+        return turns
+
+    def add_log(self, name: str, log_path: str, files: Optional[Dict[str, bytes]] = None) -> int:
+        """
+        Add a match from a game log file of any format.
+
+        Args:
+            name: Match name, unique in the archive
+            log_path: Path of the game log
+            files: Files to attach to the match, by name
+
+        Returns:
+            Number of turns added
+        """
+        return self.add_history(name, iter_history(log_path), files)
+
+    def _write_index(self):
+        """
+        Append the index of every match and its footer, and wait until they are on disk.
+        """
+        index = json.dumps({"version": ARCHIVE_VERSION, "matches": self.matches}).encode()
+        offset, length = self._write(self.compression.encode() + b"\n" + self.compress(index))
+        self.file.write(FOOTER.pack(offset, length, ARCHIVE_MAGIC))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        """
+        Write the index and close the archive file.
+        """
+        self._write_index()
+        self.file.close()
+
+    def __enter__(self) -> "LogArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def find_logs(log_dir: str) -> List[Path]:
+    """
+    Find the game logs of a directory and its subdirectories.
+
+    Args:
+        log_dir: Directory of game logs, such as data/logs
+
+    Returns:
+        Paths of the game logs, sorted, without the agent call metrics
+    """
+    return sorted(path for path in Path(log_dir).rglob("*")
+                  if path.is_file() and path.name.endswith(LOG_SUFFIXES) and not path.name.endswith(METRICS_SUFFIX))
+
+
+def pack_logs(log_dir: str, archive_path: str, compression: str = ARCHIVE_COMPRESSION,
+              block_turns: int = ARCHIVE_BLOCK_TURNS, remove: bool = False) -> List[str]:
+    """
+    Pack the game logs of a directory into an archive, with the agent call
+    metrics of every match attached. Matches already in the archive are
+    skipped.
+
+    Args:
+        log_dir: Directory of game logs, such as data/logs
+        archive_path: Path of the archive, created or added to
+        compression: Compression of the matches, one of ARCHIVE_COMPRESSIONS
+        block_turns: Number of turns in a block
+        remove: Remove every packed log and its metrics, once the archive
+            index that holds them is written
+
+    Returns:
+        Names of the packed matches
+    """
+    packed, packed_paths = [], []
+    with LogArchiveWriter(archive_path, compression, block_turns) as writer:
+        for log_path in find_logs(log_dir):
+            name = match_name(log_path.relative_to(log_dir))
+            if name in writer.matches:
+                continue
+            # Named by the runner after the log path without ".gz" and its format suffix
+            stem = log_path.name[:-len(".gz")] if log_path.name.endswith(".gz") else log_path.name
+            metrics_path = log_path.with_name(os.path.splitext(stem)[0] + METRICS_SUFFIX)
+            files = {METRICS_FILE: metrics_path.read_bytes()} if metrics_path.is_file() else None
+            writer.add_log(name, str(log_path), files)
+            packed.append(name)
+            packed_paths.extend([log_path, metrics_path] if files else [log_path])
+
+    if remove:
+        for path in packed_paths:
+            path.unlink()
+    return packed
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Pack game logs into an archive and read them back")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="Pack the game logs of a directory")
+    pack.add_argument("log_dir", help="Directory of game logs, such as data/logs")
+    pack.add_argument("archive", help="Path of the archive, such as data/logs.bwla, created or added to")
+    pack.add_argument("--compression", choices=ARCHIVE_COMPRESSIONS, default=ARCHIVE_COMPRESSION, help="Compression of every match")
+    pack.add_argument("--block_turns", type=int, default=ARCHIVE_BLOCK_TURNS, help="Number of turns decompressed to read one turn")
+    pack.add_argument("--remove", action="store_true", help="Remove the packed logs")
+
+    listing = commands.add_parser("list", help="List the matches of an archive")
+    listing.add_argument("archive", help="Path of the archive")
+
+    extract = commands.add_parser("extract", help="Write a match, or one turn of it, as a game log")
+    extract.add_argument("archive", help="Path of the archive")
+    extract.add_argument("match", help="Name of the match")
+    extract.add_argument("output", help="Path to write the game log to")
+    extract.add_argument("--format", choices=LOG_FORMATS, default="full", help="Format of the game log")
+    extract.add_argument("--compress", action="store_true", help="Write the game log with gzip")
+    extract.add_argument("--turn", type=int, default=None, help="Write only the state of this turn")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Pack, list or extract game logs."""
+    args = parse_args(argv)
+    if args.command == "pack":
+        packed = pack_logs(args.log_dir, args.archive, args.compression, args.block_turns, args.remove)
+        print(f"Packed {len(packed)} matches into {args.archive}")
+    elif args.command == "list":
+        with LogArchive(args.archive) as archive:
+            for name in archive.matches():
+                print(f"{name}\t{archive.turns(name)} turns")
+    elif args.turn is not None:
+        with LogArchive(args.archive) as archive:
+            state = archive.state(args.match, args.turn)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+    else:
+        with LogArchive(args.archive) as archive:
+            archive.turns(args.match)  # Fails early for a match that is not in the archive
+        convert_log(f"{args.archive}{ARCHIVE_SEPARATOR}{args.match}", args.output, args.format, args.compress)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Observation module for the "botwar ship" game.
+
+Structured results of Judger.step(), for programs that drive the judge
+directly instead of through agent input and output text.
+"""
+from typing import Any, List, Optional, Tuple
+
+from models.coordinate import Coordinate
+
+# Kinds of TurnEvent
+EVENT_COLLISION = "collision"  # A ship sank by colliding with another ship
+EVENT_TREASURE = "treasure"  # The treasure appeared at the center, value is its value
+EVENT_COLLECT = "collect"  # A ship collected gold or the treasure, value is the amount
+EVENT_SHIELD = "shield"  # A ship picked up a shield
+EVENT_DANGER = "danger"  # A ship without a shield sank on a danger cell
+EVENT_FIRE = "fire"  # A ship fired a missile at coord
+EVENT_HIT = "hit"  # A ship was hit by value missiles and lost gold_lost gold
+
+
+class TurnEvent:
+    """
+    TurnEvent is one thing that happened during a turn.
+    """
+
+    __slots__ = ("kind", "seat", "coord", "value", "gold_lost")
+
+    def __init__(self, kind: str, seat: Optional[int] = None, coord: Optional[Coordinate] = None,
+                 value: int = 0, gold_lost: int = 0):
+        """
+        Initialize an event.
+
+        Args:
+            kind: One of the EVENT_* constants
+            seat: Index of the player concerned, None for events of the map
+            coord: Cell where the event happened
+            value: Amount of the event, see the EVENT_* constants
+            gold_lost: Gold lost by a ship hit by missiles
+        """
+        self.kind = kind
+        self.seat = seat
+        self.coord = coord
+        self.value = value
+        self.gold_lost = gold_lost
+
+    def __repr__(self):
+        """Detailed string representation of the event."""
+        return f"TurnEvent(kind={self.kind!r}, seat={self.seat}, coord={self.coord}, value={self.value})"
+
+
+class PlayerObservation:
+    """
+    PlayerObservation is the state of one player after a turn.
+    """
+
+    __slots__ = ("position", "gold", "shield", "alive", "missiles", "missiles_fired")
+
+    def __init__(self, player):
+        """
+        Copy the state of a player.
+
+        Args:
+            player: The Player
+        """
+        self.position = player.position  # Coordinates are never modified, so they are shared
+        self.gold = player.gold
+        self.shield = player.shield
+        self.alive = player.alive
+        self.missiles = player.missiles
+        self.missiles_fired = list(player.missiles_fired)
+
+
+class Observation:
+    """
+    Observation is the state of a game after a turn: the players and the
+    items on the map, as objects rather than agent input text.
+    """
+
+    __slots__ = ("turn", "moves_left", "players", "items", "treasure_remaining")
+
+    def __init__(self, game_state):
+        """
+        Take a snapshot of a game state.
+
+        Args:
+            game_state: The GameState
+        """
+        self.turn = game_state.turn
+        self.moves_left = game_state.moves_left
+        self.players: List[PlayerObservation] = [PlayerObservation(player) for player in game_state.players]
+        self.items: List[Tuple[Coordinate, Any]] = list(game_state.map.non_empty_cells())  # Items are never modified
+        self.treasure_remaining = game_state.treasure_remaining
+
+
+class StepResult:
+    """
+    StepResult is what Judger.step() returns: the observation after the
+    turn, the events of the turn and whether the game has ended.
+    """
+
+    __slots__ = ("observation", "events", "done")
+
+    def __init__(self, observation: Observation, events: List[TurnEvent], done: bool):
+        """
+        Initialize a step result.
+
+        Args:
+            observation: State of the game after the turn
+            events: Events of the turn, in the order they happened
+            done: True if the game has ended
+        """
+        self.observation = observation
+        self.events = events
+        self.done = done
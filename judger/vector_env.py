@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Vector environment module for the "botwar ship" game.
+
+VectorEnv runs N games for a learning agent across worker processes, in
+the style of a Gymnasium vector environment: reset() and step(actions)
+return batched arrays, and every game resets itself when it ends. The
+other seats are played by agent scripts (such as the example bots) run
+in-process in the workers. Observations, actions, rewards and flags live
+in one shared memory block, so a step sends only a short command through
+a pipe to every worker and copies no arrays between processes.
+
+Requires NumPy.
+"""
+import multiprocessing
+import random
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from judger.judger import Judger
+from judger.file_handler import FileHandler
+from launcher.in_process_agent import InProcessAgent
+from models.coordinate import Coordinate
+from models.direction import Direction
+from models.geometry import get_geometry
+from models.move import Move
+from items.item import KIND_GOLD, KIND_SHIELD, KIND_DANGER, KIND_TREASURE
+from utils.constants import MAX_MISSILES_EACH_TURN
+
+# Channels of the grid observation
+CHANNEL_VALID = 0  # 1 for cells inside the hexagon
+CHANNEL_GOLD = 1  # Gold value
+CHANNEL_TREASURE = 2  # Treasure value
+CHANNEL_SHIELD = 3  # 1 for a shield
+CHANNEL_DANGER = 4  # 1 for a danger
+CHANNEL_SELF = 5  # 1 at the learner's ship
+CHANNEL_OPPONENTS = 6  # 1 at every other ship that is afloat
+CHANNEL_SUNK = 7  # 1 at every sunk ship
+NUM_CHANNELS = 8
+
+# Grid channel of every item kind
+KIND_CHANNELS = {KIND_GOLD: CHANNEL_GOLD, KIND_TREASURE: CHANNEL_TREASURE, KIND_SHIELD: CHANNEL_SHIELD,
+                 KIND_DANGER: CHANNEL_DANGER}
+
+# Features of every player, the learner first and then the next seats as in the agent input
+PLAYER_FEATURES = ["q", "r", "s", "gold", "shield", "alive", "missiles"]
+# Features of the game
+GLOBAL_FEATURES = ["moves_left", "turn", "treasure_remaining"]
+
+# Direction codes of the first action column
+DIRECTIONS = list(Direction)
+
+
+class SharedArrays:
+    """
+    SharedArrays lays out named NumPy arrays in one shared memory block,
+    which every process maps as the same arrays.
+    """
+
+    def __init__(self, layout: Dict[str, Tuple[Tuple[int, ...], str]], name: Optional[str] = None):
+        """
+        Create the block, or attach to an existing one.
+
+        Args:
+            layout: Dictionary of array name to (shape, dtype)
+            name: Name of the block to attach to, None to create a new one
+        """
+        offsets, size = {}, 0
+        for key, (shape, dtype) in layout.items():
+            offsets[key] = size
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            size += (nbytes + 63) // 64 * 64
+
+        self.layout = layout
+        self.owner = name is None
+        self.memory = SharedMemory(create=True, size=max(size, 1)) if self.owner else SharedMemory(name=name)
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self.memory.buf, offset=offsets[key])
+            for key, (shape, dtype) in layout.items()
+        }
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory block."""
+        return self.memory.name
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        """Get an array by name."""
+        return self.arrays[key]
+
+    def close(self):
+        """
+        Release the arrays, and remove the block if this process created it.
+        """
+        self.arrays = {}
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class BotWarEnv:
+    """
+    BotWarEnv is one game seen by a learning agent in one seat, with the
+    other seats played by in-process agents. It writes its observation
+    into arrays given by the caller.
+    """
+
+    def __init__(self, map_data: Dict[str, Any], opponents: List[InProcessAgent], seat: int = 0):
+        """
+        Initialize the environment. Call reset() before the first step.
+
+        Args:
+            map_data: Map data from the JSON file
+            opponents: Agents of the other seats, in seat order
+            seat: Seat of the learning agent
+        """
+        self.map_data = map_data
+        self.opponents = opponents
+        self.seat = seat
+        self.file_handler = FileHandler()
+        self.judger = None
+        self.geometry = get_geometry(map_data["map_radius"])
+        self.valid = np.frombuffer(bytes(self.geometry.valid), dtype=np.uint8).reshape(
+            self.geometry.width, self.geometry.width)
+
+    def _opponent_seats(self) -> List[int]:
+        """Seats of the opponents, in seat order."""
+        return [seat for seat in range(len(self.opponents) + 1) if seat != self.seat]
+
+    def reset(self):
+        """
+        Start a new game. The opponents choose their start positions, the
+        learner starts on a random empty cell of its start zone.
+        """
+        self.judger = Judger.from_map_data(self.map_data, self.file_handler, num_players=len(self.opponents) + 1)
+        positions = [{"q": 0, "r": 0, "s": 0}] * (len(self.opponents) + 1)  # (0, 0, 0) is never a start cell
+        for seat, agent in zip(self._opponent_seats(), self.opponents):
+            output = agent(self.file_handler.format_agent_output(self.judger.game_state, seat))
+            try:
+                q, r, s = map(int, output.strip().split())
+                positions[seat] = {"q": q, "r": r, "s": s}
+            except ValueError:
+                pass
+        self.judger.validate_start_positions(positions)
+
+    def step(self, action: np.ndarray) -> Tuple[float, bool]:
+        """
+        Play one turn.
+
+        Args:
+            action: Direction code followed by MAX_MISSILES_EACH_TURN missile
+                target cell indices, -1 for no missile
+
+        Returns:
+            Tuple of the learner's gold gained this turn and whether the game has ended
+        """
+        game_state = self.judger.game_state
+        coords = self.geometry.coords
+        targets = []
+        for cell in action[1:]:
+            if 0 <= cell < len(coords):
+                # Cells outside the hexagon have no coordinate; fire at one outside the map
+                targets.append(coords[cell] or Coordinate(self.geometry.radius + 1, 0, -self.geometry.radius - 1))
+        moves = [None] * len(game_state.players)
+        moves[self.seat] = Move(DIRECTIONS[int(action[0])], targets)
+
+        for seat, agent in zip(self._opponent_seats(), self.opponents):
+            if game_state.players[seat].alive:
+                output = agent(self.file_handler.format_agent_output(game_state, seat))
+                moves[seat] = self.file_handler.parse_agent_input(output) if output else Move()
+
+        gold = game_state.players[self.seat].gold
+        result = self.judger.step(moves)
+        return float(game_state.players[self.seat].gold - gold), result.done
+
+    def scores(self) -> List[int]:
+        """Gold of every player, in seat order."""
+        return [player.gold for player in self.judger.game_state.players]
+
+    def encode(self, grid: np.ndarray, players: np.ndarray, features: np.ndarray):
+        """
+        Write the observation of the learner.
+
+        Args:
+            grid: Array of shape (NUM_CHANNELS, W, W) for the cells
+            players: Array of shape (P, len(PLAYER_FEATURES)) for the players
+            features: Array of shape (len(GLOBAL_FEATURES),) for the game
+        """
+        game_state = self.judger.game_state
+        radius = self.geometry.radius
+
+        grid.fill(0)
+        grid[CHANNEL_VALID] = self.valid
+        for coord, item in game_state.map.non_empty_cells():
+            row, column = coord.q + radius, coord.r + radius
+            # Gold and treasure channels hold the value, shield and danger channels 1
+            grid[KIND_CHANNELS[item.kind], row, column] = item.value or 1
+
+        count = len(game_state.players)
+        for i in range(count):
+            player = game_state.players[(self.seat + i) % count]
+            position = player.position
+            channel = CHANNEL_SUNK if not player.alive else CHANNEL_SELF if i == 0 else CHANNEL_OPPONENTS
+            grid[channel, position.q + radius, position.r + radius] = 1
+            players[i] = (position.q, position.r, position.s, player.gold, player.shield, player.alive,
+                          player.missiles)
+
+        features[:] = (game_state.moves_left, game_state.turn, game_state.treasure_remaining)
+
+
+def _worker(connection, shared_name: str, layout: Dict[str, Any], map_data: Dict[str, Any],
+            opponent_paths: List[str], seat: int, first: int, last: int, seed: Optional[int]):
+    """
+    Serve the environments first to last - 1 of a VectorEnv.
+
+    Every command received on the connection is answered with None when it
+    is done, or with the traceback of an error.
+
+    Args:
+        connection: Pipe end of the worker
+        shared_name: Name of the shared memory block
+        layout: Layout of the shared arrays
+        map_data: Map data from the JSON file
+        opponent_paths: Agent scripts of the other seats
+        seat: Seat of the learning agent
+        first: Index of the first environment of the worker
+        last: Index after the last environment of the worker
+        seed: Seed of the worker's random module, None for a random seed
+    """
+    random.seed(seed)
+    shared = SharedArrays(layout, shared_name)
+    opponents = [InProcessAgent(path) for path in opponent_paths]
+    envs = {index: BotWarEnv(map_data, opponents, seat) for index in range(first, last)}
+
+    def reset(index: int):
+        envs[index].reset()
+        envs[index].encode(shared["grid"][index], shared["players"][index], shared["features"][index])
+
+    try:
+        while True:
+            command = connection.recv()
+            try:
+                if command == "close":
+                    break
+                if command == "reset":
+                    for index in envs:
+                        reset(index)
+                elif command == "step":
+                    for index, env in envs.items():
+                        reward, done = env.step(shared["actions"][index])
+                        shared["rewards"][index] = reward
+                        shared["terminated"][index] = done
+                        if done:
+                            # The observation of an ended game is the first one of the next game
+                            shared["final_scores"][index] = env.scores()
+                            reset(index)
+                        else:
+                            env.encode(shared["grid"][index], shared["players"][index], shared["features"][index])
+                connection.send(None)
+            except Exception:
+                connection.send(traceback.format_exc())
+    finally:
+        shared.close()
+        connection.close()
+
+
+class VectorEnv:
+    """
+    VectorEnv runs num_envs games across num_workers processes.
+
+    Observations are a dictionary of arrays with a leading num_envs axis:
+    "grid" (NUM_CHANNELS, W, W) where the cell (q, r) is at row q + radius
+    and column r + radius, "players" (P, len(PLAYER_FEATURES)) with the
+    learner first, and "features" (len(GLOBAL_FEATURES),). The arrays are
+    views of the shared memory and are overwritten by the next step; copy
+    them to keep them.
+
+    An action is a row of num_envs x (1 + MAX_MISSILES_EACH_TURN) integers:
+    a direction code (index into DIRECTIONS) and missile target cells as
+    flat indices q_row * W + r_column, -1 for no missile. The reward is the
+    gold the learner gained in the turn.
+    """
+
+    def __init__(self, map_path: str, opponent_paths: List[str], num_envs: int, num_workers: int = 1,
+                 seat: int = 0, seed: Optional[int] = None):
+        """
+        Start the workers.
+
+        Args:
+            map_path: Path to the map JSON file
+            opponent_paths: Python agent scripts of the other seats, in seat order
+            num_envs: Number of games
+            num_workers: Number of worker processes
+            seat: Seat of the learning agent
+            seed: Seed of the games, None for random games
+        """
+        map_data = FileHandler().read_json(map_path)
+        num_players = len(opponent_paths) + 1
+        width = get_geometry(map_data["map_radius"]).width
+        layout = {
+            "grid": ((num_envs, NUM_CHANNELS, width, width), "float32"),
+            "players": ((num_envs, num_players, len(PLAYER_FEATURES)), "float32"),
+            "features": ((num_envs, len(GLOBAL_FEATURES)), "float32"),
+            "actions": ((num_envs, 1 + MAX_MISSILES_EACH_TURN), "int64"),
+            "rewards": ((num_envs,), "float32"),
+            "terminated": ((num_envs,), "bool"),
+            "final_scores": ((num_envs, num_players), "int64"),
+        }
+        self.num_envs = num_envs
+        self.width = width
+        self.shared = SharedArrays(layout)
+        self.observations = {key: self.shared[key] for key in ("grid", "players", "features")}
+
+        num_workers = max(1, min(num_workers, num_envs))
+        bounds = [num_envs * i // num_workers for i in range(num_workers + 1)]
+        self.connections = []
+        self.workers = []
+        for i in range(num_workers):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(child_connection, self.shared.name, layout, map_data, opponent_paths, seat,
+                      bounds[i], bounds[i + 1], None if seed is None else seed + i))
+            worker.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.workers.append(worker)
+
+    def _send(self, command: str):
+        """
+        Send a command to every worker and wait until all are done.
+
+        Raises:
+            RuntimeError: If a worker failed
+        """
+        for connection in self.connections:
+            connection.send(command)
+        errors = [error for error in (connection.recv() for connection in self.connections) if error]
+        if errors:
+            raise RuntimeError(f"Vector environment worker failed:\n{errors[0]}")
+
+    def reset(self) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+        """
+        Start a new game in every environment.
+
+        Returns:
+            Tuple of the observations and an empty info dictionary
+        """
+        self._send("reset")
+        return self.observations, {}
+
+    def step(self, actions: np.ndarray) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray,
+                                                 Dict[str, Any]]:
+        """
+        Play one turn in every environment. Games that end are reset, and
+        their observation is the first one of the next game.
+
+        Args:
+            actions: Array of shape (num_envs, 1 + MAX_MISSILES_EACH_TURN)
+
+        Returns:
+            Tuple of the observations, rewards, terminated and truncated flags,
+            and infos: "final_scores" holds the gold of every player of the
+            games that ended, marked by "_final_scores"
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 1:
+            # Directions only
+            self.shared["actions"][:, 0] = actions
+            self.shared["actions"][:, 1:] = -1
+        else:
+            self.shared["actions"][:] = actions
+        self._send("step")
+
+        terminated = self.shared["terminated"].copy()
+        infos = {"final_scores": self.shared["final_scores"].copy(), "_final_scores": terminated}
+        return self.observations, self.shared["rewards"].copy(), terminated, np.zeros_like(terminated), infos
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory.
+        """
+        if not self.workers:
+            return
+        for connection in self.connections:
+            try:
+                connection.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self.workers:
+            worker.join()
+        for connection in self.connections:
+            connection.close()
+        self.workers = []
+        self.connections = []
+        self.observations = {}
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Agent shim for the persistent agent protocol.
+
+Serves a Python agent over framed stdin/stdout messages so the interpreter
+and the agent's imports are loaded once per match. For every request the
+shim runs the agent's script as __main__ and answers with a status line,
+OK or FAILED, followed by its move. In file mode the turn goes through
+MAP.INP/ACT.OUT, in pipe mode through in-memory stdin/stdout.
+
+Usage: python agent_shim.py [--io file|pipe] path/to/agent.py
+"""
+import argparse
+import io
+import os
+import sys
+import traceback
+from typing import Optional
+
+from framing import READY, read_frame, write_frame
+
+INPUT_FILE = "MAP.INP"
+OUTPUT_FILE = "ACT.OUT"
+
+
+class CapturedOutput(io.BytesIO):
+    """
+    In-memory stdout that stays readable after the agent closes it.
+    """
+
+    def close(self):
+        """Ignore close so the captured output can still be read."""
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Serve a Python agent over the persistent agent protocol")
+    parser.add_argument("--io", choices=["file", "pipe"], default="file", help="I/O mode of the agent")
+    parser.add_argument("agent", help="Path to the agent script")
+    return parser.parse_args()
+
+
+def exec_agent(code, agent_path: str, argv: list) -> bool:
+    """
+    Execute the agent script once as __main__.
+
+    Args:
+        code: Compiled code object of the agent script
+        agent_path: Path to the agent script
+        argv: Value of sys.argv for the agent
+
+    Returns:
+        True if the agent finished successfully, False otherwise
+    """
+    sys.argv = argv
+    try:
+        exec(code, {"__name__": "__main__", "__file__": agent_path, "__builtins__": __builtins__})
+    except SystemExit as e:
+        return e.code in (None, 0)
+    except Exception:
+        traceback.print_exc()
+        return False
+    return True
+
+
+def run_file_agent(code, agent_path: str, input_data: bytes) -> Optional[bytes]:
+    """
+    Run the agent once through MAP.INP and ACT.OUT.
+
+    Args:
+        code: Compiled code object of the agent script
+        agent_path: Path to the agent script
+        input_data: Contents of MAP.INP
+
+    Returns:
+        Contents of ACT.OUT, or None if the agent failed
+    """
+    with open(INPUT_FILE, "wb") as f:
+        f.write(input_data)
+    if os.path.exists(OUTPUT_FILE):
+        os.remove(OUTPUT_FILE)
+
+    succeeded = exec_agent(code, agent_path, [agent_path, INPUT_FILE])
+    sys.stdout.flush()
+
+    if not succeeded:
+        return None
+    if not os.path.exists(OUTPUT_FILE):
+        return b""
+    with open(OUTPUT_FILE, "rb") as f:
+        return f.read()
+
+
+def run_pipe_agent(code, agent_path: str, input_data: bytes) -> Optional[bytes]:
+    """
+    Run the agent once with the input on stdin, capturing its stdout.
+
+    Args:
+        code: Compiled code object of the agent script
+        agent_path: Path to the agent script
+        input_data: Input data in MAP.INP format
+
+    Returns:
+        Everything the agent wrote to stdout, or None if the agent failed
+    """
+    real_stdin, real_stdout = sys.stdin, sys.stdout
+    output = CapturedOutput()
+    sys.stdin = io.TextIOWrapper(io.BytesIO(input_data), encoding="utf-8")
+    sys.stdout = io.TextIOWrapper(output, encoding="utf-8", write_through=True)
+    try:
+        succeeded = exec_agent(code, agent_path, [agent_path, "-"])
+        if not sys.stdout.closed:
+            sys.stdout.flush()
+        return output.getvalue() if succeeded else None
+    finally:
+        sys.stdin, sys.stdout = real_stdin, real_stdout
+
+
+def open_protocol_streams():
+    """
+    Take over stdin and stdout for the protocol and point the agent's own
+    stdin and stdout elsewhere, so that stray prints cannot corrupt a frame.
+
+    Returns:
+        Tuple of the binary protocol input and output streams
+    """
+    protocol_in = os.fdopen(os.dup(0), "rb")
+    protocol_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+    return protocol_in, protocol_out
+
+
+def main():
+    """Main function of the shim."""
+    args = parse_args()
+    agent_path = os.path.abspath(args.agent)
+    run_agent = run_pipe_agent if args.io == "pipe" else run_file_agent
+    protocol_in, protocol_out = open_protocol_streams()
+
+    # The agent sees its own directory first on the import path, as it would
+    # when started directly.
+    sys.path[0] = os.path.dirname(agent_path)
+
+    with open(agent_path, "rb") as f:
+        code = compile(f.read(), agent_path, "exec")
+
+    write_frame(protocol_out, READY)
+    while True:
+        request = read_frame(protocol_in)
+        if request is None:
+            break
+        output = run_agent(code, agent_path, request)
+        write_frame(protocol_out, b"FAILED\n" if output is None else b"OK\n" + output)
+
+
+if __name__ == "__main__":
+    main()
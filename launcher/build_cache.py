@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Build cache module for agents submitted as C, C++, Rust or Go source.
+"""
+import os
+import sys
+import hashlib
+import shutil
+import logging
+import subprocess
+import functools
+from typing import List, Dict, Optional
+
+from utils.constants import BUILD_CACHE_DIR, BUILD_TIMEOUT
+
+
+class Toolchain:
+    """
+    Toolchain describes how to compile an agent written in one language
+    into an optimized native executable.
+    """
+
+    def __init__(self, name: str, compiler: str, version_args: List[str], build_args: List[str],
+                 source_extensions: List[str]):
+        """
+        Initialize a toolchain.
+
+        Args:
+            name: Name of the language
+            compiler: Compiler executable
+            version_args: Arguments that make the compiler print its version
+            build_args: Compiler arguments, with {source} and {output} placeholders
+            source_extensions: Extensions (or file names) of the files the build depends on
+        """
+        self.name = name
+        self.compiler = compiler
+        self.version_args = version_args
+        self.build_args = build_args
+        self.source_extensions = source_extensions
+
+    def build_command(self, source: str, output: str) -> List[str]:
+        """
+        Build the command line that compiles an agent.
+
+        Args:
+            source: Path to the agent source file
+            output: Path of the executable to produce
+
+        Returns:
+            Command line as a list of arguments
+        """
+        return [self.compiler] + [arg.format(source=source, output=output) for arg in self.build_args]
+
+    @functools.lru_cache(maxsize=None)
+    def version(self) -> str:
+        """
+        Identify the installed compiler, so that a compiler upgrade invalidates the cache.
+
+        Returns:
+            Resolved compiler path and its version output
+
+        Raises:
+            RuntimeError: If the compiler is not installed
+        """
+        compiler_path = shutil.which(self.compiler)
+        if compiler_path is None:
+            raise RuntimeError(f"Compiler for {self.name} agents not found: {self.compiler}")
+        result = subprocess.run([compiler_path] + self.version_args, capture_output=True, text=True)
+        return f"{compiler_path}\n{result.stdout}{result.stderr}"
+
+    def is_dependency(self, file_name: str) -> bool:
+        """
+        Check if a file of the agent directory is part of the build.
+
+        Args:
+            file_name: Name of the file
+
+        Returns:
+            True if changing the file may change the executable, False otherwise
+        """
+        return file_name in self.source_extensions or os.path.splitext(file_name)[1] in self.source_extensions
+
+
+C_TOOLCHAIN = Toolchain("C", "gcc", ["--version"],
+                        ["-O2", "-o", "{output}", "{source}", "-lm"],
+                        [".c", ".h"])
+CPP_TOOLCHAIN = Toolchain("C++", "g++", ["--version"],
+                          ["-O2", "-std=c++17", "-o", "{output}", "{source}"],
+                          [".cpp", ".cc", ".cxx", ".h", ".hpp", ".hh"])
+RUST_TOOLCHAIN = Toolchain("Rust", "rustc", ["--version"],
+                           ["-C", "opt-level=3", "--edition", "2021", "-o", "{output}", "{source}"],
+                           [".rs"])
+GO_TOOLCHAIN = Toolchain("Go", "go", ["version"],
+                         ["build", "-trimpath", "-o", "{output}", "{source}"],
+                         [".go", "go.mod", "go.sum"])
+
+# Registry of source extensions that are compiled before the match
+TOOLCHAINS: Dict[str, Toolchain] = {
+    ".c": C_TOOLCHAIN,
+    ".cpp": CPP_TOOLCHAIN,
+    ".cc": CPP_TOOLCHAIN,
+    ".cxx": CPP_TOOLCHAIN,
+    ".rs": RUST_TOOLCHAIN,
+    ".go": GO_TOOLCHAIN,
+}
+
+
+class BuildCache:
+    """
+    BuildCache compiles source agents once and keeps the executables in a
+    directory keyed by a hash of the agent's sources and the toolchain, so
+    every match and every benchmark round with the same agent reuses the
+    same executable.
+    """
+
+    def __init__(self, cache_dir: str = BUILD_CACHE_DIR):
+        """
+        Initialize the build cache.
+
+        Args:
+            cache_dir: Directory holding the compiled agents
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.logger = logging.getLogger("BuildCache")
+
+    @staticmethod
+    def toolchain(agent_path: str) -> Optional[Toolchain]:
+        """
+        Get the toolchain that compiles an agent.
+
+        Args:
+            agent_path: Path to the agent executable or source file
+
+        Returns:
+            The toolchain, or None if the agent does not need to be compiled
+        """
+        return TOOLCHAINS.get(os.path.splitext(agent_path)[1].lower())
+
+    @staticmethod
+    def is_source(agent_path: str) -> bool:
+        """
+        Check if an agent is submitted as source code of a compiled language.
+
+        Args:
+            agent_path: Path to the agent executable or source file
+
+        Returns:
+            True if the agent must be compiled before it can run, False otherwise
+        """
+        return BuildCache.toolchain(agent_path) is not None
+
+    def cache_key(self, agent_path: str) -> str:
+        """
+        Hash everything the executable of an agent depends on: the toolchain,
+        the compiler flags and the source files of the agent directory.
+
+        Args:
+            agent_path: Path to the agent source file
+
+        Returns:
+            Hex digest identifying the executable
+        """
+        agent_path = os.path.abspath(agent_path)
+        agent_dir = os.path.dirname(agent_path)
+        toolchain = self.toolchain(agent_path)
+
+        digest = hashlib.sha256()
+        digest.update(toolchain.version().encode("utf-8"))
+        digest.update("\0".join(toolchain.build_args).encode("utf-8"))
+        digest.update(os.path.relpath(agent_path, agent_dir).encode("utf-8"))
+
+        for root, dirs, files in os.walk(agent_dir):
+            dirs.sort()
+            for file_name in sorted(files):
+                if not toolchain.is_dependency(file_name):
+                    continue
+                path = os.path.join(root, file_name)
+                digest.update(b"\0" + os.path.relpath(path, agent_dir).encode("utf-8") + b"\0")
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        return digest.hexdigest()
+
+    def build(self, agent_path: str) -> str:
+        """
+        Get the executable of a source agent, compiling it on a cache miss.
+
+        Args:
+            agent_path: Path to the agent source file
+
+        Returns:
+            Path to the cached executable
+
+        Raises:
+            RuntimeError: If the compiler is missing or the build fails
+        """
+        agent_path = os.path.abspath(agent_path)
+        toolchain = self.toolchain(agent_path)
+        entry_dir = os.path.join(self.cache_dir, self.cache_key(agent_path))
+        name = os.path.splitext(os.path.basename(agent_path))[0]
+        executable = os.path.join(entry_dir, name + (".exe" if sys.platform == "win32" else ""))
+        if os.path.exists(executable):
+            return executable
+
+        self.logger.info(f"Building {toolchain.name} agent: {agent_path}")
+        os.makedirs(entry_dir, exist_ok=True)
+        # Build under a private name, other processes may build the same agent at the same time
+        partial = os.path.join(entry_dir, f".{name}.{os.getpid()}.partial")
+        try:
+            result = subprocess.run(toolchain.build_command(agent_path, partial), cwd=os.path.dirname(agent_path),
+                                    capture_output=True, text=True, timeout=BUILD_TIMEOUT)
+            if result.returncode != 0:
+                raise RuntimeError(f"Failed to build agent {agent_path}:\n{result.stderr}")
+            os.replace(partial, executable)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return executable
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Fork server for Python agents.
+
+Loads the interpreter and the agent's imports once, then forks a fresh child
+for every turn, so each turn starts from a clean copy of the preloaded
+process without paying for interpreter startup. Only available where
+os.fork exists.
+
+Every request frame is the think time limit in seconds on the first line
+followed by the MAP.INP text. Every response frame is a status line followed
+by the agent's move. The status line holds OK, FAILED or TIMEOUT and the
+child's user time, system time and peak RSS in KiB.
+
+Usage: python fork_server.py [--io file|pipe] path/to/agent.py
+"""
+import ast
+import os
+import select
+import signal
+import sys
+import time
+
+from framing import READY, read_frame, write_frame
+from agent_shim import open_protocol_streams, parse_args, run_file_agent, run_pipe_agent
+
+
+def preload_imports(tree: ast.Module):
+    """
+    Execute the top-level import statements of the agent so that the modules
+    are already loaded in every forked child.
+
+    Args:
+        tree: Parsed agent script
+    """
+    for node in tree.body:
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            continue
+        try:
+            exec(compile(ast.Module(body=[node], type_ignores=[]), "<preload>", "exec"), {})
+        except Exception:
+            # The child will raise the same error when it runs the agent
+            pass
+
+
+def reseed_random():
+    """
+    Give the child its own random state instead of the one copied from the server.
+    """
+    if "random" in sys.modules:
+        sys.modules["random"].seed()
+    if "numpy" in sys.modules:
+        sys.modules["numpy"].random.seed()
+
+
+def serve_turn(run_agent, code, agent_path: str, request: bytes) -> bytes:
+    """
+    Fork a child that runs the agent on one turn and collect its move.
+
+    Args:
+        run_agent: Function that runs the agent in the chosen I/O mode
+        code: Compiled code object of the agent script
+        agent_path: Path to the agent script
+        request: Request frame payload
+
+    Returns:
+        Response frame payload
+    """
+    header, _, input_data = request.partition(b"\n")
+    deadline = time.monotonic() + float(header)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: run the agent once and send its move back through the pipe
+        os.close(read_fd)
+        status = 1
+        try:
+            reseed_random()
+            output = run_agent(code, agent_path, input_data)
+            if output is not None:
+                with os.fdopen(write_fd, "wb") as f:
+                    f.write(output)
+                status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    chunks = []
+    timed_out = False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+            timed_out = True
+            break
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(read_fd)
+
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+    _, wait_status, rusage = os.wait4(pid, 0)
+
+    max_rss = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+    usage = f" {rusage.ru_utime} {rusage.ru_stime} {max_rss}\n".encode("ascii")
+    if timed_out:
+        return b"TIMEOUT" + usage
+    if os.waitstatus_to_exitcode(wait_status) != 0:
+        return b"FAILED" + usage
+    return b"OK" + usage + b"".join(chunks)
+
+
+def main():
+    """Main function of the fork server."""
+    args = parse_args()
+    agent_path = os.path.abspath(args.agent)
+    run_agent = run_pipe_agent if args.io == "pipe" else run_file_agent
+    protocol_in, protocol_out = open_protocol_streams()
+
+    # The agent sees its own directory first on the import path
+    sys.path[0] = os.path.dirname(agent_path)
+
+    with open(agent_path, "rb") as f:
+        source = f.read()
+    tree = ast.parse(source, agent_path)
+    code = compile(tree, agent_path, "exec")
+    preload_imports(tree)
+
+    write_frame(protocol_out, READY)
+    while True:
+        request = read_frame(protocol_in)
+        if request is None:
+            break
+        write_frame(protocol_out, serve_turn(run_agent, code, agent_path, request))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Fork server agent module for the "botwar ship" game.
+"""
+import os
+import subprocess
+from typing import List, Dict, Any, Optional, Union
+
+from launcher.persistent_agent import PersistentAgent
+
+FORK_SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fork_server.py")
+
+# Extra time given to the fork server to report a move or a timeout
+FORK_SERVER_GRACE = 1
+
+
+class ForkServerAgent(PersistentAgent):
+    """
+    ForkServerAgent runs a Python agent through a fork server that keeps the
+    interpreter and the agent's imports loaded and forks a fresh child for
+    every turn. Unlike a persistent agent, every turn still starts from a
+    clean process state.
+    """
+
+    @staticmethod
+    def is_supported(agent_path: str) -> bool:
+        """
+        Check if an agent can be run through the fork server.
+
+        Args:
+            agent_path: Path to the agent executable or script
+
+        Returns:
+            True for Python agents on platforms with os.fork, False otherwise
+        """
+        return hasattr(os, "fork") and os.path.splitext(agent_path)[1] == ".py"
+
+    def command(self) -> List[str]:
+        """
+        Build the command line that starts the fork server for the agent.
+
+        Returns:
+            Command line as a list of arguments
+        """
+        return ["python", FORK_SERVER_PATH, "--io", self.io_mode, self.agent_path]
+
+    def request(self, input_data: Union[str, bytes], timeout: float,
+                stats: Optional[Dict[str, Any]] = None) -> Union[str, bytes]:
+        """
+        Run the agent on one turn in a freshly forked child.
+
+        Args:
+            input_data: Input data for the agent (MAP.INP format), bytes for a binary protocol agent
+            timeout: Think time limit in seconds
+            stats: Dictionary that receives the statistics of the call, including the child's resource usage
+
+        Returns:
+            The agent's response (ACT.OUT format), bytes if the input was bytes
+
+        Raises:
+            subprocess.TimeoutExpired: If the agent does not answer in time
+            RuntimeError: If the agent fails or the fork server exits
+        """
+        binary = isinstance(input_data, bytes)
+        payload = f"{timeout}\n".encode("ascii") + (input_data if binary else input_data.encode("utf-8"))
+        response = self._exchange(payload, timeout + FORK_SERVER_GRACE, stats)
+
+        # Status line: status, then the child's user time, system time and peak RSS
+        status_line, _, output = response.partition(b"\n")
+        status, *usage = status_line.split()
+        if stats is not None and len(usage) == 3:
+            stats["user_time"], stats["sys_time"] = float(usage[0]), float(usage[1])
+            stats["max_rss"] = int(usage[2])
+
+        if status == b"TIMEOUT":
+            raise subprocess.TimeoutExpired(self.command(), timeout)
+        if status != b"OK":
+            raise RuntimeError(f"Agent execution failed: {self.agent_path}")
+        return output if binary else output.decode("utf-8")
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Framing module for the persistent agent protocol.
+
+Every message is an ASCII decimal byte count, a newline, then exactly that
+many payload bytes. The payloads are the usual MAP.INP and ACT.OUT texts.
+"""
+from typing import BinaryIO, Optional
+
+# Payload of the first frame an agent sends once it is ready for turns
+READY = b"READY"
+
+# Argument passed to native executables started in persistent mode
+PERSISTENT_FLAG = "--persistent"
+
+
+def write_frame(stream: BinaryIO, payload: bytes):
+    """
+    Write a single frame to a binary stream and flush it.
+
+    Args:
+        stream: Binary stream to write to
+        payload: Bytes to send
+    """
+    stream.write(str(len(payload)).encode("ascii") + b"\n" + payload)
+    stream.flush()
+
+
+def read_frame(stream: BinaryIO) -> Optional[bytes]:
+    """
+    Read a single frame from a binary stream.
+
+    Args:
+        stream: Binary stream to read from
+
+    Returns:
+        The frame payload, or None if the stream ended
+
+    Raises:
+        ValueError: If the frame header is not a byte count
+    """
+    header = stream.readline()
+    if not header:
+        return None
+
+    size = int(header.strip())
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+    return payload
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+In-process agent module for the "botwar ship" game.
+"""
+import builtins
+import io
+import os
+import sys
+import traceback
+from typing import Any, Dict
+
+INPUT_FILE = "MAP.INP"
+OUTPUT_FILE = "ACT.OUT"
+
+
+class _OutputFile(io.StringIO):
+    """
+    In-memory ACT.OUT that stays readable after the agent closes it.
+    """
+
+    def close(self):
+        """Ignore close so the move can still be read."""
+
+
+class InProcessAgent:
+    """
+    InProcessAgent runs a Python agent script inside the current process,
+    with no process, interpreter startup or file system round trip per
+    turn. The script is compiled once and executed as __main__ for every
+    call; its open() is replaced by one that serves MAP.INP from memory and
+    captures ACT.OUT, and its stdin and stdout are in-memory streams for
+    agents that use pipes.
+
+    Agents share the interpreter, including the random module and anything
+    they import, so this is meant for trusted agents such as the examples.
+    """
+
+    def __init__(self, agent_path: str):
+        """
+        Load an agent script.
+
+        Args:
+            agent_path: Path to the agent's main.py
+        """
+        self.agent_path = os.path.abspath(agent_path)
+        with open(self.agent_path, "r", encoding="utf-8") as f:
+            self.code = compile(f.read(), self.agent_path, "exec")
+
+        # The agent sees its own directory on the import path, as it would when run as a script
+        agent_dir = os.path.dirname(self.agent_path)
+        if agent_dir not in sys.path:
+            sys.path.append(agent_dir)
+
+    def __call__(self, input_data: str) -> str:
+        """
+        Run the agent for one turn.
+
+        Args:
+            input_data: Agent input in MAP.INP format
+
+        Returns:
+            The agent's move from ACT.OUT or stdout, or an empty string if it failed
+        """
+        output = _OutputFile()
+
+        def agent_open(file, mode="r", *args, **kwargs):
+            name = os.path.basename(file) if isinstance(file, str) else None
+            if name == INPUT_FILE and "r" in mode:
+                return io.StringIO(input_data)
+            if name == OUTPUT_FILE and "w" in mode:
+                return output
+            return builtins.open(file, mode, *args, **kwargs)
+
+        namespace: Dict[str, Any] = {"__name__": "__main__", "__file__": self.agent_path,
+                                     "__builtins__": builtins, "open": agent_open}
+        real_argv, real_stdin, real_stdout = sys.argv, sys.stdin, sys.stdout
+        sys.argv = [self.agent_path, INPUT_FILE]
+        sys.stdin = io.StringIO(input_data)
+        sys.stdout = stdout = _OutputFile()
+        try:
+            exec(self.code, namespace)
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                return ""
+        except Exception:
+            traceback.print_exc()
+            return ""
+        finally:
+            sys.argv, sys.stdin, sys.stdout = real_argv, real_stdin, real_stdout
+
+        return output.getvalue() or stdout.getvalue()
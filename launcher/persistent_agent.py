@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Persistent agent module for the "botwar ship" game.
+"""
+import os
+import queue
+import subprocess
+import threading
+import time
+import logging
+from typing import List, Dict, Any, Optional, Union
+
+from launcher.framing import READY, PERSISTENT_FLAG, read_frame, write_frame
+from utils.constants import STARTUP_TIMEOUT
+
+SHIM_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agent_shim.py")
+
+
+class PersistentAgent:
+    """
+    PersistentAgent keeps one agent process alive for a whole match and
+    exchanges turns with it over framed stdin/stdout messages.
+
+    Python agents are served through the agent shim, so any agent written
+    for MAP.INP/ACT.OUT works unchanged. Native executables are started with
+    the --persistent flag and must speak the framing protocol themselves.
+    """
+
+    def __init__(self, agent_path: str, io_mode: str = "file", executable: Optional[str] = None):
+        """
+        Initialize a persistent agent without starting it.
+
+        Args:
+            agent_path: Path to the agent executable or script
+            io_mode: How the shim hands a turn to a Python agent, "file" or "pipe"
+            executable: Compiled executable of a source agent, run in the agent directory
+        """
+        self.agent_path = os.path.abspath(agent_path)
+        self.io_mode = io_mode
+        self.executable = executable
+        self.agent_dir = os.path.dirname(self.agent_path)
+        self.process = None
+        self.frames = None
+        self.launches = 0
+        self.logger = logging.getLogger("PersistentAgent")
+
+    def command(self) -> List[str]:
+        """
+        Build the command line that starts the agent in persistent mode.
+
+        Returns:
+            Command line as a list of arguments
+        """
+        if not self.uses_shim():
+            return [self.executable or self.agent_path, PERSISTENT_FLAG]
+        return ["python", SHIM_PATH, "--io", self.io_mode, self.agent_path]
+
+    def uses_shim(self) -> bool:
+        """
+        Check if the agent is a Python script served by the agent shim.
+
+        Returns:
+            True for a Python agent, False for a native executable
+        """
+        if self.executable is not None:
+            return False
+        return os.path.splitext(self.agent_path)[1] not in ("", ".exe")
+
+    def is_alive(self) -> bool:
+        """
+        Check if the agent process is running.
+
+        Returns:
+            True if the process is running, False otherwise
+        """
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Start the agent process and wait until it reports that it is ready.
+
+        Raises:
+            RuntimeError: If the agent exits or misbehaves during startup
+        """
+        self.launches += 1
+        self.process = subprocess.Popen(
+            self.command(),
+            cwd=self.agent_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self.frames = queue.Queue()
+        threading.Thread(target=self._read_frames, args=(self.process.stdout, self.frames), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.process.stderr,), daemon=True).start()
+
+        try:
+            ready = self._receive(STARTUP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.close()
+            raise RuntimeError(f"Agent did not become ready within {STARTUP_TIMEOUT}s: {self.agent_path}")
+        if ready != READY:
+            self.close()
+            raise RuntimeError(f"Agent failed to start in persistent mode: {self.agent_path}")
+
+    def request(self, input_data: Union[str, bytes], timeout: float,
+                stats: Optional[Dict[str, Any]] = None) -> Union[str, bytes]:
+        """
+        Send one turn to the agent and wait for its response.
+
+        The agent is (re)started first if it is not running, and the timeout
+        only covers the time between sending the input and receiving the move.
+
+        Args:
+            input_data: Input data for the agent (MAP.INP format), bytes for a binary protocol agent
+            timeout: Think time limit in seconds
+            stats: Dictionary that receives the statistics of the call
+
+        Returns:
+            The agent's response (ACT.OUT format), bytes if the input was bytes
+
+        Raises:
+            subprocess.TimeoutExpired: If the agent does not answer in time
+            RuntimeError: If the agent fails or its process exits
+        """
+        binary = isinstance(input_data, bytes)
+        output = self._exchange(input_data if binary else input_data.encode("utf-8"), timeout, stats)
+
+        if self.uses_shim():
+            # Status line of the shim: OK, or FAILED if the agent raised or exited nonzero
+            status, _, output = output.partition(b"\n")
+            if status != b"OK":
+                raise RuntimeError(f"Agent execution failed: {self.agent_path}")
+        return output if binary else output.decode("utf-8")
+
+    def _exchange(self, payload: bytes, timeout: float, stats: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Send one frame to the agent, (re)starting it if needed, and wait for the answer.
+
+        Args:
+            payload: Frame payload to send
+            timeout: Time limit in seconds for the answer
+            stats: Dictionary that receives startup_time and first_byte
+
+        Returns:
+            Payload of the answer frame
+        """
+        stats = stats if stats is not None else {}
+        if not self.is_alive():
+            if self.launches > 0:
+                self.logger.warning(f"Restarting agent (restart {self.launches}): {self.agent_path}")
+            self.close()
+            start = time.perf_counter()
+            self.start()
+            stats["startup_time"] = time.perf_counter() - start
+
+        try:
+            start = time.perf_counter()
+            write_frame(self.process.stdin, payload)
+            response = self._receive(timeout)
+            stats["first_byte"] = time.perf_counter() - start
+        except subprocess.TimeoutExpired:
+            # A late answer would be read as the next turn's move, so the
+            # process is discarded and restarted on the next request.
+            self.close()
+            raise
+        except OSError as e:
+            self.close()
+            raise RuntimeError(f"Agent process exited: {e}")
+
+        if response is None:
+            self.close()
+            raise RuntimeError(f"Agent process exited: {self.agent_path}")
+        return response
+
+    def close(self):
+        """
+        Stop the agent process.
+        """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+        self.frames = None
+
+    def _receive(self, timeout: float) -> Optional[bytes]:
+        """
+        Wait for the next frame from the agent.
+
+        Args:
+            timeout: Time limit in seconds
+
+        Returns:
+            The frame payload, or None if the agent exited
+        """
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            raise subprocess.TimeoutExpired(self.command(), timeout)
+
+    def _read_frames(self, stream, frames: queue.Queue):
+        """
+        Forward frames from the agent's stdout to a queue until it closes.
+        """
+        try:
+            while True:
+                frame = read_frame(stream)
+                frames.put(frame)
+                if frame is None:
+                    break
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Invalid frame from agent {self.agent_path}: {e}")
+            frames.put(None)
+
+    def _read_stderr(self, stream):
+        """
+        Drain the agent's stderr so that it can never block on a full pipe.
+        """
+        for line in stream:
+            self.logger.debug(f"{self.agent_path}: {line.decode('utf-8', errors='replace').rstrip()}")
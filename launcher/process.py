@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Process module for running agent executables with resource accounting.
+"""
+import asyncio
+import os
+import signal
+import sys
+import subprocess
+import threading
+import time
+from typing import List, Dict, Any, Optional, Union
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, CPU and memory usage are then not recorded
+    resource = None
+
+# Seconds between two reads of a running agent's peak RSS from /proc
+RSS_SAMPLE_INTERVAL = 0.005
+
+
+def rusage_stats(rusage) -> Dict[str, Any]:
+    """
+    Convert a resource usage record into agent call statistics.
+
+    Args:
+        rusage: Result of resource.getrusage or os.wait4
+
+    Returns:
+        Dictionary with user_time, sys_time (seconds) and max_rss (KiB)
+    """
+    max_rss = rusage.ru_maxrss
+    if sys.platform == "darwin":
+        # macOS reports bytes instead of KiB
+        max_rss //= 1024
+    return {
+        "user_time": rusage.ru_utime,
+        "sys_time": rusage.ru_stime,
+        "max_rss": max_rss
+    }
+
+
+def peak_rss(pid: int) -> Optional[int]:
+    """
+    Read the peak RSS of a running process from /proc/<pid>/status.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        VmHWM in KiB, or None where /proc is not available or the process has exited
+    """
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def run_process(command: List[str], cwd: str, input_data: Optional[Union[str, bytes]], timeout: float,
+                stats: Optional[Dict[str, Any]] = None) -> subprocess.CompletedProcess:
+    """
+    Run a process to completion like subprocess.run, recording how long it
+    took to produce its first byte of output and how much CPU time and memory
+    it used.
+
+    The ru_maxrss of a spawned child starts at the judge's own resident size
+    and is kept across exec, so the peak RSS is taken from VmHWM, sampled
+    while the process runs, where /proc exists. ru_maxrss is only used when
+    it is above the judge's peak at spawn, which the child can only reach by
+    itself; otherwise max_rss is left unset.
+
+    Args:
+        command: Command line as a list of arguments
+        cwd: Working directory of the process
+        input_data: Text sent on stdin, or None to leave stdin untouched; with bytes, the
+            bytes are sent as they are and stdout is returned as bytes too
+        timeout: Time limit in seconds
+        stats: Dictionary that receives first_byte, user_time, sys_time and max_rss
+
+    Returns:
+        CompletedProcess with the text output of the process
+
+    Raises:
+        subprocess.TimeoutExpired: If the process did not finish in time
+    """
+    stats = stats if stats is not None else {}
+    payload = input_data.encode("utf-8") if isinstance(input_data, str) else input_data
+    rss_floor = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        stdin=subprocess.PIPE if input_data is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    stdout_chunks = []
+    stderr_chunks = []
+
+    def read_stdout():
+        for chunk in iter(lambda: process.stdout.read1(65536), b""):
+            if not stdout_chunks:
+                stats["first_byte"] = time.perf_counter() - start
+            stdout_chunks.append(chunk)
+
+    def read_stderr():
+        for chunk in iter(lambda: process.stderr.read1(65536), b""):
+            stderr_chunks.append(chunk)
+
+    def write_stdin():
+        try:
+            process.stdin.write(payload)
+            process.stdin.close()
+        except OSError:
+            # The process exited without reading its input
+            pass
+
+    threads = [threading.Thread(target=read_stdout), threading.Thread(target=read_stderr)]
+    if input_data is not None:
+        threads.append(threading.Thread(target=write_stdin))
+    for thread in threads:
+        thread.start()
+
+    timed_out = False
+    if resource is not None:
+        # Reap the process ourselves to get the resource usage of this child only
+        waited = {}
+        finished = threading.Event()
+
+        def wait_process():
+            try:
+                _, waited["status"], waited["rusage"] = os.wait4(process.pid, 0)
+            except ChildProcessError:
+                # Reaped elsewhere, the exit status is then left to Popen
+                pass
+            finished.set()
+
+        def sample_rss():
+            # Popen returns after exec, so every sample is of the agent itself
+            while not finished.is_set():
+                rss = peak_rss(process.pid)
+                if rss is None:
+                    break
+                waited["peak_rss"] = max(rss, waited.get("peak_rss", 0))
+                finished.wait(RSS_SAMPLE_INTERVAL)
+
+        waiter = threading.Thread(target=wait_process)
+        waiter.start()
+        sampler = threading.Thread(target=sample_rss)
+        sampler.start()
+        waiter.join(timeout)
+        if waiter.is_alive():
+            timed_out = True
+            # Not process.kill(), whose poll() could reap the child before wait4 does
+            try:
+                os.kill(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            waiter.join()
+        status = waited.get("status")
+        process.returncode = os.waitstatus_to_exitcode(status) if status is not None else process.wait()
+        sampler.join()
+        rusage = waited.get("rusage")
+        if rusage is not None:
+            stats.update(rusage_stats(rusage))
+            stats["max_rss"] = stats["max_rss"] if rusage.ru_maxrss > rss_floor else None
+        if waited.get("peak_rss") is not None:
+            stats["max_rss"] = max(waited["peak_rss"], stats.get("max_rss") or 0)
+    else:
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            process.kill()
+            process.wait()
+
+    for thread in threads:
+        thread.join()
+    process.stdout.close()
+    process.stderr.close()
+
+    if timed_out:
+        raise subprocess.TimeoutExpired(command, timeout)
+
+    stdout = b"".join(stdout_chunks)
+    return subprocess.CompletedProcess(
+        command,
+        process.returncode,
+        stdout if isinstance(input_data, bytes) else stdout.decode("utf-8", errors="replace"),
+        b"".join(stderr_chunks).decode("utf-8", errors="replace")
+    )
+
+
+async def run_process_async(command: List[str], cwd: str, input_data: Optional[Union[str, bytes]], timeout: float,
+                            stats: Optional[Dict[str, Any]] = None) -> subprocess.CompletedProcess:
+    """
+    Run a process to completion on the asyncio event loop, recording how long
+    it took to produce its first byte of output.
+
+    Args:
+        command: Command line as a list of arguments
+        cwd: Working directory of the process
+        input_data: Text sent on stdin, or None to leave stdin untouched; with bytes, the
+            bytes are sent as they are and stdout is returned as bytes too
+        timeout: Time limit in seconds
+        stats: Dictionary that receives first_byte
+
+    Returns:
+        CompletedProcess with the text output of the process
+
+    Raises:
+        subprocess.TimeoutExpired: If the process did not finish in time
+    """
+    stats = stats if stats is not None else {}
+    payload = input_data.encode("utf-8") if isinstance(input_data, str) else input_data
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=cwd,
+        stdin=subprocess.PIPE if input_data is not None else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
+    stdout_chunks = []
+
+    async def read_stdout():
+        while True:
+            chunk = await process.stdout.read(65536)
+            if not chunk:
+                break
+            if not stdout_chunks:
+                stats["first_byte"] = time.perf_counter() - start
+            stdout_chunks.append(chunk)
+
+    async def write_stdin():
+        try:
+            process.stdin.write(payload)
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # The process exited without reading its input
+            pass
+
+    tasks = [read_stdout(), process.stderr.read(), process.wait()]
+    if input_data is not None:
+        tasks.append(write_stdin())
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise subprocess.TimeoutExpired(command, timeout)
+
+    stdout = b"".join(stdout_chunks)
+    return subprocess.CompletedProcess(
+        command,
+        process.returncode,
+        stdout if isinstance(input_data, bytes) else stdout.decode("utf-8", errors="replace"),
+        results[1].decode("utf-8", errors="replace")
+    )
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Result store module for benchmark rounds that were already played.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import functools
+from typing import Any, Dict, List, Optional
+
+from utils.constants import RESULT_STORE_DIR
+
+# Directories and files whose Python sources make up the judge and run the agents, relative to the repository root
+JUDGE_SOURCES = ["judger", "models", "items", "utils", "launcher", "runner.py", "async_runner.py"]
+
+# Files an agent run leaves in its directory, which do not change the agent
+AGENT_RUN_FILES = {"MAP.INP", "ACT.OUT"}
+
+RESULT_FILE = "result.json"
+
+
+@functools.lru_cache(maxsize=None)
+def judge_version() -> str:
+    """
+    Hash the sources of the judge, so that a change of the rules or of
+    how agents are run invalidates the stored results.
+
+    Returns:
+        Hex digest of the judge sources
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for source in JUDGE_SOURCES:
+        path = os.path.join(root, source)
+        paths = [path] if os.path.isfile(path) else [
+            os.path.join(directory, file_name)
+            for directory, _, files in sorted(os.walk(path))
+            for file_name in sorted(files) if file_name.endswith(".py")
+        ]
+        for file_path in paths:
+            digest.update(b"\0" + os.path.relpath(file_path, root).encode("utf-8") + b"\0")
+            with open(file_path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def hash_file(path: str) -> str:
+    """
+    Hash the contents of a file.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest of the file
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_agent(agent_path: str) -> str:
+    """
+    Hash an agent: the name of its entry file and every file of its
+    directory, except the files left by agent runs and Python caches.
+
+    Args:
+        agent_path: Path to the agent executable or source file
+
+    Returns:
+        Hex digest of the agent
+    """
+    agent_path = os.path.abspath(agent_path)
+    agent_dir = os.path.dirname(agent_path)
+    digest = hashlib.sha256(os.path.relpath(agent_path, agent_dir).encode("utf-8"))
+    for root, dirs, files in os.walk(agent_dir):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for file_name in sorted(files):
+            if file_name in AGENT_RUN_FILES or file_name.endswith(".pyc"):
+                continue
+            path = os.path.join(root, file_name)
+            digest.update(b"\0" + os.path.relpath(path, agent_dir).encode("utf-8") + b"\0")
+            digest.update(hash_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    ResultStore keeps the results and logs of played rounds in a directory
+    keyed by a hash of everything that decides the round: the map file,
+    the agents in seat order, the seed, the match options and the judge
+    version. A round of deterministic agents replayed with the same key
+    can be read back instead of played again.
+    """
+
+    def __init__(self, store_dir: str = RESULT_STORE_DIR):
+        """
+        Initialize the result store.
+
+        Args:
+            store_dir: Directory holding the stored rounds
+        """
+        self.store_dir = os.path.abspath(store_dir)
+        self.logger = logging.getLogger("ResultStore")
+
+    def round_key(self, map_path: str, agent_paths: List[str], seed: int,
+                  options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Compute the key of a round.
+
+        Args:
+            map_path: Path to the map JSON file
+            agent_paths: Paths to the agents, in seat order
+            seed: Seed of the judge's random generator
+            options: Other match options that can change the result, such as the time bank
+
+        Returns:
+            Hex digest identifying the round
+        """
+        parts = {
+            "judge": judge_version(),
+            "map": hash_file(map_path),
+            "agents": [hash_agent(agent_path) for agent_path in agent_paths],
+            "seed": seed,
+            "options": options or {},
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        """Get the directory of an entry."""
+        return os.path.join(self.store_dir, key[:2], key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a stored round.
+
+        Args:
+            key: Key of the round
+
+        Returns:
+            The stored entry, with "result" and the paths of its "files", or None on a miss
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, RESULT_FILE), "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        files = {name: os.path.join(entry_dir, file_name) for name, file_name in entry["files"].items()}
+        if not all(os.path.exists(path) for path in files.values()):
+            return None
+        # The modification time records the last use, for collect()
+        os.utime(os.path.join(entry_dir, RESULT_FILE))
+        return {"result": entry["result"], "files": files}
+
+    def put(self, key: str, result: Dict[str, Any], files: Dict[str, str]):
+        """
+        Store a played round, replacing any entry with the same key.
+
+        Args:
+            key: Key of the round
+            result: Results of the round, as JSON data
+            files: Dictionary of name to path of the files to keep with it, such as the log
+        """
+        entry_dir = self._entry_dir(key)
+        os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+        # Fill the entry under a private name, other processes may store the same round at the same time
+        partial = os.path.join(os.path.dirname(entry_dir), f".{key}.{os.getpid()}.partial")
+        shutil.rmtree(partial, ignore_errors=True)
+        os.makedirs(partial)
+        try:
+            names = {}
+            for name, path in files.items():
+                names[name] = name + "_" + os.path.basename(path)
+                shutil.copyfile(path, os.path.join(partial, names[name]))
+            with open(os.path.join(partial, RESULT_FILE), "w") as f:
+                json.dump({"judge": judge_version(), "created": time.time(), "result": result, "files": names}, f)
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            try:
+                os.replace(partial, entry_dir)
+            except OSError:
+                self.logger.debug(f"Round {key} was stored by another process")
+        finally:
+            shutil.rmtree(partial, ignore_errors=True)
+
+    def collect(self, max_age: float) -> int:
+        """
+        Remove the stale entries: those of another judge version, those not
+        used for max_age seconds and unfinished ones.
+
+        Args:
+            max_age: Age in seconds after which an unused entry is removed
+
+        Returns:
+            Number of entries removed
+        """
+        if not os.path.isdir(self.store_dir):
+            return 0
+        now = time.time()
+        removed = 0
+        for prefix in os.listdir(self.store_dir):
+            prefix_dir = os.path.join(self.store_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for name in os.listdir(prefix_dir):
+                entry_dir = os.path.join(prefix_dir, name)
+                result_path = os.path.join(entry_dir, RESULT_FILE)
+                try:
+                    with open(result_path, "r") as f:
+                        stale = json.load(f)["judge"] != judge_version()
+                    stale = stale or now - os.path.getmtime(result_path) > max_age
+                except (OSError, ValueError, KeyError):
+                    # Unfinished or damaged, an old partial entry of a crashed process
+                    stale = now - os.path.getmtime(entry_dir) > 3600 or not name.endswith(".partial")
+                if stale:
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    removed += 1
+        return removed
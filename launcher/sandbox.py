@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Sandbox module for reusable agent working directories.
+"""
+import os
+import shutil
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, files are then always copied
+    fcntl = None
+
+# ioctl request that makes a file share the extents of another file (Linux btrfs/XFS)
+FICLONE = 0x40049409
+
+SANDBOX_LINK_MODES = ["copy", "hardlink"]
+
+# Turn files of the file I/O mode, never carried over from the agent directory
+TURN_FILES = ["MAP.INP", "ACT.OUT"]
+
+
+def clone_file(source: str, target: str, link_mode: str = "copy") -> bool:
+    """
+    Create target as a copy of source as cheaply as the filesystem allows:
+    a hard link in hardlink mode, otherwise a reflink, otherwise a full copy.
+
+    Args:
+        source: Path to the file to copy
+        target: Path of the copy, must not exist
+        link_mode: One of SANDBOX_LINK_MODES
+
+    Returns:
+        True if no data had to be copied, False otherwise
+    """
+    if link_mode == "hardlink":
+        try:
+            os.link(source, target)
+            return True
+        except OSError:
+            pass
+
+    if fcntl is not None:
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, target)
+            return True
+        except OSError:
+            pass
+
+    shutil.copy2(source, target)
+    return False
+
+
+class AgentSandbox:
+    """
+    AgentSandbox is a private working directory holding a copy of an agent
+    directory. It is populated once and then reset between matches, which
+    only touches the files that changed: files the agent created are removed
+    and files that were modified are copied again.
+    """
+
+    def __init__(self, agent_dir: str, sandbox_dir: str, link_mode: str = "copy"):
+        """
+        Initialize a sandbox without populating it.
+
+        Args:
+            agent_dir: Agent directory to mirror
+            sandbox_dir: Directory of the sandbox
+            link_mode: One of SANDBOX_LINK_MODES, hardlink shares unchanged files
+                with the agent directory, which is only safe for agents that
+                never modify their own files in place
+        """
+        if link_mode not in SANDBOX_LINK_MODES:
+            raise ValueError(f"Unknown sandbox link mode: {link_mode}")
+        self.agent_dir = os.path.abspath(agent_dir)
+        self.sandbox_dir = os.path.abspath(sandbox_dir)
+        self.link_mode = link_mode
+        self.manifest: Dict[str, Tuple[int, int]] = {}  # Relative path to (size, mtime) of every agent file
+
+    def agent_path(self, agent_path: str) -> str:
+        """
+        Get the path of an agent file inside the sandbox.
+
+        Args:
+            agent_path: Path to a file in the agent directory
+
+        Returns:
+            Path to the same file in the sandbox
+        """
+        return os.path.join(self.sandbox_dir, os.path.relpath(os.path.abspath(agent_path), self.agent_dir))
+
+    def populate(self):
+        """
+        Fill the sandbox with the agent directory.
+        """
+        shutil.rmtree(self.sandbox_dir, ignore_errors=True)
+        os.makedirs(self.sandbox_dir)
+        self.manifest = {}
+        for relpath in self._agent_files():
+            self._sync_file(relpath)
+
+    def reset(self):
+        """
+        Bring the sandbox back to the state of the agent directory, touching
+        only the files that differ.
+        """
+        if not os.path.isdir(self.sandbox_dir):
+            self.populate()
+            return
+
+        agent_files = set(self._agent_files())
+
+        # Remove MAP.INP, ACT.OUT and any other scratch file the agent left behind
+        for root, dirs, files in os.walk(self.sandbox_dir, topdown=False):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                relpath = os.path.relpath(path, self.sandbox_dir)
+                if relpath not in agent_files:
+                    os.remove(path)
+                    self.manifest.pop(relpath, None)
+            if root != self.sandbox_dir and not os.listdir(root):
+                os.rmdir(root)
+
+        # Copy again whatever the agent modified, or what changed in the agent directory
+        for relpath in agent_files:
+            recorded = self.manifest.get(relpath)
+            if (recorded is None or recorded != self._stat(os.path.join(self.agent_dir, relpath))
+                    or recorded != self._stat(os.path.join(self.sandbox_dir, relpath))):
+                self._sync_file(relpath)
+
+    def remove(self):
+        """
+        Delete the sandbox directory.
+        """
+        shutil.rmtree(self.sandbox_dir, ignore_errors=True)
+        self.manifest = {}
+
+    def _agent_files(self) -> List[str]:
+        """
+        List the files of the agent directory, except for leftover turn files.
+
+        Returns:
+            Paths of the files relative to the agent directory
+        """
+        relpaths = []
+        for root, _, files in os.walk(self.agent_dir):
+            for file_name in files:
+                if root == self.agent_dir and file_name in TURN_FILES:
+                    continue
+                relpaths.append(os.path.relpath(os.path.join(root, file_name), self.agent_dir))
+        return relpaths
+
+    def _sync_file(self, relpath: str):
+        """
+        Replace a sandbox file with the agent's version of it.
+
+        Args:
+            relpath: Path of the file relative to the agent directory
+        """
+        source = os.path.join(self.agent_dir, relpath)
+        target = os.path.join(self.sandbox_dir, relpath)
+        if os.path.lexists(target):
+            os.remove(target)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        clone_file(source, target, self.link_mode)
+        self.manifest[relpath] = self._stat(source)
+
+    @staticmethod
+    def _stat(path: str) -> Tuple[int, int]:
+        """
+        Get the size and modification time of a file.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            Size in bytes and modification time in nanoseconds, or (-1, -1) if the file is missing
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return -1, -1
+        return stat.st_size, stat.st_mtime_ns
+
+
+class SandboxPool:
+    """
+    SandboxPool keeps populated sandboxes of agent directories and hands
+    them out one match at a time, resetting them in between.
+    """
+
+    def __init__(self, root: str, link_mode: str = "copy"):
+        """
+        Initialize an empty pool.
+
+        Args:
+            root: Directory under which the sandboxes are created
+            link_mode: One of SANDBOX_LINK_MODES
+        """
+        self.root = os.path.abspath(root)
+        self.link_mode = link_mode
+        self.free: Dict[str, List[AgentSandbox]] = {}  # Agent directory to idle sandboxes
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, agent_dir: str) -> AgentSandbox:
+        """
+        Get a sandbox of an agent directory that no one else is using.
+
+        Args:
+            agent_dir: Agent directory to mirror
+
+        Returns:
+            A sandbox in the state of the agent directory
+        """
+        agent_dir = os.path.abspath(agent_dir)
+        with self.lock:
+            idle = self.free.setdefault(agent_dir, [])
+            sandbox = idle.pop() if idle else None
+            if sandbox is None:
+                self.count += 1
+                sandbox_dir = os.path.join(self.root, f"{self.count}_{os.path.basename(agent_dir)}")
+                sandbox = AgentSandbox(agent_dir, sandbox_dir, self.link_mode)
+        sandbox.reset()
+        return sandbox
+
+    def release(self, sandbox: AgentSandbox):
+        """
+        Return a sandbox to the pool.
+
+        Args:
+            sandbox: Sandbox obtained from acquire
+        """
+        with self.lock:
+            self.free.setdefault(sandbox.agent_dir, []).append(sandbox)
+
+    def close(self):
+        """
+        Delete all sandboxes of the pool.
+        """
+        with self.lock:
+            self.free = {}
+        shutil.rmtree(self.root, ignore_errors=True)
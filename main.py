@@ -4,15 +4,47 @@ Entry point for the "botwar ship" game.
 """
 import argparse
 from runner import Runner
+from utils.constants import AGENT_IO_MODES, AGENT_PROTOCOLS, TIME_BANK, BUILD_CACHE_DIR, MAP_STORAGE, MAP_STORAGES
+from utils.constants import LOG_FORMAT, LOG_FORMATS, KEYFRAME_INTERVAL
 
 
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="botwar ship - Hexagonal grid-based strategy game")
     parser.add_argument("--map", required=True, help="Path to the map JSON file")
-    parser.add_argument("--agents", nargs=3, required=True, help="Paths to the three agent executables")
+    parser.add_argument("--agents", nargs="+", required=True,
+                        help="Paths to the agent executables, one per ship (three by default maps)")
     parser.add_argument("--output", default="./data/logs/final_results.json", help="Output path for game logs")
-    return parser.parse_args()
+    parser.add_argument("--io", nargs="+", choices=AGENT_IO_MODES, default=None,
+                        help="I/O mode of each agent: MAP.INP/ACT.OUT files or stdin/stdout pipes")
+    parser.add_argument("--protocol", nargs="+", choices=AGENT_PROTOCOLS, default=None,
+                        help="Protocol of each agent: MAP.INP text or binary messages (utils/binary_protocol.py)")
+    launch_mode = parser.add_mutually_exclusive_group()
+    launch_mode.add_argument("--persistent", action="store_true",
+                             help="Keep each agent process alive for the whole match instead of starting it every turn")
+    launch_mode.add_argument("--fork_server", action="store_true",
+                             help="Run Python agents by forking a preloaded interpreter every turn")
+    parser.add_argument("--time_bank", type=float, default=TIME_BANK,
+                        help="Extra seconds each agent may spend over the per-turn timeout during the match")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Run the agents of a turn at the same time instead of one after another")
+    parser.add_argument("--build_cache", default=BUILD_CACHE_DIR,
+                        help="Directory holding the compiled executables of C, C++, Rust and Go agents")
+    parser.add_argument("--map_storage", choices=MAP_STORAGES, default=MAP_STORAGE,
+                        help="How the judge stores the map: dictionary of cells or dense arrays")
+    parser.add_argument("--log_format", choices=LOG_FORMATS, default=LOG_FORMAT,
+                        help="Game log format: every full state, or keyframes and per-turn changes")
+    parser.add_argument("--keyframe_interval", type=int, default=KEYFRAME_INTERVAL,
+                        help="Turns from one keyframe to the next in a delta game log")
+    parser.add_argument("--compress_log", action="store_true", help="Write the game log with gzip")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed of the judge's random numbers, to replay a match; recorded in the log")
+    args = parser.parse_args()
+    if args.io is not None and len(args.io) != len(args.agents):
+        parser.error(f"--io needs one mode per agent, got {len(args.io)} for {len(args.agents)} agents")
+    if args.protocol is not None and len(args.protocol) != len(args.agents):
+        parser.error(f"--protocol needs one protocol per agent, got {len(args.protocol)} for {len(args.agents)} agents")
+    return args
 
 
 def main():
@@ -20,16 +52,24 @@ def main():
     args = parse_args()
 
     # Initialize the runner with the agents
-    runner = Runner(args.agents)
+    runner = Runner(args.agents, persistent=args.persistent, parallel=args.parallel, io_modes=args.io,
+                    fork_server=args.fork_server, time_bank=args.time_bank, build_cache_dir=args.build_cache,
+                    map_storage=args.map_storage, log_format=args.log_format,
+                    keyframe_interval=args.keyframe_interval, compress_log=args.compress_log, seed=args.seed,
+                    protocols=args.protocol)
 
-    # Initialize the game with the map
-    runner.initialize_game(args.map, args.output)
+    try:
+        # Initialize the game with the map
+        runner.initialize_game(args.map, args.output)
 
-    # Run the game until completion
-    runner.run_game()
+        # Run the game until completion
+        runner.run_game()
 
-    # Report the final results
-    runner.report_results()
+        # Report the final results
+        runner.report_results()
+    finally:
+        # Stop any agent processes that are still alive
+        runner.close()
 
 
 if __name__ == "__main__":
@@ -10,11 +10,18 @@ class Cell:
     Cell class representing a single cell in the hexagonal grid.
     """
 
+    __slots__ = ("_item",)
+
     def __init__(self):
         """
         Initialize an empty cell.
         """
-        self.item = None
+        self._item = None
+
+    @property
+    def item(self) -> Optional[Any]:
+        """The item in the cell, or None if the cell is empty."""
+        return self._item
 
     def is_empty(self) -> bool:
         """
@@ -23,7 +30,7 @@ class Cell:
         Returns:
             True if the cell is empty, False otherwise
         """
-        return self.item is None
+        return self._item is None
 
     def get_item(self) -> Optional[Any]:
         """
@@ -32,7 +39,7 @@ class Cell:
         Returns:
             The item in the cell, or None if the cell is empty
         """
-        return self.item
+        return self._item
 
     def set_item(self, item: Any):
         """
@@ -41,10 +48,10 @@ class Cell:
         Args:
             item: The item to set
         """
-        self.item = item
+        self._item = item
 
     def clear_item(self):
         """
         Remove any item from the cell.
         """
-        self.item = None
+        self._item = None
@@ -4,16 +4,19 @@ Coordinate module for the "botwar ship" game.
 """
 from typing import List, Tuple
 
-from models.direction import Direction
+from models.direction import Direction, DIRECTION_OFFSETS
 from utils.validators import validate_coordinate
 
 
 class Coordinate:
     """
     Coordinate class representing a position in the hexagonal grid
-    using cube coordinates (q, r, s).
+    using cube coordinates (q, r, s). Coordinates are never modified after
+    creation, so the judge shares them (see models.geometry).
     """
 
+    __slots__ = ("q", "r", "s")
+
     def __init__(self, q: int, r: int, s: int):
         """
         Initialize a coordinate with q, r, s values.
@@ -46,8 +49,8 @@ class Coordinate:
         Returns:
             Coordinate in the specified direction
         """
-        coordinate = direction.to_coordinate()
-        return Coordinate(self.q + coordinate[0], self.r + coordinate[1], self.s + coordinate[2])
+        dq, dr, ds = DIRECTION_OFFSETS[direction]
+        return Coordinate(self.q + dq, self.r + dr, self.s + ds)
 
     def neighbors(self) -> List['Coordinate']:
         """
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Dense map module for the "botwar ship" game.
+"""
+from array import array
+from typing import List, Optional, Any
+
+from models.coordinate import Coordinate
+from models.cell import Cell
+from models.map import Map
+from models.geometry import HexGeometry, get_geometry
+from items.item import KIND_EMPTY
+from items.kinds import kind_of
+from utils.constants import MAP_STORAGE
+
+
+class DenseCell(Cell):
+    """
+    DenseCell is a view of one slot of a DenseMap. It behaves like a Cell,
+    but reads and writes the map's arrays.
+    """
+
+    __slots__ = ("map", "index")
+
+    def __init__(self, dense_map: 'DenseMap', index: int):
+        """
+        Initialize a view of a map slot.
+
+        Args:
+            dense_map: The map holding the cell
+            index: Flat index of the cell in the map's arrays
+        """
+        self.map = dense_map
+        self.index = index
+
+    @property
+    def item(self) -> Optional[Any]:
+        """The item in the cell, or None if the cell is empty."""
+        return self.map.items[self.index]
+
+    def is_empty(self) -> bool:
+        """
+        Check if the cell is empty (contains no item).
+
+        Returns:
+            True if the cell is empty, False otherwise
+        """
+        return self.map.kinds[self.index] == KIND_EMPTY
+
+    def get_item(self) -> Optional[Any]:
+        """
+        Get the item in the cell.
+
+        Returns:
+            The item in the cell, or None if the cell is empty
+        """
+        return self.map.items[self.index]
+
+    def set_item(self, item: Any):
+        """
+        Set the item in the cell.
+
+        Args:
+            item: The item to set
+        """
+        self.map.store(self.index, item)
+
+    def clear_item(self):
+        """
+        Remove any item from the cell.
+        """
+        self.map.store(self.index, None)
+
+
+class DenseMap(Map):
+    """
+    DenseMap stores the hexagonal grid in preallocated arrays indexed by a
+    flat index computed from (q, r), instead of a dictionary of Coordinate
+    to Cell. The cell views and coordinates of all slots are created with
+    the map, so looking up a cell never hashes a coordinate, never
+    allocates and never grows the map. Clones create their views when
+    first looked up, so cloning does not pay for every slot.
+
+    Every slot holds the item kind and value (the compact form used to
+    serialize the map) next to the item object handed to the judger, which
+    must be replaced rather than modified in place.
+    """
+
+    def __init__(self, radius: int):
+        """
+        Initialize an empty map.
+
+        Args:
+            radius: Radius of the map
+        """
+        self.radius = radius
+        self.geometry: HexGeometry = get_geometry(radius)
+        self.width = self.geometry.width  # Slots per q row, including the corners outside the hexagon
+        size = self.width * self.width
+        self.kinds = bytearray(size)  # Item kind of every slot, see KIND_*
+        self.values = array("i", bytes(4 * size))  # Gold or treasure value of every slot
+        self.items: List[Optional[Any]] = [None] * size  # Item object of every slot
+        self.views: List[Optional[DenseCell]] = [None] * size  # Cell view of every slot inside the hexagon
+        self.coords: List[Optional[Coordinate]] = self.geometry.coords  # Interned coordinate of every slot inside the hexagon
+        for coord in self.geometry.cells:
+            index = self.geometry.index_of(coord.q, coord.r)
+            self.views[index] = DenseCell(self, index)
+        self._reset_index()
+
+    # Attributes holding the state of the map, shared by clone() and restore()
+    SHARED = ("kinds", "values", "items", "occupied", "lines", "_order", "_cell_list", "_cell_records")
+
+    def _unshare(self):
+        """
+        Copy the shared arrays and index before changing them.
+        """
+        self.kinds = bytearray(self.kinds)
+        self.values = array("i", self.values)
+        self.items = list(self.items)
+        super()._unshare()
+
+    def _attach(self):
+        """
+        Give a new clone its own cell views, created again when looked up.
+        """
+        self.views = [None] * len(self.views)
+
+    def restore(self, other: 'DenseMap'):
+        """
+        Make the map equal to a clone of it, such as a snapshot taken with
+        clone(). The storage is shared as with clone().
+
+        Args:
+            other: The map to copy, of the same radius
+        """
+        other._share()
+        for name in self.SHARED:
+            setattr(self, name, getattr(other, name))
+        self._share()
+
+    def index(self, q: int, r: int) -> int:
+        """
+        Get the flat index of a coordinate.
+
+        Args:
+            q: q-coordinate
+            r: r-coordinate
+
+        Returns:
+            Index into the map's arrays, or -1 if the coordinate is outside the map
+        """
+        return self.geometry.index(q, r)
+
+    def store(self, index: int, item: Any):
+        """
+        Put an item in a slot.
+
+        Args:
+            index: Index into the map's arrays
+            item: The item, or None to empty the slot
+        """
+        if self._shared:
+            self._unshare()
+        self.kinds[index] = kind_of(item)
+        self.values[index] = 0 if item is None else item.value
+        self.items[index] = item
+        self.track(index, self.coords[index], item)
+
+    def get_cell(self, coord: Coordinate) -> Cell:
+        """
+        Get the cell at the specified coordinate.
+
+        Args:
+            coord: The coordinate to get the cell for
+
+        Returns:
+            The cell at the coordinate, a detached empty cell if the
+            coordinate is outside the map
+        """
+        if coord.q + coord.r + coord.s != 0:
+            return Cell()
+        index = self.index(coord.q, coord.r)
+        if index < 0:
+            return Cell()
+        view = self.views[index]
+        if view is None:
+            view = self.views[index] = DenseCell(self, index)
+        return view
+
+    def set_cell(self, coord: Coordinate, cell: Cell):
+        """
+        Set the cell at the specified coordinate.
+
+        Args:
+            coord: The coordinate to set the cell for
+            cell: The cell whose item is copied into the map
+        """
+        index = self.index(coord.q, coord.r)
+        if index < 0:
+            raise ValueError(f"Coordinate outside the map: {coord}")
+        self.store(index, cell.get_item())
+
+
+def create_map(radius: int, storage: str = MAP_STORAGE) -> Map:
+    """
+    Create an empty map with the given storage.
+
+    Args:
+        radius: Radius of the map
+        storage: One of MAP_STORAGES, "dict" for Map or "dense" for DenseMap
+
+    Returns:
+        The new map
+    """
+    if storage == "dense":
+        return DenseMap(radius)
+    if storage == "dict":
+        return Map(radius)
+    raise ValueError(f"Unknown map storage: {storage}")
@@ -43,13 +43,16 @@ class Direction(Enum):
         Returns:
             Tuple of (q, r, s) coordinate offset
         """
-        direction_to_coordinate = {
-            Direction.O: (0, 0, 0),
-            Direction.E: (1, 0, -1),
-            Direction.SE: (0, 1, -1),
-            Direction.SW: (-1, 1, 0),
-            Direction.W: (-1, 0, 1),
-            Direction.NW: (0, -1, 1),
-            Direction.NE: (1, -1, 0),
-        }
-        return direction_to_coordinate[self]
+        return DIRECTION_OFFSETS[self]
+
+
+# Cube coordinate offset of every direction
+DIRECTION_OFFSETS = {
+    Direction.O: (0, 0, 0),
+    Direction.E: (1, 0, -1),
+    Direction.SE: (0, 1, -1),
+    Direction.SW: (-1, 1, 0),
+    Direction.W: (-1, 0, 1),
+    Direction.NW: (0, -1, 1),
+    Direction.NE: (1, -1, 0),
+}
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Geometry module for the "botwar ship" game.
+"""
+import functools
+from typing import Dict, List, Optional, Tuple
+
+from models.coordinate import Coordinate
+from models.direction import Direction, DIRECTION_OFFSETS
+from utils.validators import validate_team_constraints
+from utils.constants import NUM_PLAYERS
+
+
+class HexGeometry:
+    """
+    HexGeometry precomputes everything about the hexagonal grid of one
+    radius that the judge asks for every turn: one shared (interned)
+    Coordinate per cell, the neighbor of every cell in every direction,
+    the validity mask and the start zone of every team.
+
+    Cells are numbered by a flat index into a (2 * radius + 1)^2 box; the
+    corners of the box outside the hexagon are marked invalid. Get the
+    geometry of a radius with get_geometry, so all maps of that radius
+    share it.
+    """
+
+    def __init__(self, radius: int):
+        """
+        Precompute the geometry of a map.
+
+        Args:
+            radius: Radius of the map
+        """
+        self.radius = radius
+        self.width = 2 * radius + 1
+        self.size = self.width * self.width
+        self.valid = bytearray(self.size)  # 1 for every index inside the hexagon
+        self.coords: List[Optional[Coordinate]] = [None] * self.size  # Interned coordinate of every index
+
+        # Cells in row order: q ascending, then r ascending
+        self.cells: List[Coordinate] = []
+        for q in range(-radius, radius + 1):
+            for r in range(max(-radius, -q - radius), min(radius, -q + radius) + 1):
+                index = self.index_of(q, r)
+                coord = Coordinate(q, r, -q - r)
+                self.valid[index] = 1
+                self.coords[index] = coord
+                self.cells.append(coord)
+
+        # Index of the neighbor of every cell in every direction, -1 where it leaves the map
+        self.steps: Dict[Direction, List[int]] = {}
+        for direction, (dq, dr, _) in DIRECTION_OFFSETS.items():
+            table = [-1] * self.size
+            for coord in self.cells:
+                table[self.index_of(coord.q, coord.r)] = self.index(coord.q + dq, coord.r + dr)
+            self.steps[direction] = table
+
+        # Neighbors of every cell inside the map, in Direction.all_non_origin() order
+        self.neighbor_table: List[Tuple[Coordinate, ...]] = [()] * self.size
+        for coord in self.cells:
+            index = self.index_of(coord.q, coord.r)
+            self.neighbor_table[index] = tuple(
+                self.coords[self.steps[direction][index]]
+                for direction in Direction.all_non_origin()
+                if self.steps[direction][index] >= 0
+            )
+
+        # Start zone of every team, in row order, by number of teams
+        self.team_zones: Dict[int, Tuple[Dict[int, List[Coordinate]], Dict[int, bytearray]]] = {}
+        self.start_zones, self.start_masks = self.zones(NUM_PLAYERS)
+
+        self.areas: Dict[int, List[Optional[Tuple[Coordinate, ...]]]] = {}  # Cached area tables by distance
+
+    def index_of(self, q: int, r: int) -> int:
+        """
+        Get the flat index of a coordinate known to be inside the box.
+
+        Args:
+            q: q-coordinate
+            r: r-coordinate
+
+        Returns:
+            Flat index
+        """
+        return (q + self.radius) * self.width + (r + self.radius)
+
+    def index(self, q: int, r: int) -> int:
+        """
+        Get the flat index of a coordinate.
+
+        Args:
+            q: q-coordinate
+            r: r-coordinate
+
+        Returns:
+            Flat index, or -1 if the coordinate is outside the map
+        """
+        radius = self.radius
+        if -radius <= q <= radius and -radius <= r <= radius and -radius <= q + r <= radius:
+            return (q + radius) * self.width + (r + radius)
+        return -1
+
+    def is_valid(self, coord: Coordinate) -> bool:
+        """
+        Check if a coordinate is a cell of the map.
+
+        Args:
+            coord: The coordinate to check
+
+        Returns:
+            True if the coordinate is valid, False otherwise
+        """
+        return coord.q + coord.r + coord.s == 0 and self.index(coord.q, coord.r) >= 0
+
+    def intern(self, coord: Coordinate) -> Optional[Coordinate]:
+        """
+        Get the shared Coordinate equal to the given one.
+
+        Args:
+            coord: Any coordinate
+
+        Returns:
+            The interned coordinate, or None if the coordinate is outside the map
+        """
+        if coord.q + coord.r + coord.s != 0:
+            return None
+        index = self.index(coord.q, coord.r)
+        return self.coords[index] if index >= 0 else None
+
+    def step(self, coord: Coordinate, direction: Direction) -> Optional[Coordinate]:
+        """
+        Get the neighbor of a cell in a direction.
+
+        Args:
+            coord: A coordinate inside the map
+            direction: Direction to move in
+
+        Returns:
+            The interned neighbor, or None if it is outside the map
+        """
+        index = self.index(coord.q, coord.r)
+        if index < 0:
+            return None
+        next_index = self.steps[direction][index]
+        return self.coords[next_index] if next_index >= 0 else None
+
+    def neighbors(self, coord: Coordinate) -> Tuple[Coordinate, ...]:
+        """
+        Get the neighbors of a cell that are inside the map.
+
+        Args:
+            coord: A coordinate inside the map
+
+        Returns:
+            Tuple of interned coordinates
+        """
+        index = self.index(coord.q, coord.r)
+        return self.neighbor_table[index] if index >= 0 else ()
+
+    def zones(self, num_teams: int) -> Tuple[Dict[int, List[Coordinate]], Dict[int, bytearray]]:
+        """
+        Get the start zones of a game with a number of teams.
+
+        Args:
+            num_teams: Number of teams
+
+        Returns:
+            Tuple of the cells of every team's zone in row order, and a
+            mask by flat index of every team's zone
+        """
+        if num_teams not in self.team_zones:
+            start_zones = {
+                team_id: [coord for coord in self.cells
+                          if validate_team_constraints(team_id, coord.q, coord.r, coord.s, num_teams)]
+                for team_id in range(1, num_teams + 1)
+            }
+            start_masks = {}
+            for team_id, zone in start_zones.items():
+                mask = bytearray(self.size)
+                for coord in zone:
+                    mask[self.index_of(coord.q, coord.r)] = 1
+                start_masks[team_id] = mask
+            self.team_zones[num_teams] = (start_zones, start_masks)
+        return self.team_zones[num_teams]
+
+    def in_start_zone(self, team_id: int, coord: Coordinate, num_teams: int = NUM_PLAYERS) -> bool:
+        """
+        Check if a coordinate is in the start zone of a team.
+
+        Args:
+            team_id: Team ID (1-num_teams)
+            coord: The coordinate to check
+            num_teams: Number of teams of the game
+
+        Returns:
+            True if the team may start on the coordinate, False otherwise
+        """
+        mask = self.zones(num_teams)[1].get(team_id)
+        if mask is None or coord.q + coord.r + coord.s != 0:
+            return False
+        index = self.index(coord.q, coord.r)
+        return index >= 0 and mask[index] == 1
+
+    def area(self, coord: Coordinate, distance: int) -> Tuple[Coordinate, ...]:
+        """
+        Get the cells around a cell up to a distance, without the cell itself.
+
+        The cells are listed by q offset, then r offset, which is the order
+        in which the judge has always visited them.
+
+        Args:
+            coord: A coordinate inside the map
+            distance: Maximum distance from the coordinate
+
+        Returns:
+            Tuple of interned coordinates inside the map
+        """
+        table = self.areas.get(distance)
+        if table is None:
+            table = self.areas[distance] = [None] * self.size
+        index = self.index(coord.q, coord.r)
+        if index < 0:
+            return ()
+        cells = table[index]
+        if cells is None:
+            cells = []
+            for dq in range(-distance, distance + 1):
+                for dr in range(max(-distance, -dq - distance), min(distance + 1, -dq + distance + 1)):
+                    if dq == 0 and dr == 0:
+                        continue
+                    neighbor_index = self.index(coord.q + dq, coord.r + dr)
+                    if neighbor_index >= 0:
+                        cells.append(self.coords[neighbor_index])
+            cells = table[index] = tuple(cells)
+        return cells
+
+
+@functools.lru_cache(maxsize=None)
+def get_geometry(radius: int) -> HexGeometry:
+    """
+    Get the shared geometry of a map radius.
+
+    Args:
+        radius: Radius of the map
+
+    Returns:
+        The geometry, computed on first use
+    """
+    return HexGeometry(radius)
@@ -3,24 +3,201 @@
 Map module for the "botwar ship" game.
 """
 import copy
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 
 from models.coordinate import Coordinate
 from models.cell import Cell
-from utils.validators import validate_coordinate_bounds
+from models.geometry import HexGeometry, get_geometry
+from items.kinds import item_value
+from utils.binary_protocol import COUNT, cell_struct
+
+
+class MapCell(Cell):
+    """
+    MapCell is a view of one cell of a Map. Its item is read from the map's
+    index of non-empty cells and every change is written to it, so a map
+    and its clones can share the index until one of them changes.
+    """
+
+    __slots__ = ("owner", "key", "coord")
+
+    def __init__(self, owner: 'Map', key: int, coord: Coordinate):
+        """
+        Initialize a view of a map cell.
+
+        Args:
+            owner: The map holding the cell
+            key: Position of the cell in the map's index order
+            coord: Coordinate of the cell
+        """
+        self.owner = owner
+        self.key = key
+        self.coord = coord
+
+    @property
+    def item(self) -> Optional[Any]:
+        """The item in the cell, or None if the cell is empty."""
+        entry = self.owner.occupied.get(self.key)
+        return None if entry is None else entry[1]
+
+    def is_empty(self) -> bool:
+        """
+        Check if the cell is empty (contains no item).
+
+        Returns:
+            True if the cell is empty, False otherwise
+        """
+        return self.key not in self.owner.occupied
+
+    def get_item(self) -> Optional[Any]:
+        """
+        Get the item in the cell.
+
+        Returns:
+            The item in the cell, or None if the cell is empty
+        """
+        return self.item
+
+    def set_item(self, item: Any):
+        """
+        Set the item in the cell.
+
+        Args:
+            item: The item to set
+        """
+        self.owner.track(self.key, self.coord, item)
+
+    def clear_item(self):
+        """
+        Remove any item from the cell.
+        """
+        self.owner.track(self.key, self.coord, None)
 
 
 class Map:
     """
     Map class representing the hexagonal grid of cells in the game.
+
+    Next to its cells, the map keeps an index of the non-empty cells and
+    their rendered agent input lines, updated whenever an item is set or
+    cleared. Listing or rendering the items therefore costs the number of
+    items rather than the number of cells. Items are never modified in
+    place; a changed item is replaced by a new one.
+
+    The index is the whole state of the map, which clone() and restore()
+    share between maps copy-on-write: the first change made to either map
+    copies the shared storage.
     """
 
+    # Attributes holding the state of the map, shared by clone() and restore()
+    SHARED = ("keys", "occupied", "lines", "_order", "_cell_list", "_cell_records")
+
     def __init__(self, radius: int):
         """
         Initialize an empty map.
         """
         self.radius = radius
-        self.cells = {}  # Dictionary of Coordinate to Cell
+        self.geometry: HexGeometry = get_geometry(radius)  # Shared by all maps of this radius
+        self.cells = {}  # Dictionary of Coordinate to Cell, in creation order
+        self.keys: Dict[Coordinate, int] = {}  # Coordinate to key of every cell, in creation order
+        self._keys_shared = False  # True while keys is shared with another map
+        self._reset_index()
+
+    def _reset_index(self):
+        """
+        Empty the index of non-empty cells.
+        """
+        self.occupied: Dict[int, Tuple[Coordinate, Any]] = {}  # Key to (coordinate, item) of every non-empty cell
+        self.lines: Dict[int, str] = {}  # Key to the "q r s value" line of every non-empty cell
+        self._order: Optional[List[int]] = None  # Sorted keys of occupied, None when stale
+        self._cell_list: Optional[str] = None  # Rendered cell list, None when stale
+        self._cell_records: Optional[bytes] = None  # Encoded cell list of the binary protocol, None when stale
+        self._shared = False  # True while the index is shared with another map
+
+    def _share(self):
+        """
+        Mark the state of the map as shared, so the next change copies it.
+        """
+        self._shared = True
+        self._keys_shared = True
+
+    def _unshare(self):
+        """
+        Copy the shared index before changing it.
+        """
+        self.occupied = dict(self.occupied)
+        self.lines = dict(self.lines)
+        self._shared = False
+
+    def _attach(self):
+        """
+        Give a new clone its own cell views, created again when looked up.
+        """
+        self.cells = {}
+
+    def clone(self) -> 'Map':
+        """
+        Copy the map. The copy shares the storage of the map until either
+        of them changes, so cloning costs the same for any number of items.
+
+        Returns:
+            The new map
+        """
+        self._share()
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._attach()
+        return clone
+
+    def restore(self, other: 'Map'):
+        """
+        Make the map equal to a clone of it, such as a snapshot taken with
+        clone(). The storage is shared as with clone().
+
+        Args:
+            other: The map to copy, of the same class and radius
+        """
+        other._share()
+        if self.keys is not other.keys:
+            # Cells created since may have other keys in the clone
+            self.cells = {}
+        for name in self.SHARED:
+            setattr(self, name, getattr(other, name))
+        self._share()
+
+    def track(self, key: int, coord: Coordinate, item: Any):
+        """
+        Record the new item of a cell in the index.
+
+        Args:
+            key: Position of the cell in index order
+            coord: Coordinate of the cell
+            item: The new item, or None if the cell is now empty
+        """
+        if self._shared:
+            self._unshare()
+        self._cell_list = None
+        self._cell_records = None
+        if item is None:
+            if self.occupied.pop(key, None) is not None:
+                del self.lines[key]
+                self._order = None
+            return
+        if key not in self.occupied:
+            self._order = None
+        self.occupied[key] = (coord, item)
+        self.lines[key] = f"{coord.q} {coord.r} {coord.s} {self._get_item_value(item)}"
+
+    def _sorted_keys(self) -> List[int]:
+        """
+        Get the keys of the non-empty cells in index order.
+
+        Returns:
+            Sorted list of keys, shared until the set of non-empty cells changes
+        """
+        if self._order is None:
+            self._order = sorted(self.occupied)
+        return self._order
 
     def get_cell(self, coord: Coordinate) -> Cell:
         """
@@ -32,9 +209,16 @@ class Map:
         Returns:
             The cell at the coordinate (creates an empty one if not present)
         """
-        if coord not in self.cells:
-            self.cells[coord] = Cell()
-        return self.cells[coord]
+        cell = self.cells.get(coord)
+        if cell is None:
+            key = self.keys.get(coord)
+            if key is None:
+                if self._keys_shared:
+                    self.keys = dict(self.keys)
+                    self._keys_shared = False
+                key = self.keys[coord] = len(self.keys)
+            cell = self.cells[coord] = MapCell(self, key, coord)
+        return cell
 
     def set_cell(self, coord: Coordinate, cell: Cell):
         """
@@ -42,9 +226,9 @@ class Map:
         
         Args:
             coord: The coordinate to set the cell for
-            cell: The cell to set
+            cell: The cell whose item is copied into the map
         """
-        self.cells[coord] = cell
+        self.get_cell(coord).set_item(cell.get_item())
 
     def get_neighbors(self, coord: Coordinate) -> Dict[Coordinate, Cell]:
         """
@@ -57,9 +241,8 @@ class Map:
             Dictionary of neighbor coordinates to cells
         """
         neighbors = {}
-        for neighbor_coord in coord.neighbors():
-            if self.is_valid_coordinate(neighbor_coord):
-                neighbors[neighbor_coord] = self.get_cell(neighbor_coord)
+        for neighbor_coord in self.geometry.neighbors(coord):
+            neighbors[neighbor_coord] = self.get_cell(neighbor_coord)
         return neighbors
 
     def is_valid_coordinate(self, coord: Coordinate) -> bool:
@@ -72,13 +255,7 @@ class Map:
         Returns:
             True if the coordinate is valid, False otherwise
         """
-        # Basic validation that cube coordinates sum to 0
-        if not coord.validate():
-            return False
-
-        # Assuming the map has a maximum radius of 10 from center
-        # This can be adjusted based on the actual map size
-        return validate_coordinate_bounds(coord.q, coord.r, coord.s, self.radius)
+        return self.geometry.is_valid(coord)
 
     def manhattan_distance(self, coord1: Coordinate, coord2: Coordinate) -> int:
         """
@@ -114,6 +291,50 @@ class Map:
         cell = self.get_cell(coord)
         cell.clear_item()
 
+    def non_empty_cells(self) -> Iterator[Tuple[Coordinate, Any]]:
+        """
+        Iterate over the cells that hold an item.
+
+        Returns:
+            Iterator of (coordinate, item) pairs in index order: creation
+            order of the cells for Map, coordinate order for DenseMap
+        """
+        occupied = self.occupied
+        for key in self._sorted_keys():
+            yield occupied[key]
+
+    def cell_list(self) -> str:
+        """
+        Get the cell list section of the agent input: the number of
+        non-empty cells, then one "q r s value" line per cell.
+
+        The text is rendered once and reused until an item changes, so all
+        agents of a turn share it.
+
+        Returns:
+            The cell list, without a trailing newline
+        """
+        if self._cell_list is None:
+            lines = self.lines
+            keys = self._sorted_keys()
+            self._cell_list = "\n".join([str(len(keys))] + [lines[key] for key in keys])
+        return self._cell_list
+
+    def cell_records(self) -> bytes:
+        """
+        Get the cell section of the binary agent input: the number of
+        non-empty cells, then one record per cell. Like cell_list(), it is
+        encoded once and reused until an item changes.
+
+        Returns:
+            The encoded cell section
+        """
+        if self._cell_records is None:
+            pack = cell_struct(self.radius).pack
+            records = [pack(coord.q, coord.r, item.kind, item.value) for coord, item in self.non_empty_cells()]
+            self._cell_records = COUNT.pack(len(records)) + b"".join(records)
+        return self._cell_records
+
     def to_dict_list(self) -> List[Dict[str, Any]]:
         """
         Convert the map to a list of cell dictionaries.
@@ -123,19 +344,16 @@ class Map:
         """
         result = []
 
-        for coord, cell in self.cells.items():
-            if not cell.is_empty():
-                item = cell.get_item()
-
-                # Get the item value string representation
-                value = self._get_item_value(item)
+        for coord, item in self.non_empty_cells():
+            # Get the item value string representation
+            value = self._get_item_value(item)
 
-                result.append({
-                    "q": coord.q,
-                    "r": coord.r,
-                    "s": coord.s,
-                    "value": value
-                })
+            result.append({
+                "q": coord.q,
+                "r": coord.r,
+                "s": coord.s,
+                "value": value
+            })
 
         return result
 
@@ -149,18 +367,4 @@ class Map:
         Returns:
             Value representation of the item
         """
-        from items.gold import Gold
-        from items.shield import Shield
-        from items.danger import Danger
-        from items.treasure import Treasure
-
-        if isinstance(item, Gold):
-            return item.value
-        elif isinstance(item, Shield):
-            return "S"
-        elif isinstance(item, Danger):
-            return "D"
-        elif isinstance(item, Treasure):
-            return item.value
-        else:
-            return 0
+        return item_value(item)
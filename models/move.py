@@ -13,6 +13,8 @@ class Move:
     Move class representing a player's move in the game.
     """
 
+    __slots__ = ("direction", "missile_targets")
+
     def __init__(self, direction: Optional[Direction] = Direction.O, missile_targets: List[Coordinate] = None):
         """
         Initialize a move with direction and missile targets.
@@ -17,6 +17,9 @@ class Player:
     Player class representing a team's ship in the game.
     """
 
+    __slots__ = ("team_id", "position", "previous_position", "gold", "shield", "alive", "missiles",
+                 "missiles_fired")
+
     def __init__(self, team_id: int, missiles: int):
         """
         Initialize a player with the specified team ID.
@@ -33,6 +36,30 @@ class Player:
         self.missiles = missiles
         self.missiles_fired = []
 
+    def clone(self) -> 'Player':
+        """
+        Copy the player.
+
+        Returns:
+            The new player, sharing the coordinates which are never modified
+        """
+        clone = Player.__new__(Player)
+        for name in Player.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.missiles_fired = list(self.missiles_fired)
+        return clone
+
+    def restore(self, other: 'Player'):
+        """
+        Make the player equal to a clone of it.
+
+        Args:
+            other: The player to copy
+        """
+        for name in Player.__slots__:
+            setattr(self, name, getattr(other, name))
+        self.missiles_fired = list(other.missiles_fired)
+
     def move(self, direction: Direction, map: 'Map'):
         """
         Move the player in the specified direction.
@@ -43,11 +70,11 @@ class Player:
         if not self.alive:
             return
 
-        # Store previous position before moving
-        self.previous_position = Coordinate(self.position.q, self.position.r, self.position.s)
+        # Store previous position before moving, coordinates are never modified so it can be shared
+        self.previous_position = self.position
 
-        new_position = self.position.next(direction)
-        if map.is_valid_coordinate(new_position):
+        new_position = map.geometry.step(self.position, direction)
+        if new_position is not None:
             self.position = new_position
 
     def fire_missile(self, target: Coordinate) -> bool:
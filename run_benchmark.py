@@ -1,4 +1,4 @@
-import subprocess
+import asyncio
 import os
 from pathlib import Path
 import json
@@ -8,20 +8,25 @@ import concurrent.futures
 import argparse
 import logging
 import time
-import tempfile
 import shutil
-import uuid
 import random
-import string
-from typing import List
+import traceback
+from typing import List, Dict, Any, Optional
+
+from runner import Runner, get_metrics_path
+from async_runner import MatchLoop, play_match
+from judger.file_handler import FileHandler
+from judger.game_log import log_suffix, convert_log
+from launcher.build_cache import BuildCache
+from launcher.result_store import ResultStore
+from launcher.sandbox import SandboxPool, SANDBOX_LINK_MODES
+from utils.constants import AGENT_IO_MODES, AGENT_PROTOCOLS, TIME_BANK, BUILD_CACHE_DIR, LOG_FORMAT, LOG_FORMATS, KEYFRAME_INTERVAL, SEED_BITS
+from utils.constants import RESULT_STORE_DIR, RESULT_STORE_MAX_AGE
 
 cur_time = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
 
-def generate_random_name(length=16):
-    """Generate a strong random string to use as a folder name"""
-    random_part = ''.join(random.choices(string.ascii_letters + string.digits, k=length))
-    uuid_part = str(uuid.uuid4())
-    return f"{random_part}_{uuid_part}"
+worker_sandboxes = None  # SandboxPool of the current worker process
+worker_maps = {}  # Parsed map files of the current worker process
 
 def setup_logging(log_dir: Path):
     """Set up logging configuration"""
@@ -32,6 +37,8 @@ def setup_logging(log_dir: Path):
         format='%(asctime)s:%(levelname)s:%(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+    # Turn by turn progress of every round would drown the benchmark log
+    logging.getLogger("Runner").setLevel(logging.WARNING)
     logging.info("Logging setup complete.")
 
 def parse_args():
@@ -39,84 +46,147 @@ def parse_args():
     parser.add_argument("--agent1", type=str, required=True, help="Path to the first agent's executable. The parent folder name must be the bot name.")
     parser.add_argument("--agent2", type=str, required=True, help="Path to the second agent's executable. The parent folder name must be the bot name.")
     parser.add_argument("--agent3", type=str, required=True, help="Path to the third agent's executable. The parent folder name must be the bot name.")
+    parser.add_argument("--agent1_io", type=str, default="file", choices=AGENT_IO_MODES, help="I/O mode of the first agent: MAP.INP/ACT.OUT files or stdin/stdout pipes")
+    parser.add_argument("--agent2_io", type=str, default="file", choices=AGENT_IO_MODES, help="I/O mode of the second agent")
+    parser.add_argument("--agent3_io", type=str, default="file", choices=AGENT_IO_MODES, help="I/O mode of the third agent")
+    parser.add_argument("--agent1_protocol", type=str, default="text", choices=AGENT_PROTOCOLS, help="Protocol of the first agent: MAP.INP text or binary messages")
+    parser.add_argument("--agent2_protocol", type=str, default="text", choices=AGENT_PROTOCOLS, help="Protocol of the second agent")
+    parser.add_argument("--agent3_protocol", type=str, default="text", choices=AGENT_PROTOCOLS, help="Protocol of the third agent")
+    parser.add_argument("--time_bank", type=float, default=TIME_BANK, help="Extra seconds each agent may spend over the per-turn timeout during a match")
     parser.add_argument("--n_rounds", type=int, default=10, help="Number of rounds to run")
     parser.add_argument("--current_round", type=int, default=0, help="Current round number (0-indexed)")
     parser.add_argument("--map_path", type=str, required=True, help="Path to the map JSON file")
     parser.add_argument("--log_dir", type=str, default="./data/logs/", help="Directory to save logs of matches")
     parser.add_argument("--benchmark_log_dir", type=str, default="./data/benchmark_logs", help="Directory to save benchmark logs")
     parser.add_argument("--max_workers", type=int, default=4, help="Maximum number of parallel processes")
+    parser.add_argument("--engine", type=str, default="process", choices=["process", "async"], help="Run each round in its own judge process, or all rounds on one asyncio event loop in this process")
+    parser.add_argument("--max_agent_processes", type=int, default=os.cpu_count(), help="Maximum number of live agent processes across all rounds with the async engine")
+    parser.add_argument("--build_cache", type=str, default=BUILD_CACHE_DIR, help="Directory holding the compiled executables of C, C++, Rust and Go agents")
+    parser.add_argument("--sandbox_links", type=str, default="copy", choices=SANDBOX_LINK_MODES, help="How agent files are placed in the per-worker sandboxes: reflink/copy, or hardlink (only for agents that never modify their own files)")
+    parser.add_argument("--log_format", type=str, default=LOG_FORMAT, choices=LOG_FORMATS, help="Match log format: every full state, or keyframes and per-turn changes")
+    parser.add_argument("--keyframe_interval", type=int, default=KEYFRAME_INTERVAL, help="Turns from one keyframe to the next in a delta match log")
+    parser.add_argument("--compress_log", action="store_true", help="Write the match logs with gzip")
+    parser.add_argument("--seed", type=int, default=None, help="Base seed of the judge's random numbers, round i plays with seed + i; drawn at random if not given")
+    parser.add_argument("--result_store", type=str, nargs="?", const=RESULT_STORE_DIR, default=None, metavar="DIR", help=f"Read rounds back from a result store (default directory: {RESULT_STORE_DIR}) instead of playing them, and store the rounds played; needs --seed and agents that play the same moves for the same input")
+    parser.add_argument("--rerun", action="store_true", help="Play every round even if its result is stored, and store the new result")
+    parser.add_argument("--gc_result_store", action="store_true", help="Remove stored rounds of another judge version or unused for --result_store_max_age days before running, from the --result_store directory or the default one")
+    parser.add_argument("--result_store_max_age", type=float, default=RESULT_STORE_MAX_AGE, help="Days after which an unused stored round is removed by --gc_result_store")
     parser.add_argument("--work_dir", type=str, default=".", help="Base directory for creating temporary working directories")
-    return parser.parse_args()
-
-def run_single_round(round_idx, agent_paths: List[Path], map_path, match_log_dir, agent_names, work_dir):
-    """Run a single round of the benchmark with private copies of agent files using strong random directory names"""
+    args = parser.parse_args()
+    if args.result_store is not None and args.seed is None and not args.gc_result_store:
+        parser.error("--result_store needs --seed, rounds with a random seed are never played again")
+    return args
 
+def get_round_log_path(round_idx, match_log_dir: Path, agent_names, map_path, log_format: str = LOG_FORMAT, compress_log: bool = False) -> Path:
+    """Get the path of the match log of a round"""
     map_name = Path(map_path).stem
-    log_path: Path = match_log_dir / f"{agent_names[0]}_vs_{agent_names[1]}_vs_{agent_names[2]}_vs_{map_name}_round_{round_idx}.json"
+    stem = f"{agent_names[0]}_vs_{agent_names[1]}_vs_{agent_names[2]}_vs_{map_name}_round_{round_idx}"
+    suffix = log_suffix(log_format, compress_log)
+    log_path: Path = match_log_dir / f"{stem}{suffix}"
     if log_path.exists():
-        log_path = log_path.with_name(f"{log_path.stem}_copy{log_path.suffix}")
-    
-    random_dirname = generate_random_name()
-    temp_dir = Path(work_dir) / f"round_{round_idx}_{random_dirname}"
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    
+        log_path = log_path.with_name(f"{stem}_copy{suffix}")
+    return log_path
+
+def restore_round(result_store: ResultStore, key: str, round_idx, match_log_dir: Path, agent_names, map_path, log_format: str, keyframe_interval: int, compress_log: bool):
+    """Read a round back from the result store and write its log where the round would have, or return None if it is not stored"""
+    entry = result_store.get(key)
+    if entry is None:
+        return None
+
+    result = dict(entry["result"])
+    log = result.pop("log")
+    log_path = get_round_log_path(round_idx, match_log_dir, agent_names, map_path, log_format, compress_log)
+    if log == {"format": log_format, "compress": compress_log, "keyframe_interval": keyframe_interval}:
+        shutil.copyfile(entry["files"]["log"], log_path)
+    else:
+        convert_log(entry["files"]["log"], str(log_path), log_format, compress_log, keyframe_interval)
+    if "metrics" in entry["files"]:
+        shutil.copyfile(entry["files"]["metrics"], get_metrics_path(str(log_path)))
+    return {"round_idx": round_idx, "log_path": str(log_path), "success": True, "stdout": "", "stderr": "", **result, "cached": True}
+
+def store_round(result_store: ResultStore, key: str, result, log_format: str, keyframe_interval: int, compress_log: bool):
+    """Keep a played round, its log and agent call statistics in the result store"""
+    files = {"log": result["log_path"]}
+    if os.path.exists(get_metrics_path(result["log_path"])):
+        files["metrics"] = get_metrics_path(result["log_path"])
+    stored = {key: value for key, value in result.items() if key not in ("round_idx", "log_path", "success", "stdout", "stderr")}
+    stored["log"] = {"format": log_format, "compress": compress_log, "keyframe_interval": keyframe_interval}
+    result_store.put(key, stored, files)
+
+def init_worker(work_dir, sandbox_link_mode: str, benchmark_log_dir: Path):
+    """Set up a worker process: its own agent sandbox pool and random state, and the benchmark log"""
+    global worker_sandboxes
+    worker_sandboxes = SandboxPool(Path(work_dir) / f"worker_{os.getpid()}", sandbox_link_mode)
+
+    # Forked workers start with the random state of the parent, games must not repeat across workers
+    random.seed()
+    if not logging.getLogger().handlers:
+        # Workers that were not forked do not inherit the benchmark log
+        setup_logging(benchmark_log_dir)
+
+def load_map(map_path) -> Dict[str, Any]:
+    """Parse a map file once per worker process, every later round reuses the parsed map"""
+    map_path = str(Path(map_path).absolute())
+    if map_path not in worker_maps:
+        worker_maps[map_path] = FileHandler().read_json(map_path)
+    return worker_maps[map_path]
+
+def run_single_round(round_idx, agent_paths: List[Path], map_path, match_log_dir, agent_names, io_modes: List[str], time_bank: float, build_cache_dir: str, log_format: str = LOG_FORMAT, keyframe_interval: int = KEYFRAME_INTERVAL, compress_log: bool = False, seed: Optional[int] = None, protocols: Optional[List[str]] = None):
+    """Run a single round of the benchmark in this worker process, with private copies of agent files from the worker's sandbox pool"""
+
+    log_path = get_round_log_path(round_idx, match_log_dir, agent_names, map_path, log_format, compress_log)
+
+    # Sandboxes are reset instead of copied, only files changed by the previous round are touched
+    sandboxes = []
     try:
-        agent_temp_dirs = []
         temp_agent_paths = []
-        
-        for i, agent_path in enumerate(agent_paths):
-            agent_temp_dir = temp_dir / agent_path.parent.name
-            agent_temp_dir.mkdir(parents=True, exist_ok=True)
-            agent_temp_dirs.append(agent_temp_dir)
-            
-            agent_filename = agent_path.name
-            temp_agent_path = agent_temp_dir / agent_filename
-            shutil.copy2(agent_path, temp_agent_path)
-            
-            agent_dir = agent_path.parent
-            for item in agent_dir.iterdir():
-                if item.is_file() and item.absolute() != agent_path.absolute():
-                    shutil.copy2(item, agent_temp_dir / item.name)
-                elif item.is_dir():
-                    shutil.copytree(item, agent_temp_dir / item.name, dirs_exist_ok=True)
-            
-            temp_agent_paths.append(temp_agent_path)
-        
-        abs_map_path = Path(map_path).absolute()
-        abs_log_path = log_path.absolute()
-        
-        logging.debug(f"Round {round_idx} temp dir: {temp_dir}")
+        for agent_path in agent_paths:
+            sandbox = worker_sandboxes.acquire(str(agent_path.parent))
+            sandboxes.append(sandbox)
+            temp_agent_paths.append(sandbox.agent_path(str(agent_path)))
+
         for i, path in enumerate(temp_agent_paths):
             logging.debug(f"Round {round_idx} agent {i} path: {path}")
-        
-        process = subprocess.run(
-            ["python", "main.py",
-             "--map", str(abs_map_path),
-             "--output", str(abs_log_path),
-             "--agents", str(temp_agent_paths[0]), str(temp_agent_paths[1]), str(temp_agent_paths[2])
-            ], 
-            capture_output=True
-        )
-        
-        return {
-            "round_idx": round_idx,
-            "log_path": str(log_path),
-            "success": process.returncode == 0,
-            "stdout": process.stdout.decode('utf-8'),
-            "stderr": process.stderr.decode('utf-8'),
-            "temp_dir": str(temp_dir)
-        }
+
+        runner = Runner(temp_agent_paths, io_modes=io_modes, time_bank=time_bank, build_cache_dir=build_cache_dir,
+                        log_format=log_format, keyframe_interval=keyframe_interval, compress_log=compress_log, seed=seed,
+                        protocols=protocols)
+        try:
+            runner.initialize_game(str(Path(map_path).absolute()), str(log_path.absolute()), map_data=load_map(map_path))
+            runner.run_game()
+            runner.report_results()
+        finally:
+            runner.close()
+
+        return {"round_idx": round_idx, "log_path": str(log_path), "success": True, "stdout": "", "stderr": "", **runner.results()}
     except Exception as e:
         logging.error(f"Error in round {round_idx}: {str(e)}")
-        shutil.rmtree(temp_dir, ignore_errors=True)
-        raise
+        return {"round_idx": round_idx, "log_path": str(log_path), "success": False, "stdout": "", "stderr": traceback.format_exc()}
     finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        for sandbox in sandboxes:
+            worker_sandboxes.release(sandbox)
+
+async def run_async_round(round_idx, agent_paths: List[Path], map_path, match_log_dir, agent_names, io_modes: List[str], time_bank: float, build_cache_dir: str, process_limit: asyncio.Semaphore, log_format: str = LOG_FORMAT, keyframe_interval: int = KEYFRAME_INTERVAL, compress_log: bool = False, seed: Optional[int] = None, protocols: Optional[List[str]] = None):
+    """Run a single round of the benchmark on the shared event loop of the async engine"""
+
+    log_path = get_round_log_path(round_idx, match_log_dir, agent_names, map_path, log_format, compress_log)
+    try:
+        runner = await play_match([str(path) for path in agent_paths], str(Path(map_path).absolute()), str(log_path.absolute()),
+                                  process_limit, io_modes=io_modes, time_bank=time_bank, build_cache_dir=build_cache_dir,
+                                  log_format=log_format, keyframe_interval=keyframe_interval, compress_log=compress_log, seed=seed,
+                                  protocols=protocols)
+    except Exception as e:
+        logging.error(f"Error in round {round_idx}: {str(e)}")
+        return {"round_idx": round_idx, "log_path": str(log_path), "success": False, "stdout": "", "stderr": traceback.format_exc()}
+
+    return {"round_idx": round_idx, "log_path": str(log_path), "success": True, "stdout": "", "stderr": "", **runner.results()}
 
 if __name__ == "__main__":
     args = parse_args()
 
     agent_paths = [Path(args.agent1), Path(args.agent2), Path(args.agent3)]
+    io_modes = [args.agent1_io, args.agent2_io, args.agent3_io]
+    protocols = [args.agent1_protocol, args.agent2_protocol, args.agent3_protocol]
     n_rounds = args.n_rounds
     current_round = args.current_round
     map_path = args.map_path
@@ -144,6 +214,17 @@ if __name__ == "__main__":
 
     logger = logging.getLogger("Benchmark")
 
+    # Build source agents once up front, every round then reuses the cached executables
+    build_cache_dir = str(Path(args.build_cache).absolute())
+    build_cache = BuildCache(build_cache_dir)
+    for agent_path in agent_paths:
+        if BuildCache.is_source(str(agent_path)):
+            build_cache.build(str(agent_path))
+
+    # Every round gets its own seed from the base seed, so a round can be replayed alone and the same rounds can be replayed with other agents
+    base_seed = args.seed if args.seed is not None else random.getrandbits(SEED_BITS)
+    logger.info(f"Base seed: {base_seed}")
+
     rounds_to_run = list(range(current_round, n_rounds))
     total_rounds = len(rounds_to_run)
     
@@ -151,12 +232,39 @@ if __name__ == "__main__":
     
     successful_rounds = []
     failed_rounds = []
-    temp_dirs = [] 
+    round_results = []  # Structured results of the successful rounds
+
+    if args.gc_result_store:
+        removed = ResultStore(args.result_store or RESULT_STORE_DIR).collect(args.result_store_max_age * 24 * 3600)
+        logger.info(f"Removed {removed} stale rounds from the result store")
+
+    # Rounds played with a given seed are only deterministic for deterministic agents, so the store is opt-in
+    result_store = ResultStore(args.result_store) if args.result_store is not None and args.seed is not None else None
+    round_keys = {}
+    if result_store is not None:
+        match_options = {"time_bank": args.time_bank, "io_modes": io_modes, "protocols": protocols}
+        for round_idx in rounds_to_run:
+            round_keys[round_idx] = result_store.round_key(map_path, [str(path) for path in agent_paths], base_seed + round_idx, match_options)
+            result = None if args.rerun else restore_round(result_store, round_keys[round_idx], round_idx, match_log_dir, agent_names, map_path, args.log_format, args.keyframe_interval, args.compress_log)
+            if result is not None:
+                successful_rounds.append(round_idx)
+                round_results.append({key: value for key, value in result.items() if key not in ("stdout", "stderr")})
+                logger.info(f"Round {round_idx + 1}/{n_rounds} read from the result store. Log saved to {result['log_path']}.")
+                progress_bar.update(1)
+
+    if args.engine == "async":
+        # One event loop drives every round, agents are the only extra processes
+        executor = MatchLoop(args.max_agent_processes)
+        submit_round = lambda round_idx: executor.submit(run_async_round(round_idx, agent_paths, map_path, match_log_dir, agent_names, io_modes, args.time_bank, build_cache_dir, executor.process_limit, args.log_format, args.keyframe_interval, args.compress_log, base_seed + round_idx, protocols))
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                                                          initargs=(base_work_dir, args.sandbox_links, benchmark_log_dir))
+        submit_round = lambda round_idx: executor.submit(run_single_round, round_idx, agent_paths, map_path, match_log_dir, agent_names, io_modes, args.time_bank, build_cache_dir, args.log_format, args.keyframe_interval, args.compress_log, base_seed + round_idx, protocols)
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    with executor:
         future_to_round = {
-            executor.submit(run_single_round, round_idx, agent_paths, map_path, match_log_dir, agent_names, base_work_dir): round_idx
-            for round_idx in rounds_to_run
+            submit_round(round_idx): round_idx
+            for round_idx in rounds_to_run if round_idx not in successful_rounds
         }
         
         for future in concurrent.futures.as_completed(future_to_round):
@@ -165,14 +273,14 @@ if __name__ == "__main__":
                 result = future.result()
                 if result["success"]:
                     successful_rounds.append(round_idx)
+                    round_results.append({key: value for key, value in result.items() if key not in ("stdout", "stderr")})
                     logger.info(f"Round {round_idx + 1}/{n_rounds} completed. Log saved to {result['log_path']}.")
+                    if result_store is not None:
+                        store_round(result_store, round_keys[round_idx], result, args.log_format, args.keyframe_interval, args.compress_log)
                 else:
                     failed_rounds.append(round_idx)
                     logger.error(f"Round {round_idx + 1}/{n_rounds} failed. Error: {result['stderr']}")
-                
-                if "temp_dir" in result:
-                    temp_dirs.append(result["temp_dir"])
-                    
+
             except Exception as e:
                 failed_rounds.append(round_idx)
                 logger.error(f"Round {round_idx + 1}/{n_rounds} raised an exception: {e}")
@@ -181,13 +289,6 @@ if __name__ == "__main__":
     
     progress_bar.close()
     
-    for temp_dir in temp_dirs:
-        try:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir, ignore_errors=True)
-        except Exception as e:
-            logger.warning(f"Failed to clean up temporary directory {temp_dir}: {e}")
-    
     try:
         shutil.rmtree(base_work_dir, ignore_errors=True)
     except OSError as e:
@@ -197,4 +298,17 @@ if __name__ == "__main__":
     logger.info(f"Benchmark complete: {len(successful_rounds)}/{total_rounds} rounds successful.")
     if failed_rounds:
         print(f"Failed rounds: {', '.join(map(str, failed_rounds))}")
-        logger.info(f"Failed rounds: {', '.join(map(str, failed_rounds))}")
\ No newline at end of file
+        logger.info(f"Failed rounds: {', '.join(map(str, failed_rounds))}")
+
+    if round_results:
+        round_results.sort(key=lambda result: result["round_idx"])
+        results_file = benchmark_log_dir / f"results_{cur_time}.json"
+        with open(results_file, "w") as f:
+            json.dump(round_results, f, indent=2)
+
+        for seat, agent_name in enumerate(agent_names):
+            wins = sum(seat in result["winners"] for result in round_results)
+            mean_score = sum(result["scores"][seat] for result in round_results) / len(round_results)
+            print(f"{agent_name} (seat {seat + 1}): {wins} wins, mean score {mean_score:.1f}")
+            logger.info(f"{agent_name} (seat {seat + 1}): {wins} wins, mean score {mean_score:.1f}")
+        logger.info(f"Round results saved to {results_file}")
\ No newline at end of file
@@ -6,12 +6,36 @@ import os
 from pathlib import Path
 import subprocess
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 import json
 import time
+import shutil
+import tempfile
+import concurrent.futures
 
 from judger.judger import Judger
-from utils.constants import TIMEOUT
+from judger.game_log import DeltaEncoder, JsonlLogWriter, open_log
+from launcher.persistent_agent import PersistentAgent
+from launcher.fork_server_agent import ForkServerAgent
+from launcher.process import run_process
+from launcher.build_cache import BuildCache
+from utils.constants import TIMEOUT, TIME_BANK, AGENT_IO_MODES, AGENT_PROTOCOLS, BUILD_CACHE_DIR, MAP_STORAGE
+from utils.constants import LOG_FORMAT, LOG_FORMATS, KEYFRAME_INTERVAL
+from utils.time_control import TimeControl
+
+
+def get_metrics_path(log_path: str) -> str:
+    """
+    Get the path of the agent call statistics file written next to a game log.
+
+    Args:
+        log_path: Path of the game log
+
+    Returns:
+        Path of the statistics file
+    """
+    log_path = log_path[:-len(".gz")] if log_path.endswith(".gz") else log_path
+    return os.path.splitext(log_path)[0] + ".metrics.jsonl"
 
 
 class Runner:
@@ -20,53 +44,142 @@ class Runner:
     and handles communication with agent executables.
     """
 
-    def __init__(self, agent_paths: List[str]):
+    def __init__(self, agent_paths: List[str], persistent: bool = False, parallel: bool = False,
+                 io_modes: Optional[List[str]] = None, fork_server: bool = False,
+                 time_bank: float = TIME_BANK, build_cache_dir: str = BUILD_CACHE_DIR,
+                 map_storage: str = MAP_STORAGE, log_format: str = LOG_FORMAT,
+                 keyframe_interval: int = KEYFRAME_INTERVAL, compress_log: bool = False,
+                 seed: Optional[int] = None, protocols: Optional[List[str]] = None):
         """
         Initialize the Runner with paths to agent executables.
         
         Args:
             agent_paths: List of paths to the three agent executables
+            persistent: Keep each agent process alive for the whole match
+            parallel: Run all live agents of a turn at the same time
+            io_modes: I/O mode of each agent, one of AGENT_IO_MODES (defaults to "file")
+            fork_server: Run Python agents by forking a preloaded interpreter every turn
+            time_bank: Extra time in seconds each agent may spend over TIMEOUT during the match
+            build_cache_dir: Directory holding the compiled executables of source agents
+            map_storage: How the map stores its cells, one of MAP_STORAGES
+            log_format: Format of the game log, one of LOG_FORMATS
+            keyframe_interval: Turns from one keyframe to the next in a delta game log
+            compress_log: Write the game log with gzip
+            seed: Seed of the judge's random generator, drawn at random if not given
+            protocols: Protocol of each agent, one of AGENT_PROTOCOLS (defaults to "text")
         """
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"Unknown game log format: {log_format}")
+        io_modes = io_modes or ["file"] * len(agent_paths)
+        for io_mode in io_modes:
+            if io_mode not in AGENT_IO_MODES:
+                raise ValueError(f"Unknown agent I/O mode: {io_mode}")
+        protocols = protocols or ["text"] * len(agent_paths)
+        for protocol in protocols:
+            if protocol not in AGENT_PROTOCOLS:
+                raise ValueError(f"Unknown agent protocol: {protocol}")
+
         self.judger = None
         self.agent_paths = agent_paths
+        self.io_modes = io_modes
+        self.protocols = protocols
+        self.seat_agent_paths = list(agent_paths)  # Agent path used by each seat
+        self.seat_dirs = []  # Private agent directory copies made for parallel seats
+        self.persistent = persistent
+        self.parallel = parallel
+        self.fork_server = fork_server
+        self.map_storage = map_storage
+        self.seed = seed
+        self.time_control = TimeControl(TIMEOUT, time_bank, len(agent_paths)) if time_bank > 0 else None
+        self.agent_processes = {}  # Dictionary of seat index to PersistentAgent or ForkServerAgent
+        self.executor = None  # Thread pool used in parallel mode
+        self.build_cache = BuildCache(build_cache_dir)
+        self.agent_binaries = {}  # Dictionary of seat index to the compiled executable of a source agent
         self.log_path = None
         self.turn = 0
         self.logger = logging.getLogger("Runner")
-        self.game_history = []
+        self.game_history = []  # Game state of every turn when logging in the full format
+        self.history_encoder = DeltaEncoder(keyframe_interval) if log_format == "delta" else None
+        self.log_format = log_format
+        self.compress_log = compress_log
+        self.log_writer = None  # JsonlLogWriter of the jsonl format, open while the game is played
+        self.agent_stats = []  # Timing and resource usage of every agent call
 
-    def initialize_game(self, map_path: str, log_path: str = "./data/logs/final_results.json"):
+    def initialize_game(self, map_path: str, log_path: str = "./data/logs/final_results.json",
+                        map_data: Optional[Dict[str, Any]] = None):
         """
         Initialize the game with the specified map.
         
         Args:
             map_path: Path to the map JSON file
             log_path: Path for logging game data
+            map_data: Already parsed contents of the map file, to skip reading it again
         """
         self.log_path = log_path
         os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        if self.log_format == "jsonl":
+            self.log_writer = JsonlLogWriter(log_path, self.compress_log)
 
         # Initialize the judger
-        self.judger = Judger.initialize(map_path)
+        if map_data is not None:
+            self.judger = Judger.from_map_data(map_data, map_storage=self.map_storage, seed=self.seed,
+                                               num_players=len(self.agent_paths))
+        else:
+            self.judger = Judger.initialize(map_path, self.map_storage, self.seed, len(self.agent_paths))
+
+        # Compile source agents, or reuse their executables from the build cache
+        self._build_agents()
+
+        # Give every seat its own working directory when agents run together
+        if self.parallel:
+            self._prepare_seat_dirs()
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.agent_paths))
 
         self.logger.info(f"Game initialized with map: {map_path}")
 
+    def _build_agents(self):
+        """
+        Get the compiled executable of every agent submitted as source code.
+
+        Raises:
+            RuntimeError: If an agent fails to build
+        """
+        for i, agent_path in enumerate(self.agent_paths):
+            if BuildCache.is_source(agent_path):
+                self.agent_binaries[i] = self.build_cache.build(agent_path)
+
     def run_game(self):
         """
         Run the game until completion (all ships sink or max moves reached).
         """
         # Phase 0: Get starting positions from agents
+        agent_inputs = self.judger.generate_agent_inputs(self._time_banks(), self.protocols)
+        outputs = self.execute_agents(agent_inputs, list(range(len(self.agent_paths))))
+        self._set_start_positions(outputs)
+
+        # Phase 1 onwards: Move phase
+        while not self.check_game_end():
+            agent_inputs, live_seats = self._begin_turn()
+            outputs = self.execute_agents(agent_inputs, live_seats)
+            self._finish_turn(outputs)
+
+    def _set_start_positions(self, outputs: Dict[int, Union[str, bytes]]):
+        """
+        Parse the starting positions chosen by the agents and start the game.
+
+        Args:
+            outputs: Dictionary of seat index to the agent's response
+        """
         start_positions = []
-        agent_inputs = self.judger.generate_agent_inputs()
-        for i, agent_path in enumerate(self.agent_paths):
-            agent_input = agent_inputs[i]
-            position_str = self.execute_agent(agent_path, agent_input)
+        for i in range(len(self.agent_paths)):
+            position_str = outputs[i]
             # Parse the position from the agent's output
             # Format should be "q r s"
             try:
-                q, r, s = map(int, position_str.strip().split())
+                q, r, s = self.judger.file_handler.parse_start_position(position_str)
             except Exception as e:
                 self.logger.error(
-                    f"Error parsing starting position for agent {i + 1}: {str(e)}. The output was: '{position_str}'")
+                    f"Error parsing starting position for agent {i + 1}: {str(e)}. The output was: {position_str!r}")
                 q, r, s = 0, 0, 0
             start_positions.append({"q": q, "r": r, "s": s})
 
@@ -74,89 +187,301 @@ class Runner:
         self.judger.validate_start_positions(start_positions)
 
         # Log the game state
-        self.game_history.append(self._get_current_game_state())
+        self._log_game_state()
 
-        # Phase 1 onwards: Move phase
-        while not self.check_game_end():
-            self.turn += 1  # TODO: check
-            self.logger.info(f"Turn {self.turn}")
-
-            # Generate inputs for all agents
-            agent_inputs = self.judger.generate_agent_inputs()
-
-            # Get moves from all agents
-            moves = []
-            for i, agent_path in enumerate(self.agent_paths):
-                if self.judger.game_state.players[i].alive:
-                    move_str = self.execute_agent(agent_path, agent_inputs[i])
-                    moves.append(move_str)
-                else:
-                    moves.append("")  # Empty move for inactive agents
+    def _begin_turn(self):
+        """
+        Start a new turn of the move phase.
 
-            # Process the turn with the moves
-            self.judger.process_turn(moves)
+        Returns:
+            Tuple of the input data for every seat and the indices of the live seats
+        """
+        self.turn += 1  # TODO: check
+        self.logger.info(f"Turn {self.turn}")
 
-            # Log the game state
-            self.game_history.append(self._get_current_game_state())
+        # Generate inputs for all agents
+        agent_inputs = self.judger.generate_agent_inputs(self._time_banks(), self.protocols)
+
+        live_seats = [i for i, player in enumerate(self.judger.game_state.players) if player.alive]
+        return agent_inputs, live_seats
 
-    def execute_agent(self, agent_path: str, input_data: str) -> str:
+    def _finish_turn(self, outputs: Dict[int, Union[str, bytes]]):
+        """
+        Process the moves of the live agents and log the new game state.
+
+        Args:
+            outputs: Dictionary of seat index to the agent's response
+        """
+        moves = []
+        for i in range(len(self.agent_paths)):
+            moves.append(outputs.get(i, ""))  # Empty move for inactive agents
+
+        # Process the turn with the moves
+        self.judger.process_turn(moves)
+
+        # Log the game state
+        self._log_game_state()
+
+    def execute_agents(self, agent_inputs: List[Union[str, bytes]], seats: List[int]) -> Dict[int, Union[str, bytes]]:
+        """
+        Execute the agents of the given seats and collect their responses.
+        In parallel mode all of them run at the same time.
+
+        Args:
+            agent_inputs: Input data for every seat
+            seats: Indices of the seats whose agents should run
+
+        Returns:
+            Dictionary of seat index to the agent's response
+        """
+        if self.executor is None:
+            return {
+                seat: self.execute_agent(self.seat_agent_paths[seat], agent_inputs[seat], seat=seat)
+                for seat in seats
+            }
+
+        futures = {
+            seat: self.executor.submit(self.execute_agent, self.seat_agent_paths[seat], agent_inputs[seat], seat)
+            for seat in seats
+        }
+        return {seat: future.result() for seat, future in futures.items()}
+
+    def execute_agent(self, agent_path: str, input_data: Union[str, bytes], seat: Optional[int] = None) -> Union[str, bytes]:
         """
         Execute an agent program and get its response.
+
+        Timing and resource usage of the call are recorded in agent_stats.
         
         Args:
             agent_path: Path to the agent executable
-            input_data: Input data to send to the agent
+            input_data: Input data to send to the agent, bytes for a binary protocol agent
+            seat: Index of the player the agent plays for
             
         Returns:
-            The agent's response as a string
+            The agent's response as a string, bytes if the input was bytes
         """
+        stats = self._new_stats(agent_path, seat)
+        start = time.perf_counter()
         try:
-            # Create a temporary file for the input
-            input_file = "MAP.INP"
-            # get agent directory path
-            agent_path = os.path.abspath(agent_path)
-            agent_dir = os.path.dirname(agent_path)
-
-            with open(os.path.join(agent_dir, input_file), "w") as f:
-                f.write(input_data)
-
-            # Execute the agent with the input file
-
-            ext = os.path.splitext(agent_path)[1]
-
-            if ext == "" or ext == ".exe":
- 
-                result = subprocess.run(
-                    [agent_path, input_file],
-                    cwd=agent_dir,
-                    capture_output=True,
-                    text=True,
-                    timeout=TIMEOUT
-                )
-
-            else:
-                result = subprocess.run(
-                    ["python", agent_path, input_file],
-                    cwd=agent_dir,
-                    capture_output=True,
-                    text=True,
-                    timeout=TIMEOUT
-                )
-
-            if result.returncode != 0:
-                self.logger.error(f"Agent execution failed: {result.stderr}")
-                return ""
-
-            output_file = "ACT.OUT"
-            with open(os.path.join(agent_dir, output_file), "r") as f:
-                return f.read()
+            if self.persistent:
+                stats["mode"] = "persistent"
+                return self._execute_persistent_agent(agent_path, input_data, seat, PersistentAgent, stats)
+            if self.fork_server and ForkServerAgent.is_supported(agent_path):
+                stats["mode"] = "fork_server"
+                return self._execute_persistent_agent(agent_path, input_data, seat, ForkServerAgent, stats)
+            return self._spawn_agent(agent_path, input_data, seat, stats)
 
         except subprocess.TimeoutExpired:
+            stats["timed_out"] = True
             self.logger.error(f"Agent execution timed out: {agent_path}")
             return ""
         except Exception as e:
+            stats["failed"] = True
             self.logger.error(f"Error executing agent: {str(e)}")
             return ""
+        finally:
+            self._record_stats(stats, start)
+
+    def _new_stats(self, agent_path: str, seat: Optional[int]) -> Dict[str, Any]:
+        """
+        Create the statistics record of an agent call.
+
+        Args:
+            agent_path: Path to the agent executable
+            seat: Index of the player the agent plays for
+
+        Returns:
+            Statistics record with every measurement unset
+        """
+        return {
+            "turn": self.turn,
+            "seat": seat,
+            "agent": agent_path,
+            "mode": "spawn",
+            "started_at": time.time(),
+            "wall_time": None,
+            "startup_time": None,
+            "first_byte": None,
+            "user_time": None,
+            "sys_time": None,
+            "max_rss": None,
+            "time_limit": self._timeout(seat),
+            "timed_out": False,
+            "failed": False
+        }
+
+    def _record_stats(self, stats: Dict[str, Any], start: float):
+        """
+        Finish the statistics record of an agent call and charge the time bank.
+
+        Args:
+            stats: Statistics record of the call
+            start: Value of time.perf_counter() when the call started
+        """
+        seat = stats["seat"]
+        stats["wall_time"] = time.perf_counter() - start
+        if self.time_control is not None and seat is not None:
+            # Process startup of a long-lived agent is not think time
+            self.time_control.charge(seat, stats["wall_time"] - (stats["startup_time"] or 0))
+            stats["time_bank"] = self.time_control.remaining(seat)
+        self.agent_stats.append(stats)
+
+    def _spawn_agent(self, agent_path: str, input_data: Union[str, bytes], seat: Optional[int],
+                     stats: Dict[str, Any]) -> Union[str, bytes]:
+        """
+        Start a new agent process for a single turn.
+
+        Args:
+            agent_path: Path to the agent executable
+            input_data: Input data to send to the agent
+            seat: Index of the player the agent plays for
+            stats: Dictionary that receives the statistics of the call
+
+        Returns:
+            The agent's response as a string, bytes if the input was bytes
+        """
+        # get agent directory path
+        agent_path = os.path.abspath(agent_path)
+        agent_dir = os.path.dirname(agent_path)
+        io_mode = self._io_mode(seat)
+        command = self._agent_command(agent_path, io_mode, seat)
+
+        if io_mode == "pipe":
+            # Send the input on stdin and read the move from stdout
+            result = run_process(command, agent_dir, input_data, self._timeout(seat), stats)
+
+        else:
+            # Create a temporary file for the input
+            self._write_input_file(agent_dir, input_data)
+
+            # Execute the agent with the input file
+            result = run_process(command, agent_dir, None, self._timeout(seat), stats)
+
+        return self._read_response(result, agent_dir, io_mode, stats, isinstance(input_data, bytes))
+
+    def _agent_command(self, agent_path: str, io_mode: str, seat: Optional[int] = None) -> List[str]:
+        """
+        Build the command line that runs an agent for a single turn.
+
+        Args:
+            agent_path: Absolute path to the agent executable
+            io_mode: One of AGENT_IO_MODES
+            seat: Index of the player the agent plays for
+
+        Returns:
+            Command line as a list of arguments
+        """
+        ext = os.path.splitext(agent_path)[1]
+
+        if seat in self.agent_binaries:
+            command = [self.agent_binaries[seat]]
+        elif ext == "" or ext == ".exe":
+            command = [agent_path]
+        else:
+            command = ["python", agent_path]
+
+        # Agents in pipe mode get "-" as their input file
+        return command + ["-" if io_mode == "pipe" else "MAP.INP"]
+
+    def _write_input_file(self, agent_dir: str, input_data: Union[str, bytes]):
+        """
+        Write the agent input to MAP.INP in the agent directory.
+
+        Args:
+            agent_dir: Working directory of the agent
+            input_data: Input data to send to the agent
+        """
+        with open(os.path.join(agent_dir, "MAP.INP"), "wb" if isinstance(input_data, bytes) else "w") as f:
+            f.write(input_data)
+
+    def _read_response(self, result: subprocess.CompletedProcess, agent_dir: str, io_mode: str,
+                       stats: Dict[str, Any], binary: bool = False) -> Union[str, bytes]:
+        """
+        Get the agent's response from a finished agent process.
+
+        Args:
+            result: The finished agent process
+            agent_dir: Working directory of the agent
+            io_mode: One of AGENT_IO_MODES
+            stats: Dictionary that receives the statistics of the call
+            binary: Read the response as bytes, for binary protocol agents
+
+        Returns:
+            The agent's response as a string, empty if the agent failed
+        """
+        if result.returncode != 0:
+            stats["failed"] = True
+            self.logger.error(f"Agent execution failed: {result.stderr}")
+            return ""
+
+        if io_mode == "pipe":
+            return result.stdout
+
+        output_file = "ACT.OUT"
+        with open(os.path.join(agent_dir, output_file), "rb" if binary else "r") as f:
+            return f.read()
+
+    def _execute_persistent_agent(self, agent_path: str, input_data: Union[str, bytes], seat: Optional[int],
+                                  agent_class: type = PersistentAgent,
+                                  stats: Optional[Dict[str, Any]] = None) -> Union[str, bytes]:
+        """
+        Send a turn to the agent's long-lived process, starting it if needed.
+
+        Args:
+            agent_path: Path to the agent executable
+            input_data: Input data to send to the agent
+            seat: Index of the player the agent plays for
+            agent_class: PersistentAgent or ForkServerAgent
+            stats: Dictionary that receives the statistics of the call
+
+        Returns:
+            The agent's response as a string, bytes if the input was bytes
+        """
+        key = seat if seat is not None else agent_path
+        agent = self.agent_processes.get(key)
+        if agent is None:
+            agent = agent_class(agent_path, io_mode=self._io_mode(seat), executable=self.agent_binaries.get(seat))
+            self.agent_processes[key] = agent
+        return agent.request(input_data, self._timeout(seat), stats)
+
+    def _timeout(self, seat: Optional[int]) -> float:
+        """
+        Get the time limit of the next call of the agent playing the given seat.
+
+        Args:
+            seat: Index of the player
+
+        Returns:
+            TIMEOUT, plus the agent's remaining time bank when a time bank is used
+        """
+        if self.time_control is None or seat is None:
+            return TIMEOUT
+        return self.time_control.deadline(seat)
+
+    def _time_banks(self) -> Optional[List[int]]:
+        """
+        Get the remaining time banks shown in the agents' input header.
+
+        Returns:
+            Remaining bank of every agent in milliseconds, or None without a time bank
+        """
+        if self.time_control is None:
+            return None
+        return self.time_control.remaining_ms()
+
+    def _io_mode(self, seat: Optional[int]) -> str:
+        """
+        Get the I/O mode of the agent playing the given seat.
+
+        Args:
+            seat: Index of the player, or None for the default mode
+
+        Returns:
+            One of AGENT_IO_MODES
+        """
+        if seat is None:
+            return "file"
+        return self.io_modes[seat]
 
     def check_game_end(self) -> bool:
         """
@@ -171,9 +496,121 @@ class Runner:
         """
         Report the final results of the game.
         """
-        # Save results to file
-        with open(self.log_path, "w") as f:
-            json.dump(self.game_history, f)
+        # Save results to file, a jsonl log only needs to be closed
+        if self.log_writer is not None:
+            self.log_writer.close()
+            self.log_writer = None
+        else:
+            with open_log(self.log_path, "w", self.compress_log) as f:
+                if self.history_encoder is not None:
+                    json.dump(self.history_encoder.to_dict(), f)
+                else:
+                    json.dump(self.game_history, f)
+
+        # Save the agent call statistics next to the log, one call per line
+        with open(self.metrics_path(), "w") as f:
+            for stats in self.agent_stats:
+                f.write(json.dumps(stats) + "\n")
+
+    def results(self) -> Dict[str, Any]:
+        """
+        Summarize the game for callers that play many games, such as the benchmark.
+
+        Returns:
+            Dictionary with the final score of every seat, the winning seats,
+            the number of turns played, the agent call timings of every seat
+            and the seed that replays the match
+        """
+        players = self.judger.game_state.players
+        scores = [player.gold for player in players]
+        best_score = max(scores)
+
+        timings = []
+        for seat in range(len(self.agent_paths)):
+            calls = [stats for stats in self.agent_stats if stats["seat"] == seat]
+            wall_times = [stats["wall_time"] for stats in calls]
+            timings.append({
+                "calls": len(calls),
+                "total_time": sum(wall_times),
+                "max_time": max(wall_times, default=0.0),
+                "timeouts": sum(stats["timed_out"] for stats in calls),
+                "failures": sum(stats["failed"] for stats in calls)
+            })
+
+        return {
+            "scores": scores,
+            "winners": [seat for seat, score in enumerate(scores) if score == best_score],
+            "alive": [player.alive for player in players],
+            "turns": self.turn,
+            "timings": timings,
+            "seed": self.judger.game_state.seed
+        }
+
+    def metrics_path(self) -> str:
+        """
+        Get the path of the agent call statistics file written next to the log.
+
+        Returns:
+            Path of the statistics file
+        """
+        return get_metrics_path(self.log_path)
+
+    def close(self):
+        """
+        Stop any agent processes kept alive by the runner and remove the
+        per-seat agent directories.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+        # Keep the turns logged so far when the game did not finish
+        if self.log_writer is not None:
+            self.log_writer.close()
+            self.log_writer = None
+
+        for agent in self.agent_processes.values():
+            agent.close()
+        self.agent_processes = {}
+
+        for seat_dir in self.seat_dirs:
+            shutil.rmtree(seat_dir, ignore_errors=True)
+        self.seat_dirs = []
+        self.seat_agent_paths = list(self.agent_paths)
+
+    def _prepare_seat_dirs(self, copy_all: bool = False):
+        """
+        Copy the agent directory for every seat that shares it with an earlier
+        seat, so concurrent agents never clash on MAP.INP/ACT.OUT.
+
+        Args:
+            copy_all: Copy the agent directory of every seat, for agents that
+                other matches may run at the same time
+        """
+        used_dirs = set()
+        for i, agent_path in enumerate(self.agent_paths):
+            agent_path = os.path.abspath(agent_path)
+            agent_dir = os.path.dirname(agent_path)
+            if agent_dir not in used_dirs and not copy_all:
+                used_dirs.add(agent_dir)
+                continue
+
+            seat_dir = tempfile.mkdtemp(prefix=f"seat_{i + 1}_")
+            self.seat_dirs.append(seat_dir)
+            shutil.copytree(agent_dir, seat_dir, dirs_exist_ok=True,
+                            ignore=shutil.ignore_patterns("MAP.INP", "ACT.OUT"))
+            self.seat_agent_paths[i] = os.path.join(seat_dir, os.path.basename(agent_path))
+
+    def _log_game_state(self):
+        """
+        Add the current game state to the game log.
+        """
+        if self.log_writer is not None:
+            self.log_writer.write(self._get_current_game_state())
+        elif self.history_encoder is not None:
+            self.history_encoder.append(self._get_current_game_state())
+        else:
+            self.game_history.append(self._get_current_game_state())
 
     def _get_current_game_state(self):
         """
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Binary agent protocol module for the "botwar ship" game.
+
+Agents that choose the binary protocol get their input as one
+little-endian message instead of the MAP.INP text. Coordinates are only
+q and r, s being -q - r:
+
+    header   "BWAR", version, phase, team ID, number of players, radius,
+             moves left, time bank in milliseconds (-1 without a time bank)
+    players  phase 1 only, one record per player with the agent's own ship
+             first: q, r, gold, flags (1: alive, 2: shield), missiles (0
+             for the other ships, whose missiles are not shown)
+    cells    number of non-empty cells, then one record per cell: q, r,
+             item kind (KIND_*), value (0 for shields and dangers); q and r
+             take one byte each up to radius NARROW_RADIUS, two above
+
+and answer with a start position in phase 0 (q, r) or with a move in
+phase 1: direction code, number of missile targets, then q, r of every
+target.
+
+The module only depends on the standard library, so that agents can copy
+it next to their code: read_input() decodes the input, and write_start()
+and write_move() encode the answer.
+"""
+import struct
+from typing import List, NamedTuple, Sequence, Tuple
+
+MAGIC = b"BWAR"
+VERSION = 2
+
+HEADER = struct.Struct("<4sBBBBHHi")  # magic, version, phase, team ID, players, radius, moves left, time bank
+PLAYER = struct.Struct("<hhIBB")  # q, r, gold, flags, missiles
+COUNT = struct.Struct("<I")  # Number of cell records
+CELL = struct.Struct("<bbBH")  # q, r, item kind, value, on maps up to radius NARROW_RADIUS
+WIDE_CELL = struct.Struct("<hhBH")  # q, r, item kind, value, on larger maps
+POSITION = struct.Struct("<hh")  # q, r of a start position or missile target
+MOVE = struct.Struct("<BB")  # direction code, number of missile targets
+
+NARROW_RADIUS = 127  # Largest radius whose coordinates fit in a signed byte
+
+# Flags of a player record
+FLAG_ALIVE = 1
+FLAG_SHIELD = 2
+
+# Direction codes of a move, in the order of models.direction.Direction
+DIRECTIONS = ["O", "E", "SE", "SW", "W", "NW", "NE"]
+
+# Item kinds of cell records, as in items/item.py
+KIND_GOLD = 1
+KIND_SHIELD = 2
+KIND_DANGER = 3
+KIND_TREASURE = 4
+
+
+def cell_struct(radius: int) -> struct.Struct:
+    """
+    Get the cell record of a map.
+
+    Args:
+        radius: Radius of the map
+
+    Returns:
+        CELL up to radius NARROW_RADIUS, WIDE_CELL above
+    """
+    return CELL if radius <= NARROW_RADIUS else WIDE_CELL
+
+
+class PlayerRecord(NamedTuple):
+    """A player record of the input."""
+    q: int
+    r: int
+    s: int  # Not sent, -q - r
+    gold: int
+    alive: bool
+    shield: bool
+    missiles: int
+
+
+class AgentInput(NamedTuple):
+    """A decoded agent input."""
+    phase: int
+    team_id: int
+    num_players: int
+    radius: int
+    moves_left: int
+    time_bank: int
+    players: List[PlayerRecord]
+    cells: List[Tuple[int, int, int, int]]  # q, r, kind, value of every non-empty cell
+
+
+def is_binary(data: bytes) -> bool:
+    """
+    Check if an agent input is in the binary protocol.
+
+    Args:
+        data: The input, as read from MAP.INP or stdin
+
+    Returns:
+        True if the input starts with the protocol's magic
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def read_input(data: bytes) -> AgentInput:
+    """
+    Decode an agent input.
+
+    Args:
+        data: The input, as read from MAP.INP or stdin
+
+    Returns:
+        The decoded input, with the cells as plain tuples, which are much
+        faster to decode than named ones
+
+    Raises:
+        ValueError: If the input is not in a known version of the protocol
+    """
+    if len(data) < HEADER.size:
+        raise ValueError(f"Not a version {VERSION} binary input")
+    magic, version, phase, team_id, num_players, radius, moves_left, time_bank = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} binary input")
+    offset = HEADER.size
+
+    data = memoryview(data)
+    players = []
+    if phase == 1:
+        for q, r, gold, flags, missiles in PLAYER.iter_unpack(data[offset:offset + num_players * PLAYER.size]):
+            players.append(PlayerRecord(q, r, -q - r, gold, bool(flags & FLAG_ALIVE), bool(flags & FLAG_SHIELD), missiles))
+        offset += num_players * PLAYER.size
+
+    count, = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    cell = cell_struct(radius)
+    cells = list(cell.iter_unpack(data[offset:offset + count * cell.size]))
+    return AgentInput(phase, team_id, num_players, radius, moves_left, time_bank, players, cells)
+
+
+def write_start(q: int, r: int) -> bytes:
+    """
+    Encode a start position.
+
+    Args:
+        q: q-coordinate
+        r: r-coordinate
+
+    Returns:
+        The answer to write to ACT.OUT or stdout
+    """
+    return POSITION.pack(q, r)
+
+
+def write_move(direction: str, targets: Sequence[Sequence[int]] = ()) -> bytes:
+    """
+    Encode a move.
+
+    Args:
+        direction: Name of the direction, one of DIRECTIONS
+        targets: q, r (and optionally s, which is not sent) of every missile target
+
+    Returns:
+        The answer to write to ACT.OUT or stdout
+    """
+    return MOVE.pack(DIRECTIONS.index(direction), len(targets)) + b"".join(POSITION.pack(t[0], t[1]) for t in targets)
+
+
+def read_start(data: bytes) -> Tuple[int, int, int]:
+    """
+    Decode a start position answer.
+
+    Args:
+        data: The answer of the agent
+
+    Returns:
+        q, r, s of the start position
+
+    Raises:
+        ValueError: If the answer is not a start position
+    """
+    if len(data) != POSITION.size:
+        raise ValueError(f"A start position is {POSITION.size} bytes, got {len(data)}")
+    q, r = POSITION.unpack(data)
+    return q, r, -q - r
+
+
+def read_move(data: bytes) -> Tuple[int, List[Tuple[int, int, int]]]:
+    """
+    Decode a move answer.
+
+    Args:
+        data: The answer of the agent
+
+    Returns:
+        Tuple of the direction code and the q, r, s of every missile target
+
+    Raises:
+        ValueError: If the answer is not a move
+    """
+    if len(data) < MOVE.size:
+        raise ValueError(f"A move is at least {MOVE.size} bytes, got {len(data)}")
+    direction, count = MOVE.unpack_from(data)
+    targets = data[MOVE.size:]
+    if len(targets) != count * POSITION.size:
+        raise ValueError(f"Expected {count} missile targets, got {len(targets)} bytes")
+    return direction, [(q, r, -q - r) for q, r in POSITION.iter_unpack(targets)]
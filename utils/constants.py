@@ -9,10 +9,13 @@ TOTAL_GOLD = 300
 MAX_MISSILES = 6
 MAX_MISSILES_EACH_TURN = 2
 MAP_RADIUS = 10
+NUM_PLAYERS = 3  # Default number of ships, a map may set "num_players"
+PAIRWISE_COLLISION_PLAYERS = 8  # Up to this number of ships, collisions are found by comparing every two ships
 
 # Item values
 MIN_GOLD_VALUE = 1
 MAX_GOLD_VALUE = 6
+SHARED_GOLD_VALUES = 64  # Gold items up to this value are shared by all cells holding them
 
 # Missile effects
 MISSILE_DAMAGE_ONE = 0.20  # 20% gold lost when hit by 1 missile
@@ -27,3 +30,20 @@ TREASURE_VALUE_DIVISOR = 12  # max(d/12, 10) where d is total gold collected
 # Gold distribution
 GOLD_DISTRIBUTION_RADIUS = 2  # Manhattan distance for distributing lost gold
 TIMEOUT = 2  # Timeout for agent execution in seconds
+TIME_BANK = 0  # Extra time per agent per match in seconds, drawn from when a call exceeds TIMEOUT (0 disables it)
+STARTUP_TIMEOUT = 10  # Timeout for a persistent agent to become ready in seconds
+AGENT_IO_MODES = ["file", "pipe"]  # file: MAP.INP/ACT.OUT in the agent directory, pipe: stdin/stdout
+AGENT_PROTOCOLS = ["text", "binary"]  # text: MAP.INP text format, binary: struct-packed messages (utils/binary_protocol.py)
+BUILD_CACHE_DIR = "./data/build_cache"  # Compiled executables of C, C++, Rust and Go agents
+BUILD_TIMEOUT = 300  # Timeout for compiling an agent in seconds
+MAP_STORAGE = "dict"  # Default map storage, one of MAP_STORAGES
+MAP_STORAGES = ["dict", "dense"]  # dict: Coordinate to Cell dictionary, dense: flat arrays indexed by (q, r)
+LOG_FORMAT = "full"  # Default game log format, one of LOG_FORMATS
+LOG_FORMATS = ["full", "delta", "jsonl"]  # full: list of game states, delta: keyframes and per-turn changes, jsonl: one state per line written every turn (judger/game_log.py)
+KEYFRAME_INTERVAL = 10  # Turns from one keyframe to the next in a delta game log
+SEED_BITS = 32  # Bits of the match seeds drawn when none is given
+RESULT_STORE_DIR = "./data/result_store"  # Results and logs of benchmark rounds played with a given seed
+RESULT_STORE_MAX_AGE = 30  # Days after which an unused round is removed from the result store
+ARCHIVE_COMPRESSION = "gzip"  # Default compression of the matches of a log archive, one of ARCHIVE_COMPRESSIONS
+ARCHIVE_COMPRESSIONS = ["gzip", "lzma"]  # Compressions of log archives (judger/log_archive.py)
+ARCHIVE_BLOCK_TURNS = 25  # Turns compressed together in a log archive, all decompressed to read one of them
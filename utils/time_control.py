@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Time control module for the "botwar ship" game.
+"""
+from typing import List
+
+
+class TimeControl:
+    """
+    Chess-clock time control: every agent call gets a base budget, and any
+    time spent beyond it is drawn from a bank that the agent keeps for the
+    whole match. Once the bank is empty the agent is back to the base budget.
+    """
+
+    def __init__(self, base: float, bank: float, num_agents: int):
+        """
+        Initialize the time control with a full bank for every agent.
+
+        Args:
+            base: Time budget of every agent call in seconds
+            bank: Extra time each agent may spend over the whole match in seconds
+            num_agents: Number of agents
+        """
+        self.base = base
+        self.banks = [bank] * num_agents
+
+    def remaining(self, seat: int) -> float:
+        """
+        Get the time left in an agent's bank.
+
+        Args:
+            seat: Index of the agent
+
+        Returns:
+            Remaining bank in seconds
+        """
+        return self.banks[seat]
+
+    def remaining_ms(self) -> List[int]:
+        """
+        Get the time left in every agent's bank, as shown to the agents.
+
+        Returns:
+            Remaining bank of every agent in whole milliseconds
+        """
+        return [int(bank * 1000) for bank in self.banks]
+
+    def deadline(self, seat: int) -> float:
+        """
+        Get the time limit of the agent's next call.
+
+        Args:
+            seat: Index of the agent
+
+        Returns:
+            Base budget plus the remaining bank in seconds
+        """
+        return self.base + self.banks[seat]
+
+    def charge(self, seat: int, elapsed: float):
+        """
+        Draw the time spent over the base budget from the agent's bank.
+
+        Args:
+            seat: Index of the agent
+            elapsed: Time the call took in seconds
+        """
+        self.banks[seat] = max(0.0, self.banks[seat] - max(0.0, elapsed - self.base))
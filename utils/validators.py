@@ -2,6 +2,7 @@
 """
 Validators module for the "botwar ship" game.
 """
+import math
 
 
 def validate_coordinate(q: int, r: int, s: int) -> bool:
@@ -35,24 +36,39 @@ def validate_coordinate_bounds(q: int, r: int, s: int, radius: int) -> bool:
     return max(abs(q), abs(r), abs(s)) <= radius
 
 
-def validate_team_constraints(team_id: int, q: int, r: int, s: int) -> bool:
+def validate_team_constraints(team_id: int, q: int, r: int, s: int, num_teams: int = 3) -> bool:
     """
     Validate that a coordinate satisfies the team-specific constraints.
 
+    The map is split around its center into num_teams equal sectors, team 1
+    starting from the q = 0, r < 0 axis and the others following it. Cells
+    on the border of two sectors and the center belong to no team. With three
+    teams the sectors are q > 0 > r, r > 0 > s and s > 0 > q.
+
     Args:
-        team_id: Team ID (1-3)
+        team_id: Team ID (1-num_teams)
         q: q-coordinate
         r: r-coordinate
         s: s-coordinate
+        num_teams: Number of teams
 
     Returns:
         True if the coordinate satisfies the constraints, False otherwise
     """
-    if team_id == 1:
-        return q > 0 > r
-    elif team_id == 2:
-        return r > 0 > s
-    elif team_id == 3:
-        return s > 0 > q
-    else:
+    if num_teams == 3:
+        if team_id == 1:
+            return q > 0 > r
+        elif team_id == 2:
+            return r > 0 > s
+        elif team_id == 3:
+            return s > 0 > q
+        else:
+            return False
+
+    if not 1 <= team_id <= num_teams or q == r == 0:
         return False
+    # Angle of the cell center in degrees, counted from the border where team 1 starts
+    angle = (math.degrees(math.atan2(1.5 * r, math.sqrt(3) * (q + r / 2))) + 120) % 360
+    sector = 360 / num_teams
+    start = (team_id - 1) * sector
+    return start + 1e-7 < angle < start + sector - 1e-7